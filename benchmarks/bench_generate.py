@@ -0,0 +1,63 @@
+import pandas as pd
+
+from utils.codeBatch import codeBatchGenerate, codesToFrame
+from utils.codeGenerate import codeBaseGenerateDeduplicate, iter_code_chunks
+from utils.codeWheel import codeWheelGenerate, expandMultiple
+
+
+class GenerateDeduplicate:
+    """逐组生成去重（codeBaseGenerateDeduplicate）"""
+    params = [10, 10_000, 1_000_000]
+    param_names = ["num"]
+    # 100万组逐组生成需要数分钟：只计时一次，--quick时跳过
+    slow_params = [1_000_000]
+
+    def time_codeBaseGenerateDeduplicate(self, num):
+        codeBaseGenerateDeduplicate(num)
+
+
+class GenerateBatch:
+    """向量化批量生成（codeBatchGenerate），与逐组生成对照"""
+    params = [10, 10_000, 1_000_000]
+    param_names = ["num"]
+
+    def time_codeBatchGenerate(self, num):
+        codeBatchGenerate(num, seed=0)
+
+
+class PageFrame:
+    """出号页面：流式生成并构造DataFrame（预测模式使用合成数据的概率表，不读写data目录）"""
+    params = [(1, 100), (1, 100_000), (2, 100), (2, 100_000)]
+    param_names = ["model, num"]
+
+    def setup(self, params):
+        import numpy as np
+        from tests.synthetic import syntheticDrawItems
+        from utils.codePredict import buildTables, emptyStats, updateStats
+        from utils.cooccurrence import emptyIndex, updateIndex
+
+        items = syntheticDrawItems()[::-1]
+        reds = np.array([[int(code) for code in item["red"].split(",")] for item in items])
+        blues = np.array([int(item["blue"]) for item in items])
+        code = items[-1]["code"]
+        pair_count = updateIndex(emptyIndex(), reds, code)["pair_count"]
+        self.tables = buildTables(updateStats(emptyStats(), reds, blues, code), pair_count)
+
+    def time_codesToFrame(self, params):
+        model, num = params
+        blocks = iter_code_chunks(num, model, seed=0, tables=self.tables)
+        pd.concat([codesToFrame(block) for block in blocks], ignore_index=True)
+
+
+class Wheel:
+    """复式展开和旋转矩阵（候选红球个数, 保证命中个数）"""
+    params = [(12, 4), (16, 4), (18, 3)]
+    param_names = ["reds, match"]
+
+    def time_expandMultiple(self, params):
+        reds, _ = params
+        expandMultiple(range(1, reds + 1), [1, 2])
+
+    def time_codeWheelGenerate(self, params):
+        reds, match = params
+        codeWheelGenerate(range(1, reds + 1), [1], match)
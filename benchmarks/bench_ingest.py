@@ -0,0 +1,32 @@
+import io
+
+from tests.synthetic import TempDatabase, syntheticDrawJson
+from utils.EncodeJsonTOSQL import ingest_json_stream, insert_data_to_database, parse_lottery_data
+
+
+class ParseLotteryData:
+    """解析合成的5000期接口响应"""
+
+    def setup(self):
+        self.json_data = syntheticDrawJson()
+
+    def time_parse_lottery_data(self):
+        parse_lottery_data(self.json_data)
+
+
+class InsertDatabase:
+    """合成的5000期数据写入空数据库：整体解析和流式解析两条入库路径"""
+
+    def setup(self):
+        self.json_data = syntheticDrawJson()
+        self.json_bytes = self.json_data.encode("utf-8")
+        self.db = TempDatabase()
+
+    def teardown(self):
+        self.db.cleanup()
+
+    def time_insert_data_to_database(self):
+        insert_data_to_database(self.json_data, self.db.path)
+
+    def time_ingest_json_stream(self):
+        ingest_json_stream(io.BytesIO(self.json_bytes), self.db.path)
@@ -0,0 +1,99 @@
+from benchmarks.fixtures import projectDatabaseCopy
+from utils.backtest import MIN_HISTORY, backtest
+from utils.codeBatch import codeBatchGenerate
+from utils.codeCheck import checkTickets, fetchDraws
+from utils.codePredict import buildTables, emptyStats, updateStats
+from utils.codePredict import fetchDraws as fetchPredictDraws
+from utils.cooccurrence import emptyIndex, updateIndex
+from utils.drawSnapshot import loadSnapshot, readDatabase, writeSnapshot
+from utils.prizeOdds import TICKET_EXPECTED, estimatedPayouts
+from utils.trendAnalysis import buildTrendCube, fetchAllDraws
+
+
+class DrawQueries:
+    """在lottery_data.db的副本上执行各页面使用的查询"""
+
+    def setup(self):
+        self.db = projectDatabaseCopy()
+        self.codes = fetchAllDraws(self.db.path)[0]
+
+    def teardown(self):
+        self.db.cleanup()
+
+    def time_latest_code(self):
+        from utils.codePredict import latestCode
+        latestCode(self.db.path)
+
+    def time_fetch_all_draws(self):
+        fetchAllDraws(self.db.path)
+
+    def time_fetch_check_draws(self):
+        fetchDraws(self.db.path)
+
+    def time_fetch_recent_100_draws(self):
+        fetchDraws(self.db.path, start_code=self.codes[-100])
+
+    def time_blue_frequency_sql(self):
+        from utils.dbConnection import connection
+        with connection(self.db.path) as conn:
+            conn.execute("SELECT blue, COUNT(*) FROM double_color_ball GROUP BY blue").fetchall()
+
+    def time_read_database(self):
+        readDatabase(self.db.path)
+
+    def time_write_snapshot(self):
+        writeSnapshot(self.db.path)
+
+
+class Analytics:
+    """基于全部开奖结果的统计计算"""
+
+    def setup(self):
+        self.db = projectDatabaseCopy()
+        self.codes, self.reds, self.blues = fetchAllDraws(self.db.path)
+        self.draws = fetchDraws(self.db.path)
+
+    def teardown(self):
+        self.db.cleanup()
+
+    def time_build_trend_cube(self):
+        buildTrendCube(self.codes, self.reds, self.blues)
+
+    def time_build_predict_tables(self):
+        reds, blues, code = fetchPredictDraws(self.db.path)
+        buildTables(updateStats(emptyStats(), reds, blues, code), updateIndex(emptyIndex(), reds, code)["pair_count"])
+
+    def time_expected_value_history(self):
+        payouts, _ = estimatedPayouts(loadSnapshot(self.db.path))
+        (payouts * TICKET_EXPECTED).sum(axis=1)
+
+
+class CheckTickets:
+    """对号：号码组数 × 全部历史期数"""
+    params = [1_000, 100_000]
+    param_names = ["tickets"]
+
+    def setup(self, tickets):
+        self.db = projectDatabaseCopy()
+        self.draws = fetchDraws(self.db.path)
+        self.tickets = codeBatchGenerate(tickets, seed=0)
+
+    def teardown(self, tickets):
+        self.db.cleanup()
+
+    def time_check_tickets(self, tickets):
+        checkTickets(self.tickets, self.draws)
+
+
+class Backtest:
+    """回测：两种模式各10组号码，在当前进程内回放100期"""
+
+    def setup(self):
+        self.db = projectDatabaseCopy()
+        self.codes = fetchAllDraws(self.db.path)[0]
+
+    def teardown(self):
+        self.db.cleanup()
+
+    def time_backtest_100_draws(self):
+        backtest((1, 2), 10, db_path=self.db.path, end_code=self.codes[MIN_HISTORY + 99], workers=1)
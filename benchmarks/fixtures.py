@@ -0,0 +1,7 @@
+from tests.synthetic import TempDatabase
+from utils.paths import DB_PATH
+
+
+def projectDatabaseCopy():
+    """项目数据库lottery_data.db的临时副本，升级结构后使用，不修改原文件"""
+    return TempDatabase(copy_from=DB_PATH)
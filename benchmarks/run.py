@@ -0,0 +1,188 @@
+"""基准测试运行器
+
+用法（在项目根目录执行，全程离线）:
+    python -m benchmarks.run                          运行全部基准，结果写入benchmarks/results
+    python -m benchmarks.run --quick -k Generate      只运行名称匹配的基准，跳过耗时的参数
+    python -m benchmarks.run --compare old.json new.json
+
+基准的写法与asv相同：benchmarks/bench_*.py中的类，time_开头的方法为一项基准，
+params为参数列表（每个参数值作为一个实参传入），setup/teardown在每次计时前后执行，不计入耗时。
+类属性slow_params中的参数只计时一次，--quick时跳过。
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# 每项基准默认的计时次数
+DEFAULT_REPEAT = 5
+
+# 对比时中位数变慢超过该比例视为回退
+REGRESSION_THRESHOLD = 1.10
+
+
+def discover(pattern=None):
+    """找出全部基准，返回[(名称, 类, 方法名)]"""
+    benchmarks = []
+    for file_name in sorted(os.listdir(BENCH_DIR)):
+        if not (file_name.startswith("bench_") and file_name.endswith(".py")):
+            continue
+        module = importlib.import_module(f"benchmarks.{file_name[:-3]}")
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method_name in sorted(name for name in vars(cls) if name.startswith("time_")):
+                name = f"{file_name[:-3]}.{class_name}.{method_name}"
+                if pattern is None or re.search(pattern, name):
+                    benchmarks.append((name, cls, method_name))
+    return benchmarks
+
+
+def timeOnce(cls, method_name, args):
+    """执行一次setup、计时调用和teardown，返回耗时(秒)"""
+    instance = cls()
+    if hasattr(instance, "setup"):
+        instance.setup(*args)
+    try:
+        start = time.perf_counter()
+        getattr(instance, method_name)(*args)
+        return time.perf_counter() - start
+    finally:
+        if hasattr(instance, "teardown"):
+            instance.teardown(*args)
+
+
+def runBenchmark(cls, method_name, repeat=DEFAULT_REPEAT, quick=False):
+    """运行一项基准的全部参数
+
+    返回:
+        dict: {参数: {"samples": [...], "min", "median", "mean", "stdev"}}，无参数时键为""
+    """
+    params = getattr(cls, "params", None)
+    slow = set(getattr(cls, "slow_params", ()))
+    cases = [(repr(param), (param,)) for param in params] if params else [("", ())]
+
+    results = {}
+    for key, args in cases:
+        is_slow = bool(args) and args[0] in slow
+        if is_slow and quick:
+            continue
+        samples = [timeOnce(cls, method_name, args) for _ in range(1 if is_slow else repeat)]
+        results[key] = {
+            "samples": samples,
+            "min": min(samples),
+            "median": statistics.median(samples),
+            "mean": statistics.fmean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        }
+    return results
+
+
+def gitCommit():
+    """当前提交和工作区是否有未提交的修改，不在git仓库中时返回(None, None)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BENCH_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def environment():
+    """记录影响结果的运行环境"""
+    import numpy
+    import pandas
+    commit, dirty = gitCommit()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def formatSeconds(seconds):
+    """按量级显示耗时"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.3f}s"
+
+
+def compare(old_path, new_path, threshold=REGRESSION_THRESHOLD):
+    """对比两次结果的中位数，返回回退的项数"""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{old['environment']['commit']} -> {new['environment']['commit']}")
+
+    regressions = 0
+    for name, cases in new["results"].items():
+        for key, stats in cases.items():
+            before = old["results"].get(name, {}).get(key)
+            if before is None:
+                continue
+            ratio = stats["median"] / before["median"]
+            flag = ""
+            if ratio > threshold:
+                flag = "  回退"
+                regressions += 1
+            elif ratio < 1 / threshold:
+                flag = "  提升"
+            print(f"{name}[{key}]: {formatSeconds(before['median'])} -> {formatSeconds(stats['median'])}"
+                  f" ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="双色球工具基准测试")
+    parser.add_argument("-k", "--filter", help="只运行名称匹配该正则表达式的基准")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT, help="每项基准的计时次数")
+    parser.add_argument("--quick", action="store_true", help="跳过slow_params中的耗时参数")
+    parser.add_argument("-o", "--output", help="结果文件路径，默认写入benchmarks/results")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两个结果文件")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare) else 0
+
+    report = {"environment": environment(), "results": {}}
+    for name, cls, method_name in discover(args.filter):
+        results = runBenchmark(cls, method_name, args.repeat, args.quick)
+        report["results"][name] = results
+        for key, stats in results.items():
+            print(f"{name}[{key}]: 中位数 {formatSeconds(stats['median'])}，最小 {formatSeconds(stats['min'])}")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(report['environment']['commit'] or 'nogit')[:8]}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
--- 双色球数据库初始化脚本（自动生成）
-CREATE TABLE IF NOT EXISTS double_color_ball (
+-- 双色球数据库结构（由 init/SQL_init.py 按当前数据库自动生成，请勿手动修改）
+
+CREATE TABLE double_color_ball (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT,
     code TEXT UNIQUE,
@@ -19,13 +20,33 @@ CREATE TABLE IF NOT EXISTS double_color_ball (
     z2add TEXT,
     m2add TEXT,
     create_time TEXT
-);
+, r1 INTEGER, r2 INTEGER, r3 INTEGER, r4 INTEGER, r5 INTEGER, r6 INTEGER, blue INTEGER, draw_day TEXT, sales INTEGER, pool INTEGER, red_mask INTEGER);
 
-CREATE TABLE IF NOT EXISTS prize_grades (
+CREATE TABLE prize_grades (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     lottery_code TEXT,
     prize_type INTEGER,
     prize_type_num TEXT,
-    prize_money TEXT,
+    prize_money TEXT, prize_count INTEGER, prize_amount INTEGER,
     FOREIGN KEY (lottery_code) REFERENCES double_color_ball (code)
 );
+
+CREATE INDEX idx_dcb_draw_day ON double_color_ball (draw_day);
+
+CREATE INDEX idx_dcb_r1 ON double_color_ball (r1);
+
+CREATE INDEX idx_dcb_r2 ON double_color_ball (r2);
+
+CREATE INDEX idx_dcb_r3 ON double_color_ball (r3);
+
+CREATE INDEX idx_dcb_r4 ON double_color_ball (r4);
+
+CREATE INDEX idx_dcb_r5 ON double_color_ball (r5);
+
+CREATE INDEX idx_dcb_r6 ON double_color_ball (r6);
+
+CREATE INDEX idx_dcb_blue ON double_color_ball (blue);
+
+CREATE UNIQUE INDEX uq_prize_grades_code_type ON prize_grades (lottery_code, prize_type);
+
+PRAGMA user_version = 2;
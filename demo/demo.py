@@ -1,3 +1,6 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import hashlib
@@ -5,6 +8,14 @@ import sqlite3
 from datetime import datetime, timedelta
 import base64
 
+# demo通过 streamlit run demo.py 在demo目录中启动，需要把项目根目录加入导入路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dbConnection import connection, transaction
+
+# 用户数据库与本脚本同目录
+USERS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.db")
+
 # 页面配置
 st.set_page_config(
     page_title="用户认证系统",
@@ -83,60 +94,43 @@ add_custom_css()
 
 # 数据库操作
 def create_users_table():
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                 username TEXT UNIQUE NOT NULL,
-                 email TEXT UNIQUE NOT NULL,
-                 password_hash TEXT NOT NULL,
-                 created_at TIMESTAMP NOT NULL,
-                 last_login TIMESTAMP)''')
-    conn.commit()
-    conn.close()
+    with transaction(USERS_DB) as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS users
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     username TEXT UNIQUE NOT NULL,
+                     email TEXT UNIQUE NOT NULL,
+                     password_hash TEXT NOT NULL,
+                     created_at TIMESTAMP NOT NULL,
+                     last_login TIMESTAMP)''')
 
 
 def add_user(username, email, password):
     password_hash = hashlib.sha256(password.encode()).hexdigest()
     created_at = datetime.now()
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
     try:
-        c.execute("INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
-                  (username, email, password_hash, created_at))
-        conn.commit()
+        with transaction(USERS_DB) as conn:
+            conn.execute("INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                         (username, email, password_hash, created_at))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 
 def get_user(username):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = c.fetchone()
-    conn.close()
-    return user
+    with connection(USERS_DB) as conn:
+        return conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
 
 
 def update_password(username, new_password):
     password_hash = hashlib.sha256(new_password.encode()).hexdigest()
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
-    conn.commit()
-    conn.close()
+    with transaction(USERS_DB) as conn:
+        conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
 
 
 def update_last_login(username):
     last_login = datetime.now()
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute("UPDATE users SET last_login = ? WHERE username = ?", (last_login, username))
-    conn.commit()
-    conn.close()
+    with transaction(USERS_DB) as conn:
+        conn.execute("UPDATE users SET last_login = ? WHERE username = ?", (last_login, username))
 
 
 # 会话状态初始化
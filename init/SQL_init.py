@@ -1,52 +1,11 @@
 import sqlite3
 import os
-from datetime import datetime
-
-
-def initialize_database(db_path="lottery_data.db", sql_path="double_color_ball.sql"):
-    """初始化双色球数据库"""
-    # 确保数据库和SQL文件的父目录存在
-    db_dir = os.path.dirname(db_path)
-    sql_dir = os.path.dirname(sql_path)
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir)
-    if sql_dir and not os.path.exists(sql_dir):
-        os.makedirs(sql_dir)
-
-    # 检查SQL初始化文件是否存在
-    if not os.path.exists(sql_path):
-        print(f"SQL初始化文件不存在，将自动创建: {sql_path}")
-        create_sql_initialization_file(sql_path)
-
-    # 连接数据库（不存在则创建）
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    try:
-        # 读取SQL初始化脚本
-        with open(sql_path, 'r', encoding='utf-8') as f:
-            sql_script = f.read()
-
-        # 执行SQL脚本
-        cursor.executescript(sql_script)
-        conn.commit()
-
-        print(f"数据库初始化成功，保存至: {db_path}")
-        print(f"表结构和索引已创建")
-        return True
-
-    except sqlite3.Error as e:
-        print(f"初始化数据库时出错: {e}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
 
+from utils.dbConnection import connection
+from utils.paths import DB_PATH, SQL_PATH
 
-def create_sql_initialization_file(file_path):
-    """创建SQL初始化文件"""
-    sql_content = '''
--- 双色球数据库初始化脚本（自动生成）
+# 基础表结构，是全部建表语句的唯一来源；其余列和索引由MIGRATIONS按版本添加
+BASE_SCHEMA = '''
 CREATE TABLE IF NOT EXISTS double_color_ball (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT,
@@ -78,15 +37,255 @@ CREATE TABLE IF NOT EXISTS prize_grades (
     FOREIGN KEY (lottery_code) REFERENCES double_color_ball (code)
 );
 '''
+
+# 双色球表的类型化列：拆分后的红球、蓝球、ISO日期、整数金额和33位红球掩码
+TYPED_DRAW_COLUMNS = [
+    ("r1", "INTEGER"),
+    ("r2", "INTEGER"),
+    ("r3", "INTEGER"),
+    ("r4", "INTEGER"),
+    ("r5", "INTEGER"),
+    ("r6", "INTEGER"),
+    ("blue", "INTEGER"),
+    ("draw_day", "TEXT"),
+    ("sales", "INTEGER"),
+    ("pool", "INTEGER"),
+    ("red_mask", "INTEGER"),
+]
+
+# 奖级表的类型化列：整数注数和整数奖金
+TYPED_PRIZE_COLUMNS = [
+    ("prize_count", "INTEGER"),
+    ("prize_amount", "INTEGER"),
+]
+
+# 类型化列上的索引，趋势和对奖查询可以直接在SQLite中完成
+TYPED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_dcb_draw_day ON double_color_ball (draw_day)",
+    "CREATE INDEX IF NOT EXISTS idx_dcb_r1 ON double_color_ball (r1)",
+    "CREATE INDEX IF NOT EXISTS idx_dcb_r2 ON double_color_ball (r2)",
+    "CREATE INDEX IF NOT EXISTS idx_dcb_r3 ON double_color_ball (r3)",
+    "CREATE INDEX IF NOT EXISTS idx_dcb_r4 ON double_color_ball (r4)",
+    "CREATE INDEX IF NOT EXISTS idx_dcb_r5 ON double_color_ball (r5)",
+    "CREATE INDEX IF NOT EXISTS idx_dcb_r6 ON double_color_ball (r6)",
+    "CREATE INDEX IF NOT EXISTS idx_dcb_blue ON double_color_ball (blue)",
+    "CREATE INDEX IF NOT EXISTS idx_prize_grades_code ON prize_grades (lottery_code)",
+]
+
+# 每期每个奖级只保留一行，作为奖级数据upsert的冲突目标（同时覆盖按期号查询）
+PRIZE_GRADES_UNIQUE_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_prize_grades_code_type ON prize_grades (lottery_code, prize_type)"
+)
+
+
+def initialize_database(db_path=DB_PATH, sql_path=SQL_PATH):
+    """初始化双色球数据库：创建基础表、升级到最新结构版本
+
+    参数:
+        db_path (str): 数据库路径，父目录不存在时自动创建
+        sql_path (str | None): SQL参考文件路径，按升级后的实际结构重新生成，为None时不生成
+
+    返回:
+        bool: 是否成功
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    try:
+        # 连接数据库（不存在则创建），已是最新版本时只读取一次user_version
+        with connection(db_path) as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                conn.executescript(BASE_SCHEMA)
+                conn.commit()
+                migrate_database(conn)
+            if sql_path:
+                write_schema_file(conn, sql_path)
+        return True
+
+    except sqlite3.Error as e:
+        print(f"初始化数据库时出错: {e}")
+        return False
+
+
+def parse_red_balls(red_text):
+    """解析红球文本 "02,19,21,22,28,30" 为升序整数列表"""
+    return sorted(int(code) for code in red_text.split(","))
+
+
+def parse_draw_date(date_text):
+    """解析开奖日期 "2025-06-05(四)" 为ISO日期 "2025-06-05"，无法解析时返回None"""
+    if not date_text:
+        return None
+    return date_text.split("(")[0].strip() or None
+
+
+def parse_amount(amount_text):
+    """解析金额/注数文本为整数，空值或非数字返回None"""
+    try:
+        return int(amount_text)
+    except (TypeError, ValueError):
+        return None
+
+
+def red_mask(reds):
+    """红球的33位掩码，第i号红球对应第i-1位"""
+    mask = 0
+    for code in reds:
+        mask |= 1 << (code - 1)
+    return mask
+
+
+def typed_draw_values(red_text, blue_text, date_text, sales_text, pool_text):
+    """由原始文本字段计算类型化列的值，顺序与TYPED_DRAW_COLUMNS一致"""
+    reds = parse_red_balls(red_text)
+    return (
+        *reds,
+        parse_amount(blue_text),
+        parse_draw_date(date_text),
+        parse_amount(sales_text),
+        parse_amount(pool_text),
+        red_mask(reds),
+    )
+
+
+def add_missing_columns(cursor, table, columns):
+    """为表补充缺少的列，已存在的列跳过"""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, column_type in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+def migrate_to_typed_schema(cursor):
+    """迁移1：添加类型化列、回填历史数据并创建索引"""
+    add_missing_columns(cursor, "double_color_ball", TYPED_DRAW_COLUMNS)
+    add_missing_columns(cursor, "prize_grades", TYPED_PRIZE_COLUMNS)
+
+    # 回填尚未解析的历史记录
+    rows = cursor.execute('''
+    SELECT id, red_balls, blue_ball, draw_date, sales_amount, pool_money
+    FROM double_color_ball WHERE red_mask IS NULL AND red_balls IS NOT NULL
+    ''').fetchall()
+    cursor.executemany(f'''
+    UPDATE double_color_ball SET {", ".join(f"{name} = ?" for name, _ in TYPED_DRAW_COLUMNS)}
+    WHERE id = ?
+    ''', [(*typed_draw_values(*row[1:]), row[0]) for row in rows])
+
+    cursor.execute('''
+    UPDATE prize_grades SET
+        prize_count = CASE WHEN prize_type_num GLOB '[0-9]*' THEN CAST(prize_type_num AS INTEGER) END,
+        prize_amount = CASE WHEN prize_money GLOB '[0-9]*' THEN CAST(prize_money AS INTEGER) END
+    WHERE prize_count IS NULL AND prize_amount IS NULL
+    ''')
+
+    for index_sql in TYPED_INDEXES:
+        cursor.execute(index_sql)
+
+
+def dedupe_prize_grades(cursor):
+    """删除重复的奖级记录，每期每个奖级保留最后写入的一行
+
+    返回:
+        int: 删除的行数
+    """
+    cursor.execute('''
+    DELETE FROM prize_grades WHERE id NOT IN (
+        SELECT MAX(id) FROM prize_grades GROUP BY lottery_code, prize_type
+    )
+    ''')
+    return cursor.rowcount
+
+
+def migrate_to_unique_prize_grades(cursor):
+    """迁移2：去除重复的奖级记录，并为(期号, 奖级)建立唯一索引"""
+    removed = dedupe_prize_grades(cursor)
+    if removed:
+        print(f"已删除 {removed} 条重复的奖级记录")
+    cursor.execute(PRIZE_GRADES_UNIQUE_INDEX)
+    # 唯一索引以lottery_code开头，原来的单列索引已多余
+    cursor.execute("DROP INDEX IF EXISTS idx_prize_grades_code")
+
+
+# 按版本顺序排列的迁移，第i个迁移把结构从版本i升级到版本i+1
+MIGRATIONS = [
+    migrate_to_typed_schema,
+    migrate_to_unique_prize_grades,
+]
+
+# 数据库结构版本，记录在 PRAGMA user_version 中
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate_database(conn):
+    """将数据库结构升级到最新版本，已是最新时只读取一次user_version"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    cursor = conn.cursor()
+    try:
+        for migration in MIGRATIONS[version:]:
+            migration(cursor)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+        print(f"数据库结构已从版本 {version} 升级到版本 {SCHEMA_VERSION}")
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def compact_database(db_path=DB_PATH):
+    """压缩数据库：升级结构、去除重复的奖级记录后执行VACUUM回收空间
+
+    旧版本每次同步都会重复插入全部奖级记录，已膨胀的数据库运行一次即可恢复正常大小：
+        python -m init.SQL_init --compact
+
+    返回:
+        int: 删除的重复奖级记录数（含结构升级时删除的）
+    """
+    size_before = os.path.getsize(db_path)
+    with connection(db_path) as conn:
+        count_sql = "SELECT COUNT(*) FROM prize_grades"
+        rows_before = conn.execute(count_sql).fetchone()[0]
+        migrate_database(conn)
+        dedupe_prize_grades(conn.cursor())
+        conn.commit()
+        removed = rows_before - conn.execute(count_sql).fetchone()[0]
+        # VACUUM不能在事务中执行
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA optimize")
+    print(f"数据库压缩完成，删除 {removed} 条重复奖级记录，"
+          f"大小 {size_before / 1024 / 1024:.1f}MB -> {os.path.getsize(db_path) / 1024 / 1024:.1f}MB")
+    return removed
+
+
+def schema_sql(conn):
+    """导出数据库当前的建表、建索引语句和结构版本"""
+    rows = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+    ).fetchall()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    statements = [row[0] + ";" for row in rows] + [f"PRAGMA user_version = {version};"]
+    return "-- 双色球数据库结构（由 init/SQL_init.py 按当前数据库自动生成，请勿手动修改）\n\n" + "\n\n".join(statements) + "\n"
+
+
+def write_schema_file(conn, file_path):
+    """重新生成SQL参考文件，内容没有变化时不写入"""
+    content = schema_sql(conn)
+    if os.path.exists(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return
     with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(sql_content.strip())
-    print(f"已自动生成SQL初始化文件: {file_path}")
+        f.write(content)
+    print(f"已重新生成SQL参考文件: {file_path}")
 
 
 if __name__ == "__main__":
-    # 执行数据库初始化（使用相对路径）
-    db_path = "../data/lottery_data.db"
-    sql_path = "../data/double_color_ball.sql"
+    import sys
+
+    # 带--compact参数时先压缩已有的数据库，结构升级时删除的重复记录也计入压缩结果
+    if "--compact" in sys.argv:
+        compact_database(DB_PATH)
 
-    # 初始化数据库（包含自动创建文件夹）
-    initialize_database(db_path, sql_path)
\ No newline at end of file
+    # 初始化数据库（路径按项目目录解析，包含自动创建文件夹）
+    initialize_database()
\ No newline at end of file
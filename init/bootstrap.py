@@ -0,0 +1,34 @@
+from init.SQL_init import initialize_database
+from utils.codePredict import refreshStats
+from utils.cooccurrence import refreshIndex
+from utils.drawSnapshot import syncSnapshot
+from utils.paths import DB_PATH, SQL_PATH
+from utils.trendAnalysis import loadTrendCube
+
+
+def bootstrap(db_path=DB_PATH, sql_path=SQL_PATH, warm=True):
+    """启动前的一次性准备，由main.py在启动Streamlit之前调用
+
+    1. 创建数据目录和基础表，按MIGRATIONS升级到最新结构版本，并重新生成SQL参考文件
+    2. 确认列式快照与数据库一致，数据库被其他程序修改过时重新生成
+    3. 预热磁盘缓存：预测模式的统计、红球同出索引和走势数据，页面首次打开时不必再从头计算
+
+    之后各页面不再检查数据库结构或文件是否存在。
+
+    参数:
+        db_path (str): 数据库路径
+        sql_path (str | None): SQL参考文件路径
+        warm (bool): 是否预热缓存
+
+    异常:
+        RuntimeError: 数据库初始化失败时抛出
+    """
+    if not initialize_database(db_path, sql_path):
+        raise RuntimeError(f"数据库初始化失败: {db_path}")
+
+    syncSnapshot(db_path)
+
+    if warm:
+        refreshStats(db_path)
+        refreshIndex(db_path)
+        loadTrendCube(db_path)
@@ -1,6 +1,13 @@
 import os
 
+from init.bootstrap import bootstrap
+
 # 设置数据库初始化机制
 
 if __name__ == "__main__":
-    os.system("streamlit run ☯_主页.py")
\ No newline at end of file
+    # 启动前完成一次数据库初始化、结构升级和缓存预热，页面中不再重复检查
+    bootstrap()
+
+    # 页面中的图标等资源按项目根目录的相对路径引用
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.system("streamlit run ☯_主页.py")
@@ -1,7 +1,12 @@
 import pandas as pd
 import streamlit as st
 
-from utils.codeGenerate import codeGenerate
+from utils.codeBatch import codesToFrame
+from utils.codeGenerate import iter_code_chunks
+from utils.codeWheel import codeWheelGenerate, expandBanker, expandMultiple
+from utils.dataAccess import getPredictTables
+from utils.debugPanel import renderDebugPanel, startRerun
+from utils.metrics import timed
 
 # 设置页面标题
 st.set_page_config(page_title="双色球工具",
@@ -9,6 +14,9 @@ st.set_page_config(page_title="双色球工具",
                    layout="centered",
                    initial_sidebar_state="collapsed")
 
+# 记录本次重跑的耗时，调试面板开启时在侧边栏展示
+rerunRecord = startRerun()
+
 # 定义标题显示布局
 
 mainLayout = st.columns([1, 20, 3])
@@ -39,7 +47,7 @@ with mainLayout[1]:
     # 设置模式选择框
     with curLayout[1]:
         # 定义下拉列表可选择的模式和对应的值
-        fruit_dict = {"普通模式": 1, "预测模式": 2, "": None,}
+        fruit_dict = {"普通模式": 1, "预测模式": 2, "不重复模式": 3, "": None,}
 
         # 使用变量存储选择的模式
         modelSelect = st.selectbox(
@@ -48,28 +56,21 @@ with mainLayout[1]:
             index= len(fruit_dict) - 1
         )
 
-    df = None
-
-    if modelSelect != "" and codeNum is not None:
+    # 只在点击按钮时生成，结果保存在会话状态中：不重复模式每次生成都会写入已出号码位图，
+    # 页面其他控件引起的重跑不能再次出号，也不应改变已展示的号码
+    if st.button("生成号码", use_container_width=True, disabled=modelSelect == "" or not codeNum):
         model = fruit_dict[modelSelect]
-        # st.write(f"您当前要生成的号码数量是：{codeNum}，生成模式为：{modelSelect}")
-        codeList = codeGenerate(codeNum, model)
-
-        # 将codeList转换为 DataFrame
-        df = pd.DataFrame([
-            {
-                "红色球1号": list(item["redCodes"])[0],
-                "红色球2号": list(item["redCodes"])[1],
-                "红色球3号": list(item["redCodes"])[2],
-                "红色球4号": list(item["redCodes"])[3],
-                "红色球5号": list(item["redCodes"])[4],
-                "红色球6号": list(item["redCodes"])[5],
-                "蓝色球": item["blueCodes"]
-            }
-            for item in codeList
-        ])
-
-    if codeNum is not None and codeNum > 0 and df is not None:
+        # 按块流式生成号码，每块直接按列构造DataFrame，不再逐行转换集合
+        # 预测模式的概率表从共享缓存读取，有新开奖时才重新计算
+        with timed("page_section_seconds", page="出号", section="生成号码"):
+            tables = getPredictTables() if model == 2 else None
+            st.session_state["generatedCodes"] = pd.concat(
+                [codesToFrame(block) for block in iter_code_chunks(codeNum, model, tables=tables)],
+                ignore_index=True
+            )
+
+    df = st.session_state.get("generatedCodes")
+    if df is not None:
         st.dataframe(
             df,
             hide_index=True,
@@ -77,6 +78,50 @@ with mainLayout[1]:
             use_container_width=True
         )
 
+    # 复式、胆拖展开和旋转矩阵：按所选号码精确展开，或求保证命中的缩水组合
+    with st.expander("复式 / 胆拖 / 旋转矩阵"):
+        betType = st.radio("投注方式", ["复式", "胆拖", "旋转矩阵"], horizontal=True)
+        redOptions = list(range(1, 34))
+        bankerReds = []
+        if betType == "胆拖":
+            bankerReds = st.multiselect("胆码", redOptions, max_selections=5)
+            redOptions = [code for code in redOptions if code not in bankerReds]
+        wheelReds = st.multiselect("拖码" if betType == "胆拖" else "红球", redOptions)
+        wheelBlues = st.multiselect("蓝球", list(range(1, 17)))
+
+        if betType == "旋转矩阵":
+            curLayout = st.columns(2)
+            with curLayout[0]:
+                wheelDrawn = st.number_input("假定开出的红球中有几个在所选号码内", min_value=1, max_value=6, value=6)
+            with curLayout[1]:
+                wheelMatch = st.number_input("保证至少命中几个红球", min_value=1, max_value=6, value=4)
+
+        if st.button("展开号码", use_container_width=True):
+            try:
+                with timed("page_section_seconds", page="出号", section=betType):
+                    if betType == "复式":
+                        wheelResult = expandMultiple(wheelReds, wheelBlues)
+                    elif betType == "胆拖":
+                        wheelResult = expandBanker(bankerReds, wheelReds, wheelBlues)
+                    else:
+                        wheelResult = codeWheelGenerate(wheelReds, wheelBlues, wheelMatch, wheelDrawn)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.write(f"共 {wheelResult['tickets']} 注，金额 {wheelResult['cost']} 元")
+                if betType == "旋转矩阵":
+                    st.caption(
+                        f"保证：开奖红球中有{wheelResult['drawn']}个在所选号码内时，至少一注命中其中"
+                        f"{wheelResult['match']}个，所选蓝球开出时该注同时命中蓝球；"
+                        f"同样号码复式全包需 {wheelResult['full_tickets']} 注"
+                    )
+                st.dataframe(
+                    codesToFrame(wheelResult["codes"]),
+                    hide_index=True,
+                    height=300,
+                    use_container_width=True
+                )
+
 
 
 with mainLayout[1]:
@@ -86,4 +131,6 @@ with mainLayout[1]:
     with curLayout[1]:
         # 返回按钮
         if st.button('←返回'):
-            st.switch_page("☯_主页.py")
\ No newline at end of file
+            st.switch_page("☯_主页.py")
+
+renderDebugPanel(rerunRecord)
@@ -1,16 +1,97 @@
+import pandas as pd
 import streamlit as st
 
+from utils.codeBatch import CODE_COLUMNS
+from utils.codeCheck import checkTickets, parseTickets
+from utils.dataAccess import getCheckDraws, getDrawCodes
+from utils.debugPanel import renderDebugPanel, startRerun
+from utils.metrics import timed
+
 # 设置页面标题
 st.set_page_config(page_title="双色球工具",
                    page_icon="./fucd.png",
                    layout="centered",
                    initial_sidebar_state="collapsed")
 
+# 记录本次重跑的耗时，调试面板开启时在侧边栏展示
+rerunRecord = startRerun()
+
 st.title("对号页面🛂")
 
+# 奖级名称
+TIER_NAMES = ["未中奖", "一等奖", "二等奖", "三等奖", "四等奖", "五等奖", "六等奖"]
+
 # 设置主布局
-mainLayout = st.columns([1, 3, 1])
+mainLayout = st.columns([1, 20, 1])
 with mainLayout[1]:
+    # 号码输入：粘贴或上传CSV
+    pastedText = st.text_area(
+        label="粘贴号码（每行一组，6个红球+1个蓝球）",
+        placeholder="02 10 13 22 29 33 16\n01,05,12,18,25,30,08",
+        height=150
+    )
+    uploadedFile = st.file_uploader("或上传CSV文件", type=["csv", "txt"])
+
+    # 开奖期号范围：默认只对最新一期
+    allCodes = getDrawCodes()
+    rangeMode = st.radio("对奖范围", ["最新一期", "指定期号范围"], horizontal=True)
+
+    if rangeMode == "最新一期" or not allCodes:
+        startCode = endCode = allCodes[-1] if allCodes else None
+    else:
+        curLayout = st.columns(2)
+        with curLayout[0]:
+            startCode = st.selectbox("起始期号", allCodes, index=0)
+        with curLayout[1]:
+            endCode = st.selectbox("结束期号", allCodes, index=len(allCodes) - 1)
+
+    if st.button("开始对号", type="primary", use_container_width=True):
+        text = pastedText or ""
+        if uploadedFile is not None:
+            text += "\n" + uploadedFile.getvalue().decode("utf-8-sig")
+
+        try:
+            tickets, skippedLines = parseTickets(text)
+        except ValueError as e:
+            st.error(str(e))
+            tickets = None
+        else:
+            # 含有文字的行未参与对奖，列出以便发现输错的号码（表头行也会列出）
+            if skippedLines:
+                st.warning(
+                    f"以下 {len(skippedLines)} 行含有文字，已跳过：\n\n" +
+                    "\n\n".join(f"第{lineNo}行：{line}" for lineNo, line in skippedLines[:10]) +
+                    ("\n\n……" if len(skippedLines) > 10 else "")
+                )
+
+        if tickets is not None and len(tickets) == 0:
+            st.warning("请先输入或上传号码")
+        elif tickets is not None and startCode is None:
+            st.warning("数据库中没有开奖数据")
+        elif tickets is not None:
+            with timed("page_section_seconds", page="对号", section="对奖"):
+                draws = getCheckDraws(startCode, endCode)
+                result = checkTickets(tickets, draws)
+
+            # 汇总信息
+            summaryLayout = st.columns(3)
+            summaryLayout[0].metric("号码组数", len(tickets))
+            summaryLayout[1].metric("对奖期数", len(draws["codes"]))
+            summaryLayout[2].metric("奖金合计(元)", f"{int(result['payout'].sum()):,}")
+
+            # 各奖级中奖次数
+            tierTotals = result["tier_counts"].sum(axis=0)
+            st.dataframe(
+                pd.DataFrame({"奖级": TIER_NAMES[1:], "中奖次数": tierTotals[1:]}),
+                hide_index=True,
+                use_container_width=True
+            )
+
+            # 每组号码的对奖结果，号码较多时只展示前1000组
+            detail = pd.DataFrame(tickets[:1000], columns=CODE_COLUMNS)
+            detail["最高奖级"] = [TIER_NAMES[tier] for tier in result["best_tier"][:1000]]
+            detail["奖金(元)"] = result["payout"][:1000]
+            st.dataframe(detail, hide_index=True, height=300, use_container_width=True)
 
     # 设置返回按钮布局
     curLayout = st.columns([3, 1])
@@ -18,4 +99,6 @@ with mainLayout[1]:
     with curLayout[1]:
         # 返回按钮
         if st.button('←返回'):
-            st.switch_page("☯_主页.py")
\ No newline at end of file
+            st.switch_page("☯_主页.py")
+
+renderDebugPanel(rerunRecord)
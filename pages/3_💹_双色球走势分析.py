@@ -1,6 +1,12 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
 
-from utils.codeGenerate import codeGenerate
+from utils.cooccurrence import hotPairs, hotTriples
+from utils.dataAccess import getCooccurrence, getExpectedValue, getTrendCube
+from utils.debugPanel import renderDebugPanel, startRerun
+from utils.metrics import timed
+from utils.prizeOdds import betExpectedValue, betOdds
 
 # 设置页面标题
 st.set_page_config(page_title="双色球工具",
@@ -8,8 +14,149 @@ st.set_page_config(page_title="双色球工具",
                    layout="centered",
                    initial_sidebar_state="collapsed")
 
+# 记录本次重跑的耗时，调试面板开启时在侧边栏展示
+rerunRecord = startRerun()
+
 st.title("双色球走势分析 💹")
 
+# 统计窗口选择
+windowOptions = {"最近30期": 30, "最近50期": 50, "最近100期": 100, "全部": 0}
+windowSelect = st.radio("统计范围", list(windowOptions.keys()), horizontal=True)
+
+# 走势数据已预先计算并缓存，这里只按窗口取出
+with timed("page_section_seconds", page="走势", section="读取走势"):
+    cube = getTrendCube()
+stats = cube[windowOptions[windowSelect]]
+st.caption(f"数据截至第 {cube['code']} 期")
+
+redLabels = [f"{code:02d}" for code in range(1, 34)]
+blueLabels = [f"{code:02d}" for code in range(1, 17)]
+
+# 号码出现频次
+st.subheader("红球出现次数")
+st.bar_chart(pd.DataFrame({"出现次数": stats["red_freq"]}, index=redLabels), color="#e5484d")
+
+st.subheader("蓝球出现次数")
+st.bar_chart(pd.DataFrame({"出现次数": stats["blue_freq"]}, index=blueLabels), color="#3e63dd")
+
+# 遗漏统计
+st.subheader("遗漏统计")
+curLayout = st.columns(2)
+with curLayout[0]:
+    st.dataframe(
+        pd.DataFrame({
+            "红球": redLabels,
+            "当前遗漏": stats["red_omission"],
+            "最大遗漏": stats["red_max_omission"],
+        }),
+        hide_index=True,
+        height=300,
+        use_container_width=True
+    )
+with curLayout[1]:
+    st.dataframe(
+        pd.DataFrame({
+            "蓝球": blueLabels,
+            "当前遗漏": stats["blue_omission"],
+            "最大遗漏": stats["blue_max_omission"],
+        }),
+        hide_index=True,
+        height=300,
+        use_container_width=True
+    )
+
+# 形态分布：奇偶比、大小比、连号
+st.subheader("形态分布")
+ratioLabels = [f"{k}:{6 - k}" for k in range(7)]
+st.dataframe(
+    pd.DataFrame({
+        "比例": ratioLabels,
+        "奇偶比(期数)": stats["odd_dist"],
+        "大小比(期数)": stats["big_dist"],
+    }),
+    hide_index=True,
+    use_container_width=True
+)
+st.bar_chart(
+    pd.DataFrame({"期数": stats["consecutive_dist"]}, index=[f"{k}组连号" for k in range(6)])
+)
+
+# 和值与跨度
+st.subheader("和值与跨度")
+curLayout = st.columns(2)
+with curLayout[0]:
+    st.metric("平均和值", f"{stats['sum'].mean():.1f}")
+    sumValues, sumCounts = np.unique(stats["sum"] // 10 * 10, return_counts=True)
+    st.bar_chart(pd.DataFrame({"期数": sumCounts}, index=[f"{v}-{v + 9}" for v in sumValues]))
+with curLayout[1]:
+    st.metric("平均跨度", f"{stats['span'].mean():.1f}")
+    spanValues, spanCounts = np.unique(stats["span"], return_counts=True)
+    st.bar_chart(pd.DataFrame({"期数": spanCounts}, index=spanValues))
+
+# 同出组合：所选范围内一起开出次数最多的号码对和三码组合
+st.subheader("热门同出组合")
+cooccurrence = getCooccurrence()
+curLayout = st.columns(2)
+for column, (title, hotCombos) in zip(curLayout, [("号码对", hotPairs), ("三码组合", hotTriples)]):
+    combos, counts, omissions = hotCombos(cooccurrence, top=20, window=windowOptions[windowSelect])
+    with column:
+        st.dataframe(
+            pd.DataFrame({
+                title: [" ".join(f"{code:02d}" for code in combo) for combo in combos],
+                "同出次数": counts,
+                "当前遗漏": omissions,
+            }),
+            hide_index=True,
+            height=300,
+            use_container_width=True
+        )
+
+# 中奖概率与期望奖金：概率只与投注方式的号码个数有关，期望奖金按各期实际的单注奖金计算
+st.subheader("中奖概率与期望奖金")
+betType = st.radio("投注方式", ["单式", "复式", "胆拖"], horizontal=True)
+curLayout = st.columns(3)
+bankerCount = 0
+redCount = 6
+with curLayout[0]:
+    if betType == "胆拖":
+        bankerCount = st.number_input("胆码个数", min_value=1, max_value=5, value=2)
+with curLayout[1]:
+    if betType == "复式":
+        redCount = st.number_input("红球个数", min_value=7, max_value=20, value=7)
+    elif betType == "胆拖":
+        redCount = st.number_input("拖码个数", min_value=max(2, 7 - bankerCount), max_value=33 - bankerCount,
+                                   value=max(6, 7 - bankerCount))
+with curLayout[2]:
+    blueCount = 1 if betType == "单式" else st.number_input("蓝球个数", min_value=1, max_value=16, value=1)
+
+odds = betOdds(bankerCount, redCount, blueCount)
+with timed("page_section_seconds", page="走势", section="期望奖金"):
+    expectedValue = getExpectedValue()
+    betValue = betExpectedValue(odds, expectedValue)
+
+curLayout = st.columns(3)
+curLayout[0].metric("注数", odds["tickets"])
+curLayout[1].metric("金额(元)", odds["cost"])
+curLayout[2].metric("中奖概率", f"{1 - odds['probability'][0]:.2%}")
+st.dataframe(
+    pd.DataFrame({
+        "奖级": [f"{tier}等奖" for tier in range(1, 7)],
+        "至少中一注的概率": odds["probability"][1:],
+        "约为": [f"1/{1 / p:,.0f}" for p in odds["probability"][1:]],
+        "期望中奖注数": odds["expected"][1:],
+    }),
+    hide_index=True,
+    use_container_width=True
+)
+
+# 各期的期望奖金与投入对比，一等奖无人中奖的期按上期奖池估算
+st.caption(f"一等奖无人中奖的 {int(expectedValue['estimated'].sum())} 期按上期奖池估算一等奖奖金，不考虑分奖")
+st.line_chart(
+    pd.DataFrame({"期望奖金(元)": betValue, "投入(元)": odds["cost"]}, index=expectedValue["codes"]),
+    color=["#e5484d", "#8b8d98"]
+)
+st.metric("历史平均返奖率", f"{expectedValue['return_rate'].mean():.1%}")
+
 # 设置返回按钮布局
 curLayout = st.columns([3, 1])
 
@@ -17,3 +164,5 @@ with curLayout[1]:
     # 返回按钮
     if st.button('←返回'):
         st.switch_page("☯_主页.py")
+
+renderDebugPanel(rerunRecord)
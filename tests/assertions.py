@@ -0,0 +1,27 @@
+"""出号测试共用的检查：号码格式、去重和蓝球窗口规则"""
+import numpy as np
+
+from utils.codeBatch import BLUE_WINDOW
+from utils.codeRank import BLUE_COUNT, RED_COUNT, RED_PICK, rankCodes
+
+
+def assertBlueWindows(blues):
+    """任意连续16组的蓝球互不相同"""
+    blues = np.asarray(blues)
+    if len(blues) < BLUE_WINDOW:
+        assert len(np.unique(blues)) == len(blues)
+        return
+    windows = np.sort(np.lib.stride_tricks.sliding_window_view(blues, BLUE_WINDOW), axis=1)
+    assert (windows == np.arange(1, BLUE_COUNT + 1)).all()
+
+
+def assertValidCodes(codes, num):
+    """num组号码：红球升序且在1-33内，蓝球在1-16内，整注不重复，蓝球满足窗口规则"""
+    assert codes.shape == (num, RED_PICK + 1)
+    assert codes.dtype == np.uint8
+    reds = codes[:, :RED_PICK]
+    assert (np.diff(reds.astype(np.int16), axis=1) > 0).all()
+    assert reds.min(initial=1) >= 1 and reds.max(initial=RED_COUNT) <= RED_COUNT
+    assert codes[:, RED_PICK].min(initial=1) >= 1 and codes[:, RED_PICK].max(initial=BLUE_COUNT) <= BLUE_COUNT
+    assert len(np.unique(rankCodes(codes))) == num
+    assertBlueWindows(codes[:, RED_PICK])
@@ -0,0 +1,13 @@
+import pytest
+
+from init.SQL_init import initialize_database
+from utils.dbConnection import closeAll
+
+
+@pytest.fixture
+def database(tmp_path):
+    """tmp_path中已初始化的空数据库，测试结束后关闭连接池"""
+    path = str(tmp_path / "lottery_data.db")
+    initialize_database(path, sql_path=None)
+    yield path
+    closeAll()
@@ -0,0 +1,76 @@
+"""测试和基准测试共用的合成开奖数据与临时数据库"""
+import functools
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from init.SQL_init import initialize_database
+
+# 合成数据的期数和随机种子，固定后每次运行的输入完全相同
+SYNTHETIC_DRAWS = 5000
+FIXTURE_SEED = 20130101
+
+# 与接口一致的奖级：一、二等奖浮动，其余固定
+PRIZE_MONEY = {3: 3000, 4: 200, 5: 10, 6: 5}
+
+
+def syntheticDrawItems(num=SYNTHETIC_DRAWS, seed=FIXTURE_SEED):
+    """生成num期与开奖公告接口格式一致的result条目，按期号从新到旧"""
+    rng = np.random.default_rng(seed)
+    reds = np.sort(rng.random((num, 33)).argsort(axis=1)[:, :6] + 1, axis=1)
+    blues = rng.integers(1, 17, num)
+    items = []
+    for i in range(num - 1, -1, -1):
+        year, index = 2000 + i // 150, i % 150 + 1
+        grades = [{"type": 1, "typenum": str(rng.integers(0, 20)), "typemoney": str(rng.integers(5, 10) * 1000000)},
+                  {"type": 2, "typenum": str(rng.integers(50, 200)), "typemoney": str(rng.integers(1, 4) * 100000)}]
+        grades += [{"type": tier, "typenum": str(rng.integers(1000, 9000000)), "typemoney": str(money)}
+                   for tier, money in PRIZE_MONEY.items()]
+        grades.append({"type": 7, "typenum": "", "typemoney": ""})
+        items.append({
+            "name": "双色球",
+            "code": f"{year}{index:03d}",
+            "detailsLink": "",
+            "videoLink": "",
+            "date": f"{year}-01-01(二)",
+            "week": "二",
+            "red": ",".join(f"{code:02d}" for code in reds[i]),
+            "blue": f"{blues[i]:02d}",
+            "blue2": "",
+            "sales": str(rng.integers(300000000, 400000000)),
+            "poolmoney": str(rng.integers(1000000000, 3000000000)),
+            "content": "",
+            "addmoney": "",
+            "addmoney2": "",
+            "msg": "",
+            "z2add": "",
+            "m2add": "",
+            "prizegrades": grades,
+        })
+    return items
+
+
+@functools.lru_cache(maxsize=None)
+def syntheticDrawJson(num=SYNTHETIC_DRAWS, seed=FIXTURE_SEED):
+    """合成数据的完整接口响应JSON文本，同一进程内只生成一次"""
+    items = syntheticDrawItems(num, seed)
+    return json.dumps({"state": 0, "message": "查询成功", "total": num, "result": items}, ensure_ascii=False)
+
+
+class TempDatabase:
+    """临时目录中的数据库，可以是空库或项目数据库的副本，cleanup时删除整个目录"""
+
+    def __init__(self, copy_from=None):
+        self.dir = tempfile.mkdtemp(prefix="ssq_test_")
+        self.path = os.path.join(self.dir, "lottery_data.db")
+        if copy_from:
+            shutil.copyfile(copy_from, self.path)
+        initialize_database(self.path, sql_path=None)
+
+    def cleanup(self):
+        from utils.dbConnection import closeAll
+        closeAll()
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,43 @@
+import copy
+
+from tests.synthetic import syntheticDrawItems
+from utils.EncodeJsonTOSQL import insert_lottery_items, parse_lottery_items, write_lottery_records
+from utils.dbConnection import transaction
+
+
+def rowCounts(conn):
+    return tuple(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                 for table in ("double_color_ball", "prize_grades"))
+
+
+def test_reingesting_identical_items_changes_nothing(database):
+    items = syntheticDrawItems(50)
+    assert insert_lottery_items(items, database) == 50
+
+    with transaction(database) as conn:
+        counts = rowCounts(conn)
+        changes = conn.total_changes
+        write_lottery_records(conn.cursor(), *parse_lottery_items(items))
+        # WHERE ... IS NOT 条件使未变化的记录不会被改写
+        assert conn.total_changes == changes
+        assert rowCounts(conn) == counts == (50, sum(len(item["prizegrades"]) for item in items))
+
+
+def test_changed_prize_amount_is_updated(database):
+    items = syntheticDrawItems(50)
+    insert_lottery_items(items, database)
+
+    changed = copy.deepcopy(items)
+    grade = changed[3]["prizegrades"][0]
+    grade["typemoney"] = str(int(grade["typemoney"]) + 12345)
+    with transaction(database) as conn:
+        counts = rowCounts(conn)
+        changes = conn.total_changes
+        write_lottery_records(conn.cursor(), *parse_lottery_items(changed))
+        # 只有修改过的那一行奖级记录被更新
+        assert conn.total_changes == changes + 1
+        assert rowCounts(conn) == counts
+        row = conn.execute("SELECT prize_money, prize_amount FROM prize_grades "
+                           "WHERE lottery_code = ? AND prize_type = ?",
+                           (changed[3]["code"], grade["type"])).fetchone()
+    assert tuple(row) == (grade["typemoney"], int(grade["typemoney"]))
@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from init.SQL_init import BASE_SCHEMA, SCHEMA_VERSION, compact_database
+from tests.synthetic import syntheticDrawItems
+from utils.EncodeJsonTOSQL import parse_lottery_items
+from utils.dbConnection import closeAll
+
+
+@pytest.fixture
+def legacy_database(tmp_path):
+    """版本0的数据库：只有文本列，每期的奖级记录重复写入了3次（旧版本同步3次的结果）"""
+    path = str(tmp_path / "lottery_data.db")
+    items = syntheticDrawItems(30)
+    lottery_records, prize_grade_records = parse_lottery_items(items)
+    conn = sqlite3.connect(path)
+    conn.executescript(BASE_SCHEMA)
+    conn.executemany(f"INSERT INTO double_color_ball (name, code, details_link, video_link, draw_date, week, "
+                     f"red_balls, blue_ball, blue_ball2, sales_amount, pool_money, winning_content, add_money, "
+                     f"add_money2, msg, z2add, m2add, create_time) VALUES ({', '.join('?' * 18)})",
+                     [record[:18] for record in lottery_records])
+    for _ in range(3):
+        conn.executemany("INSERT INTO prize_grades (lottery_code, prize_type, prize_type_num, prize_money) "
+                         "VALUES (?, ?, ?, ?)", [record[:4] for record in prize_grade_records])
+    conn.commit()
+    conn.close()
+    yield path, items
+    closeAll()
+
+
+def test_compact_dedupes_prize_grades_and_migrates(legacy_database):
+    path, items = legacy_database
+    grade_count = sum(len(item["prizegrades"]) for item in items)
+
+    removed = compact_database(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert removed == 2 * grade_count
+        assert conn.execute("SELECT COUNT(*) FROM prize_grades").fetchone()[0] == grade_count
+        assert conn.execute("SELECT COUNT(DISTINCT lottery_code || '-' || prize_type) "
+                            "FROM prize_grades").fetchone()[0] == grade_count
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+        # 类型化列已由文本列回填
+        typed = {code: (reds, blue, mask) for code, *reds, blue, mask in conn.execute(
+            "SELECT code, r1, r2, r3, r4, r5, r6, blue, red_mask FROM double_color_ball")}
+        for item in items:
+            reds, blue, mask = typed[item["code"]]
+            expected = [int(red) for red in item["red"].split(",")]
+            assert reds == expected
+            assert blue == int(item["blue"])
+            assert mask == sum(1 << (red - 1) for red in expected)
+        assert conn.execute("SELECT COUNT(*) FROM double_color_ball WHERE draw_day IS NULL "
+                            "OR sales IS NULL OR pool IS NULL").fetchone()[0] == 0
+        # 空字符串的注数和奖金（如未开出的奖级）保持NULL
+        assert conn.execute("SELECT COUNT(*) FROM prize_grades WHERE prize_money != '' "
+                            "AND (prize_count IS NULL OR prize_amount IS NULL)").fetchone()[0] == 0
+        assert conn.execute("SELECT SUM(prize_amount) FROM prize_grades").fetchone()[0] == sum(
+            int(grade["typemoney"]) for item in items for grade in item["prizegrades"] if grade["typemoney"])
+
+        # 唯一索引已建立，再次写入重复奖级会被拒绝
+        code, prize_type = conn.execute("SELECT lottery_code, prize_type FROM prize_grades").fetchone()
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO prize_grades (lottery_code, prize_type) VALUES (?, ?)", (code, prize_type))
+    finally:
+        conn.close()
+
+    # 已压缩的数据库再次压缩不会删除任何记录
+    assert compact_database(path) == 0
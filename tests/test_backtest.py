@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import utils.backtest as backtest_module
+from tests.synthetic import syntheticDrawItems
+from utils.EncodeJsonTOSQL import insert_lottery_items
+from utils.backtest import backtest, summarizeBacktest
+
+# 回测参数：前100期作为历史，之后每50期一个区间
+OPTIONS = {"strategies": (1, 2), "tickets": 5, "seed": 3, "min_history": 100, "workers": 1, "range_size": 50}
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def history(database):
+    insert_lottery_items(syntheticDrawItems(300), database)
+    return database
+
+
+def test_resumed_checkpoint_matches_uninterrupted_run(history, tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / "checkpoint.npz")
+    expected = backtest(db_path=history, **OPTIONS)
+
+    # 第3个区间开始前中断，断点中保存前2个区间
+    replayed = []
+    backtest_range = backtest_module.backtestRange
+
+    def interruptingRange(db_path, start, *args):
+        if len(replayed) == 2:
+            raise Interrupted()
+        replayed.append(start)
+        return backtest_range(db_path, start, *args)
+
+    monkeypatch.setattr(backtest_module, "backtestRange", interruptingRange)
+    with pytest.raises(Interrupted):
+        backtest(db_path=history, checkpoint_path=checkpoint, **OPTIONS)
+    monkeypatch.undo()
+
+    # 再次运行只回放剩余的区间
+    resumed_ranges = []
+
+    def recordingRange(db_path, start, *args):
+        resumed_ranges.append(start)
+        return backtest_range(db_path, start, *args)
+
+    monkeypatch.setattr(backtest_module, "backtestRange", recordingRange)
+    resumed = backtest(db_path=history, checkpoint_path=checkpoint, **OPTIONS)
+
+    assert replayed == [100, 150]
+    assert resumed_ranges == [200, 250]
+    assert np.array_equal(resumed["tier_counts"], expected["tier_counts"])
+    assert np.array_equal(resumed["payout"], expected["payout"])
+    assert summarizeBacktest(resumed).equals(summarizeBacktest(expected))
+
+
+def test_results_independent_of_range_size(history):
+    options = dict(OPTIONS, range_size=70)
+    first = backtest(db_path=history, **OPTIONS)
+    second = backtest(db_path=history, **options)
+    assert np.array_equal(first["tier_counts"], second["tier_counts"])
+    assert first["tier_counts"].shape == (200, 2, 7)
+    assert (first["tier_counts"].sum(axis=2) == OPTIONS["tickets"]).all()
+
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from tests.assertions import assertBlueWindows, assertValidCodes
+from utils.codeBatch import blueSequence, codeBatchGenerate, codeKeys, resolveDuplicates
+from utils.codeGenerate import STREAM_CHUNK_SIZE, codeBaseGenerateDeduplicate, iter_code_chunks
+from utils.codeRank import RED_PICK, TOTAL_CODES
+
+
+@pytest.mark.parametrize("num", [0, 1, 15, 16, 17, 50000])
+def test_batch_codes_are_valid(num):
+    assertValidCodes(codeBatchGenerate(num, seed=num), num)
+
+
+def test_small_chunks_are_valid():
+    assertValidCodes(codeBatchGenerate(1000, seed=3, chunk_size=7), 1000)
+
+
+def test_same_seed_same_codes():
+    assert np.array_equal(codeBatchGenerate(5000, seed=42), codeBatchGenerate(5000, seed=42))
+    assert not np.array_equal(codeBatchGenerate(5000, seed=42), codeBatchGenerate(5000, seed=43))
+
+
+def test_rejects_impossible_counts():
+    with pytest.raises(ValueError):
+        codeBatchGenerate(TOTAL_CODES + 1)
+    with pytest.raises(ValueError):
+        codeBatchGenerate(-1)
+
+
+def test_resolve_duplicates_keeps_first_and_blues():
+    rng = np.random.default_rng(5)
+    codes = codeBatchGenerate(64, seed=5)
+    # 前16组各重复4次，每组后3行与第1行整注相同
+    codes = np.repeat(codes[:16], 4, axis=0)
+    original = codes.copy()
+
+    resolveDuplicates(rng, codes)
+
+    assert len(np.unique(codeKeys(codes))) == len(codes)
+    assert np.array_equal(codes[::4], original[::4])
+    assert np.array_equal(codes[:, RED_PICK], original[:, RED_PICK])
+    assert (np.diff(codes[:, :RED_PICK].astype(np.int16), axis=1) > 0).all()
+
+
+def test_blue_sequence_windows():
+    assertBlueWindows(blueSequence(np.random.default_rng(0), 1000))
+
+
+@pytest.mark.parametrize("chunk_size", [10, STREAM_CHUNK_SIZE])
+def test_stream_chunks_keep_rules_across_boundaries(chunk_size):
+    num = 2 * chunk_size + 21
+    blocks = list(iter_code_chunks(num, 1, seed=9, chunk_size=chunk_size))
+
+    assert [len(block) for block in blocks] == [min(chunk_size, num - start) for start in range(0, num, chunk_size)]
+    assertValidCodes(np.concatenate(blocks), num)
+
+
+def test_stream_same_seed_same_codes():
+    first = np.concatenate(list(iter_code_chunks(100, 1, seed=1, chunk_size=30)))
+    second = np.concatenate(list(iter_code_chunks(100, 1, seed=1, chunk_size=30)))
+    assert np.array_equal(first, second)
+
+
+def test_loop_generator_rules():
+    codes = codeBaseGenerateDeduplicate(200)
+    rows = np.array([sorted(code["redCodes"]) + list(code["blueCodes"]) for code in codes], dtype=np.uint8)
+    assertValidCodes(rows, 200)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from tests.assertions import assertValidCodes
+from utils.codeBitmap import CodeBitmap, codeBitmapGenerate
+from utils.codeRank import BLUE_COUNT, RED_COMBOS, TOTAL_CODES, rankCodes
+
+
+def fullBitmap(free=()):
+    """除free中的号码序号外全部已出的位图"""
+    bitmap = CodeBitmap(np.full(TOTAL_CODES // 8, 0xFF, dtype=np.uint8))
+    for index in free:
+        bitmap.bits[index >> 3] &= ~np.uint8(1 << (7 - (index & 7)))
+    return bitmap
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "issued_codes.npy")
+    bitmap = CodeBitmap()
+    keys = np.random.default_rng(0).integers(0, TOTAL_CODES, 1000)
+    bitmap.add(keys)
+    bitmap.save(path)
+
+    loaded = CodeBitmap.load(path)
+    assert np.array_equal(loaded.bits, bitmap.bits)
+    assert loaded.contains(keys).all()
+    assert loaded.count() == len(np.unique(keys))
+    assert CodeBitmap.load(str(tmp_path / "missing.npy")).count() == 0
+
+
+def test_issued_per_blue_tracks_adds():
+    bitmap = CodeBitmap()
+    bitmap.add([0, 1, 16, 17 * BLUE_COUNT + 15])
+    assert bitmap.issuedPerBlue().tolist() == [2, 1] + [0] * 13 + [1]
+    bitmap.add([1, 2])
+    assert bitmap.issuedPerBlue().tolist() == [2, 1, 1] + [0] * 12 + [1]
+    assert np.array_equal(bitmap.issuedPerBlue(), bitmap.issuedTable().sum(axis=0))
+
+    # 清除时未标记的序号不影响计数，同一字节中的其他位保持不变
+    bitmap.remove([1, 16, 3])
+    assert bitmap.contains([0, 1, 2, 16]).tolist() == [True, False, True, False]
+    assert bitmap.issuedPerBlue().tolist() == [1, 0, 1] + [0] * 12 + [1]
+    assert np.array_equal(bitmap.issuedPerBlue(), bitmap.issuedTable().sum(axis=0))
+
+
+def test_never_returns_issued_codes():
+    rng = np.random.default_rng(1)
+    bitmap = CodeBitmap()
+    # 蓝球1下已出约九成，走枚举剩余组合的分支；其余蓝球少量已出，走拒绝采样的分支
+    issued = np.concatenate([
+        rng.choice(RED_COMBOS, RED_COMBOS * 9 // 10, replace=False) * BLUE_COUNT,
+        rng.integers(0, TOTAL_CODES, 200000),
+    ])
+    bitmap.add(issued)
+    before = CodeBitmap(bitmap.bits.copy())
+
+    for seed in range(3):
+        codes = codeBitmapGenerate(50000, seed=seed, bitmap=bitmap)
+        assertValidCodes(codes, 50000)
+        keys = rankCodes(codes)
+        assert not before.contains(keys).any()
+        assert bitmap.contains(keys).all()
+        before.add(keys)
+
+
+def test_exhausted_space_raises():
+    # 每个蓝球各剩一组
+    free = [blue * 7 * BLUE_COUNT + blue for blue in range(BLUE_COUNT)]
+    bitmap = fullBitmap(free)
+
+    with pytest.raises(ValueError):
+        codeBitmapGenerate(BLUE_COUNT + 1, seed=0, bitmap=bitmap)
+
+    codes = codeBitmapGenerate(BLUE_COUNT, seed=0, bitmap=bitmap)
+    assert sorted(rankCodes(codes).tolist()) == sorted(free)
+    assert bitmap.count() == TOTAL_CODES
+
+    with pytest.raises(ValueError):
+        codeBitmapGenerate(1, seed=0, bitmap=bitmap)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from utils.codeCheck import TIER_TABLE, checkTickets, parseTickets, redMasks
+from utils.codeRank import BLUE_COUNT, RED_COUNT, RED_PICK
+
+# 合成开奖的期数
+DRAWS = 300
+
+
+def syntheticDraws(rng, num=DRAWS):
+    """随机开奖，格式与codeCheck.fetchDraws的返回值一致"""
+    reds = np.sort(rng.random((num, RED_COUNT)).argsort(axis=1)[:, :RED_PICK] + 1, axis=1)
+    blues = rng.integers(1, BLUE_COUNT + 1, num)
+    payouts = np.zeros((num, 7), dtype=np.int64)
+    payouts[:, 1] = rng.integers(5, 10, num) * 1000000
+    payouts[:, 2] = rng.integers(1, 4, num) * 100000
+    payouts[:, 3:] = [3000, 200, 10, 5]
+    return {
+        "codes": np.array([f"2020{i:03d}" for i in range(num)]),
+        "red_masks": redMasks(reds),
+        "blues": blues.astype(np.uint8),
+        "payouts": payouts,
+        "reds": reds,
+    }
+
+
+def nearTickets(rng, draws):
+    """与指定开奖相同4、5、6个红球的号码，蓝球分别命中和不命中"""
+    tickets = []
+    for keep in (4, 5, 6):
+        for blue_hit in (True, False):
+            for draw in rng.choice(DRAWS, 5, replace=False):
+                reds = list(rng.choice(draws["reds"][draw], keep, replace=False))
+                others = np.setdiff1d(np.arange(1, RED_COUNT + 1), draws["reds"][draw])
+                reds += list(rng.choice(others, RED_PICK - keep, replace=False))
+                blue = draws["blues"][draw] if blue_hit else draws["blues"][draw] % BLUE_COUNT + 1
+                tickets.append(sorted(reds) + [blue])
+    return np.array(tickets, dtype=np.uint8)
+
+
+def bruteForce(tickets, draws):
+    """逐个号码逐期比较红球集合"""
+    tier_counts = np.zeros((len(tickets), 7), dtype=np.int64)
+    payout = np.zeros(len(tickets), dtype=np.int64)
+    for i, ticket in enumerate(tickets.tolist()):
+        ticket_reds = set(ticket[:RED_PICK])
+        for draw, draw_reds in enumerate(draws["reds"].tolist()):
+            hits = len(ticket_reds & set(draw_reds))
+            tier = TIER_TABLE[hits, int(ticket[RED_PICK] == draws["blues"][draw])]
+            tier_counts[i, tier] += 1
+            if tier:
+                payout[i] += draws["payouts"][draw, tier]
+    won = tier_counts[:, 1:] > 0
+    best_tier = np.where(won.any(axis=1), won.argmax(axis=1) + 1, 0)
+    return tier_counts, payout, best_tier
+
+
+@pytest.mark.parametrize("chunk_size", [7, 65536])
+def test_check_tickets_matches_brute_force(chunk_size):
+    rng = np.random.default_rng(8)
+    draws = syntheticDraws(rng)
+    random_tickets = syntheticDraws(rng, 200)
+    tickets = np.concatenate([
+        nearTickets(rng, draws),
+        np.column_stack([random_tickets["reds"], random_tickets["blues"]]).astype(np.uint8),
+    ])
+
+    result = checkTickets(tickets, draws, chunk_size=chunk_size)
+    tier_counts, payout, best_tier = bruteForce(tickets, draws)
+
+    # 构造的号码覆盖一至六等奖
+    assert (tier_counts[:, 1:].sum(axis=0) > 0).all()
+    assert np.array_equal(result["tier_counts"], tier_counts)
+    assert np.array_equal(result["payout"], payout)
+    assert np.array_equal(result["best_tier"], best_tier)
+
+
+def test_check_tickets_without_draws():
+    rng = np.random.default_rng(0)
+    draws = syntheticDraws(rng, 0)
+    result = checkTickets(np.array([[1, 2, 3, 4, 5, 6, 1]], dtype=np.uint8), draws)
+    assert result["tier_counts"].tolist() == [[0] * 7]
+    assert result["best_tier"].tolist() == [0]
+
+
+def test_parse_tickets_skips_text_lines():
+    text = "红色球1号,红色球2号,红色球3号,红色球4号,红色球5号,红色球6号,蓝色球\n" \
+           "06 02 19 21 22 28 + 01\n" \
+           "\n" \
+           "O6,08,09,13,25,31,14\n" \
+           "1|2|3|4|5|6|16\n"
+
+    tickets, skipped = parseTickets(text)
+
+    assert tickets.tolist() == [[2, 6, 19, 21, 22, 28, 1], [1, 2, 3, 4, 5, 6, 16]]
+    assert [line_no for line_no, _ in skipped] == [1, 4]
+    assert skipped[1][1] == "O6,08,09,13,25,31,14"
+
+
+@pytest.mark.parametrize("line", [
+    "01 02 03 04 05 34 01",
+    "00 02 03 04 05 06 01",
+    "01 02 03 04 05 06 17",
+    "01 02 03 04 05 06 00",
+    "01 01 03 04 05 06 01",
+    "01 02 03 04 05 06",
+    "01 02 03 04 05 06 07 08",
+])
+def test_parse_tickets_rejects_invalid_numbers(line):
+    with pytest.raises(ValueError, match="第2行"):
+        parseTickets("01 02 03 04 05 06 07\n" + line)
@@ -0,0 +1,78 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from init.SQL_init import initialize_database
+from tests.synthetic import syntheticDrawItems
+from utils.EncodeJsonTOSQL import insert_lottery_items
+from utils.codeBitmap import CodeBitmap
+from utils.codePredict import codePredictGenerate, emptyStats, loadStats, loadTables, refreshStats
+from utils.codePredict import statsPath, updateStats
+from utils.codeRank import TOTAL_CODES, rankCodes
+from utils.drawSnapshot import loadSnapshot
+
+
+def fullStats(db_path):
+    """按快照中的全部开奖结果从头统计"""
+    snapshot = loadSnapshot(db_path)
+    return updateStats(emptyStats(), snapshot["reds"], snapshot["blues"], snapshot["code"])
+
+
+def assertSameStats(stats, expected):
+    assert stats.keys() == expected.keys()
+    for key, value in expected.items():
+        assert np.array_equal(stats[key], value), key
+
+
+def test_incremental_refresh_matches_full_rebuild(database):
+    items = syntheticDrawItems(60)
+    insert_lottery_items(items[20:], database)
+    insert_lottery_items(items[:20], database)
+
+    assert loadStats(statsPath(database))["draws"] == 60
+    assertSameStats(refreshStats(database), fullStats(database))
+
+
+def test_older_draw_inserted_after_cache_rebuilds(database):
+    items = syntheticDrawItems(60)
+    insert_lottery_items(items[:30] + items[31:], database)
+    # 补入一期比缓存最新期号更早的开奖，最新期号不变
+    insert_lottery_items(items[30:31], database)
+
+    stats = refreshStats(database)
+    assert stats["draws"] == 60
+    assertSameStats(stats, fullStats(database))
+    assertSameStats(loadStats(statsPath(database)), stats)
+
+
+def test_cache_from_another_database_rebuilds(database, tmp_path):
+    items = syntheticDrawItems(60)
+    insert_lottery_items(items, database)
+
+    # 同目录下换成另一个数据库：最新期号相同但期数不同
+    other = str(tmp_path / "other" / "lottery_data.db")
+    initialize_database(other, sql_path=None)
+    insert_lottery_items(items[:1] + items[40:], other)
+    shutil.copyfile(statsPath(database), statsPath(other))
+
+    stats = refreshStats(other)
+    assert stats["draws"] == 21
+    assertSameStats(stats, fullStats(other))
+
+
+def test_generate_rejects_more_than_all_codes():
+    with pytest.raises(ValueError):
+        codePredictGenerate(TOTAL_CODES + 1)
+
+
+def test_generate_rejects_exhausted_bitmap(database):
+    insert_lottery_items(syntheticDrawItems(60), database)
+    tables = loadTables(database)
+    full = CodeBitmap(np.full((TOTAL_CODES + 7) // 8, 0xFF, dtype=np.uint8))
+
+    with pytest.raises(ValueError):
+        codePredictGenerate(1, seed=0, bitmap=full, tables=tables)
+
+    codes = codePredictGenerate(100, seed=0, tables=tables)
+    assert len(np.unique(rankCodes(codes))) == 100
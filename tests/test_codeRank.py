@@ -0,0 +1,41 @@
+import numpy as np
+
+from utils.codeRank import RED_COMBOS, TOTAL_CODES, rankCode, rankCodes, rankRed, unrankCode, unrankRed
+
+
+def test_scalar_round_trip():
+    assert rankRed({1, 2, 3, 4, 5, 6}) == 0
+    assert rankRed([33, 32, 31, 30, 29, 28]) == RED_COMBOS - 1
+    assert unrankRed(0) == (1, 2, 3, 4, 5, 6)
+    assert unrankRed(RED_COMBOS - 1) == (28, 29, 30, 31, 32, 33)
+
+    for reds, blue in [({2, 19, 21, 22, 28, 30}, 1), ([6, 8, 9, 13, 25, 31], 14), ((1, 2, 3, 4, 5, 33), 16)]:
+        index = rankCode(reds, blue)
+        assert 0 <= index < TOTAL_CODES
+        assert unrankCode(index) == (tuple(sorted(reds)), blue)
+
+
+def test_every_red_rank_round_trips():
+    ranks = np.arange(RED_COMBOS)
+    reds = unrankRed(ranks)
+    assert (np.diff(reds.astype(np.int16), axis=1) > 0).all()
+    assert np.array_equal(rankRed(reds), ranks)
+
+
+def test_array_round_trip_matches_scalar():
+    rng = np.random.default_rng(2)
+    index = rng.integers(0, TOTAL_CODES, 1000)
+    codes = unrankCode(index)
+
+    assert codes.shape == (1000, 7)
+    assert np.array_equal(rankCodes(codes), index)
+    for row, value in zip(codes[:20].tolist(), index[:20].tolist()):
+        assert rankCode(set(row[:6]), row[6]) == value
+        assert unrankCode(value) == (tuple(row[:6]), row[6])
+
+
+def test_rank_ignores_red_order():
+    codes = unrankCode(np.arange(0, TOTAL_CODES, 99991))
+    shuffled = codes.copy()
+    shuffled[:, :6] = np.random.default_rng(0).permuted(codes[:, :6], axis=1)
+    assert np.array_equal(rankCodes(shuffled), rankCodes(codes))
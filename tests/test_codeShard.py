@@ -0,0 +1,37 @@
+import numpy as np
+
+from tests.assertions import assertValidCodes
+from utils.codeBatch import codeKeys, duplicateRows
+from utils.codeGenerate import codeGenerate
+from utils.codeShard import _generateShard, codeShardGenerate
+
+# 分片很小时不同分片之间几乎必然出现相同组合，合并后的全局去重才会被用到
+NUM = 20000
+SHARD_SIZE = 1000
+
+
+def test_output_independent_of_workers():
+    single = codeShardGenerate(NUM, seed=7, workers=1, shard_size=SHARD_SIZE)
+    multi = codeShardGenerate(NUM, seed=7, workers=3, shard_size=SHARD_SIZE)
+    assert np.array_equal(single, multi)
+    assert not np.array_equal(single, codeShardGenerate(NUM, seed=8, workers=1, shard_size=SHARD_SIZE))
+
+
+def test_global_dedupe_and_blue_windows_across_shards():
+    codes = codeShardGenerate(NUM, seed=7, workers=1, shard_size=SHARD_SIZE)
+    assertValidCodes(codes, NUM)
+
+    # 同一种子下各分片独立去重后拼接的结果中存在跨分片的重复，说明上面的唯一性来自全局去重
+    master = np.random.SeedSequence(7)
+    master.spawn(2)
+    blues = codes[:, 6]
+    shards = [_generateShard(shard_seed, blues[start:start + SHARD_SIZE])
+              for shard_seed, start in zip(master.spawn(NUM // SHARD_SIZE), range(0, NUM, SHARD_SIZE))]
+    assert duplicateRows(codeKeys(np.concatenate(shards))).size > 0
+
+
+def test_code_generate_seed_reproducible_across_workers():
+    single = codeGenerate(3000, 1, workers=1, seed=11)
+    multi = codeGenerate(3000, 1, workers=2, seed=11)
+    assert single == multi
+    assert len(single) == 3000
@@ -0,0 +1,58 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from utils.codeCheck import redMasks
+from utils.codeWheel import codeWheelGenerate, expandMultiple, guaranteedMatch
+
+
+@pytest.mark.parametrize("reds, match, drawn", [
+    (range(1, 11), 3, 6),
+    (range(5, 17), 4, 6),
+    (range(20, 29), 4, 5),
+    (range(1, 9), 5, 6),
+    ([2, 7, 11, 15, 19, 23, 27, 31, 33], 2, 3),
+])
+def test_wheel_covers_every_reachable_draw(reds, match, drawn):
+    reds = list(reds)
+    blues = [3, 12]
+
+    result = codeWheelGenerate(reds, blues, match=match, drawn=drawn)
+
+    codes = result["codes"]
+    assert result["match"] == match
+    assert result["drawn"] == drawn
+    assert result["tickets"] == len(codes) < result["full_tickets"]
+    assert result["cost"] == 2 * result["tickets"]
+    assert len({tuple(code) for code in codes.tolist()}) == len(codes)
+    assert set(codes[:, 6].tolist()) == set(blues)
+    assert np.all(np.diff(codes[:, :6].astype(int), axis=1) > 0)
+    assert set(codes[:, :6].ravel().tolist()) <= set(reds)
+
+    # 候选号码中任意drawn个被开出时，至少一注命中其中match个
+    tickets = {frozenset(code[:6]) for code in codes.tolist()}
+    for hit in combinations(reds, drawn):
+        assert max(len(ticket.intersection(hit)) for ticket in tickets) >= match
+
+
+def test_guaranteed_match_is_min_of_best_overlap():
+    targets = redMasks(np.array(list(combinations(range(1, 9), 6))))
+    # 全部展开时每个目标都恰好是其中一注
+    full = redMasks(expandMultiple(range(1, 9), [1])["codes"][:, :6])
+    assert guaranteedMatch(full, targets) == 6
+    # 只有一注时，与它相同号码最少的目标有4个相同号码（8个候选号码中它缺2个）
+    assert guaranteedMatch(full[:1], targets) == 4
+    assert guaranteedMatch(full[:0], targets) == 0
+
+
+@pytest.mark.parametrize("reds, blues, match, drawn", [
+    (range(1, 7), [1], 3, 6),     # 候选红球不足7个
+    (range(1, 10), [], 3, 6),     # 没有蓝球
+    (range(1, 10), [1], 5, 4),    # 保证命中个数大于假定开出个数
+    (range(1, 10), [1], 0, 6),
+    (range(1, 10), [17], 3, 6),
+])
+def test_wheel_rejects_invalid_arguments(reds, blues, match, drawn):
+    with pytest.raises(ValueError):
+        codeWheelGenerate(reds, blues, match=match, drawn=drawn)
@@ -0,0 +1,113 @@
+import shutil
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+
+from init.SQL_init import initialize_database
+from tests.synthetic import syntheticDrawItems
+from utils.EncodeJsonTOSQL import insert_lottery_items
+from utils.cooccurrence import emptyIndex, hotPairs, hotTriples, indexPath, loadIndex, pairStats, refreshIndex
+from utils.cooccurrence import saveIndex, tripleStats, updateIndex
+from utils.drawSnapshot import loadSnapshot
+
+
+def bruteCounts(reds, size):
+    """逐期枚举号码组合：(出现次数, 最近一次出现的期序号)"""
+    counts, last = Counter(), {}
+    for draw, row in enumerate(reds.tolist()):
+        for group in combinations(sorted(row), size):
+            counts[group] += 1
+            last[group] = draw
+    return counts, last
+
+
+def assertSameIndex(index, expected):
+    assert index.keys() == expected.keys()
+    for key, value in expected.items():
+        assert np.array_equal(index[key], value), key
+
+
+def fullIndex(db_path):
+    snapshot = loadSnapshot(db_path)
+    return updateIndex(emptyIndex(), snapshot["reds"], snapshot["code"])
+
+
+def test_hot_pairs_and_triples_match_brute_force(database):
+    insert_lottery_items(syntheticDrawItems(120), database)
+    index = refreshIndex(database)
+    reds = np.asarray(loadSnapshot(database)["reds"])
+    draws = len(reds)
+    _, pair_last = bruteCounts(reds, 2)
+    _, triple_last = bruteCounts(reds, 3)
+
+    for window in (0, 1, 15, 60):
+        recent = reds[-window:] if window else reds
+        pair_counts, _ = bruteCounts(recent, 2)
+        pairs, counts, omission = hotPairs(index, top=1000, window=window)
+        assert {tuple(pair) for pair in pairs.tolist()} == set(pair_counts)
+        for pair, count, gap in zip(pairs.tolist(), counts.tolist(), omission.tolist()):
+            assert count == pair_counts[tuple(pair)]
+            assert gap == draws - 1 - pair_last[tuple(pair)]
+        assert counts.tolist() == sorted(counts.tolist(), reverse=True)
+
+        triple_counts, _ = bruteCounts(recent, 3)
+        triples, counts, omission = hotTriples(index, top=10, window=window)
+        assert counts[0] == max(triple_counts.values())
+        for triple, count, gap in zip(triples.tolist(), counts.tolist(), omission.tolist()):
+            assert count == triple_counts[tuple(triple)]
+            assert gap == draws - 1 - triple_last[tuple(triple)]
+
+    pair_counts, _ = bruteCounts(reds, 2)
+    for a, b in combinations(range(1, 34), 2):
+        count, gap = pairStats(index, a, b)
+        assert count == pair_counts[(a, b)]
+        assert gap == draws - 1 - pair_last.get((a, b), -1)
+        assert pairStats(index, b, a) == (count, gap)
+    triple_counts, _ = bruteCounts(reds, 3)
+    for triple in list(triple_counts)[:50]:
+        assert tripleStats(index, *triple[::-1]) == (triple_counts[triple], draws - 1 - triple_last[triple])
+
+
+def test_older_draw_inserted_after_index_rebuilds(database):
+    items = syntheticDrawItems(60)
+    insert_lottery_items(items[:30] + items[31:], database)
+    insert_lottery_items(items[30:31], database)
+
+    index = refreshIndex(database)
+    assert index["draws"] == 60
+    assertSameIndex(index, fullIndex(database))
+    assertSameIndex(loadIndex(indexPath(database)), index)
+
+
+def test_index_from_another_database_rebuilds(database, tmp_path):
+    items = syntheticDrawItems(60)
+    insert_lottery_items(items, database)
+
+    other = str(tmp_path / "other" / "lottery_data.db")
+    initialize_database(other, sql_path=None)
+    insert_lottery_items(items[:1] + items[40:], other)
+    shutil.copyfile(indexPath(database), indexPath(other))
+
+    index = refreshIndex(other)
+    assert index["draws"] == 21
+    assertSameIndex(index, fullIndex(other))
+
+
+def test_malformed_index_rebuilds(database):
+    insert_lottery_items(syntheticDrawItems(30), database)
+    path = indexPath(database)
+
+    # 窗口统计用的逐期键少了一行
+    index = loadIndex(path)
+    index["pair_keys"] = index["pair_keys"][1:]
+    saveIndex(index, path)
+    assert loadIndex(path)["draws"] == 0
+
+    # 缺少字段
+    index = fullIndex(database)
+    del index["triple_last"]
+    saveIndex(index, path)
+    assert loadIndex(path)["draws"] == 0
+
+    assertSameIndex(refreshIndex(database), fullIndex(database))
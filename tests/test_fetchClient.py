@@ -0,0 +1,165 @@
+import asyncio
+
+import httpx
+import pytest
+
+from utils.fetchClient import FetchClient
+
+
+def makeClient(handler, **kwargs):
+    """使用MockTransport的客户端：不访问网络，重试不等待，请求头不读取UA池"""
+    kwargs.setdefault("validators_path", None)
+    return FetchClient(headers={}, backoff=0, transport=httpx.MockTransport(handler), **kwargs)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def etagHandler(requests, body=b'{"result": []}', etag='"v1"'):
+    """记录请求；带上匹配的If-None-Match时返回304，否则返回200和ETag"""
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, content=body, headers={"ETag": etag})
+    return handler
+
+
+def test_not_modified_after_validators_saved():
+    requests = []
+
+    async def scenario():
+        async with makeClient(etagHandler(requests)) as client:
+            first = await client.fetch_page(1, 30)
+            client.saveValidators()
+            second = await client.fetch_page(1, 30)
+        return first, second
+
+    first, second = run(scenario())
+    assert first == b'{"result": []}'
+    assert second is None
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+
+
+def test_validators_pending_until_saved():
+    requests = []
+
+    async def scenario():
+        async with makeClient(etagHandler(requests)) as client:
+            await client.fetch_page(1, 30)
+            return await client.fetch_page(1, 30)
+
+    # 入库成功前不使用新的ETag，否则入库失败后会因304漏掉这批数据
+    assert run(scenario()) == b'{"result": []}'
+    assert "If-None-Match" not in requests[1].headers
+
+
+def test_validators_persisted_across_clients(tmp_path):
+    requests = []
+    path = str(tmp_path / "fetch_validators.json")
+
+    async def scenario():
+        async with makeClient(etagHandler(requests), validators_path=path) as client:
+            await client.fetch_page(1, 30)
+            client.saveValidators()
+        async with makeClient(etagHandler(requests), validators_path=path) as client:
+            return await client.fetch_page(1, 30)
+
+    assert run(scenario()) is None
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+
+
+def test_unconditional_request_ignores_validators():
+    requests = []
+
+    async def scenario():
+        async with makeClient(etagHandler(requests)) as client:
+            await client.fetch_page(1, 30)
+            client.saveValidators()
+            return await client.fetch_page(1, 30, conditional=False)
+
+    assert run(scenario()) == b'{"result": []}'
+    assert "If-None-Match" not in requests[1].headers
+
+
+def test_retries_transient_server_errors():
+    statuses = [503, 502, 200]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(statuses[len(requests) - 1], content=b"ok")
+
+    async def scenario():
+        async with makeClient(handler, retries=3) as client:
+            return await client.fetch_page(1, 30)
+
+    assert run(scenario()) == b"ok"
+    assert len(requests) == 3
+
+
+def test_retries_transport_errors():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, content=b"ok")
+
+    async def scenario():
+        async with makeClient(handler) as client:
+            return await client.fetch_page(1, 30)
+
+    assert run(scenario()) == b"ok"
+    assert len(requests) == 2
+
+
+def test_raises_after_retries_exhausted():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(500)
+
+    async def scenario():
+        async with makeClient(handler, retries=2) as client:
+            return await client.fetch_page(1, 30)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(scenario())
+    assert len(requests) == 3
+
+
+def test_client_errors_are_not_retried():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(404)
+
+    async def scenario():
+        async with makeClient(handler) as client:
+            return await client.fetch_page(1, 30)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(scenario())
+    assert len(requests) == 1
+
+
+def test_iter_pages_yields_every_page_once():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=request.url.params["pageNo"].encode())
+
+    async def scenario():
+        async with makeClient(handler) as client:
+            return [page async for page in client.iter_pages(range(2, 12), 30, concurrency=3)]
+
+    pages = run(scenario())
+    assert sorted(pages) == [(page_no, str(page_no).encode()) for page_no in range(2, 12)]
+    assert len(requests) == 10
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from tests.synthetic import syntheticDrawItems
+from utils.EncodeJsonTOSQL import LotteryIngest, insert_lottery_items
+from utils.codePredict import latestCode
+from utils.fetchClient import FetchClient
+from utils.getCodes import syncNetworkCodes
+
+
+class DrawNoticeStub:
+    """开奖公告接口的桩：按pageNo/pageSize分页返回items（从新到旧），每页带ETag，匹配时返回304"""
+
+    def __init__(self, items):
+        self.items = items
+        self.requests = []
+
+    def __call__(self, request):
+        page_no = int(request.url.params["pageNo"])
+        page_size = int(request.url.params["pageSize"])
+        self.requests.append((page_no, page_size))
+        page = self.items[(page_no - 1) * page_size:page_no * page_size]
+        etag = f'"{page[0]["code"] if page else "empty"}-{len(page)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        body = json.dumps({"state": 0, "total": len(self.items), "result": page}, ensure_ascii=False)
+        return httpx.Response(200, content=body.encode("utf-8"), headers={"ETag": etag})
+
+    def pages(self):
+        return [page_no for page_no, _ in self.requests]
+
+
+def sync(stub, db_path, page_size=None):
+    async def scenario():
+        async with FetchClient(headers={}, backoff=0, validators_path=None,
+                               transport=httpx.MockTransport(stub)) as client:
+            first = await syncNetworkCodes(client, db_path, page_size)
+            second = await syncNetworkCodes(client, db_path, page_size)
+        return first, second
+    return asyncio.run(scenario())
+
+
+def test_incremental_sync_stops_at_latest_stored_code(database):
+    items = syntheticDrawItems(20)
+    insert_lottery_items(items[5:], database)
+    stub = DrawNoticeStub(items)
+
+    first, second = sync(stub, database, page_size=3)
+
+    # 5期新开奖分布在前两页，第2页遇到已入库的期号即停止，不再请求第3页
+    assert first == 5
+    assert latestCode(database) == items[0]["code"]
+    assert stub.pages()[:2] == [1, 2]
+    # 第二次同步第一页的ETag未变，服务端返回304，不再翻页
+    assert second == 0
+    assert stub.pages()[2:] == [1]
+
+
+def test_incremental_sync_without_new_draws(database):
+    items = syntheticDrawItems(10)
+    insert_lottery_items(items, database)
+    stub = DrawNoticeStub(items)
+
+    first, second = sync(stub, database, page_size=3)
+
+    assert first == 0
+    assert second == 0
+    # 第一页的第一条就是已知期号；首次同步成功后记录ETag，第二次得到304
+    assert stub.pages() == [1, 1]
+
+
+def test_initial_sync_fetches_all_pages(database):
+    items = syntheticDrawItems(10)
+    stub = DrawNoticeStub(items)
+
+    first, second = sync(stub, database, page_size=4)
+
+    assert first == 10
+    assert latestCode(database) == items[0]["code"]
+    assert sorted(stub.pages()[:3]) == [1, 2, 3]
+    assert second == 0
+
+
+def test_pages_are_written_as_they_arrive(database, monkeypatch):
+    items = syntheticDrawItems(10)
+    stub = DrawNoticeStub(items)
+    writes = []
+    write = LotteryIngest.write
+
+    def recordingWrite(self, page):
+        count = write(self, page)
+        writes.append(count)
+        return count
+
+    monkeypatch.setattr(LotteryIngest, "write", recordingWrite)
+    first, _ = sync(stub, database, page_size=4)
+
+    # 每页单独写入，不先汇总全部条目
+    assert first == 10
+    assert sorted(writes[:3]) == [2, 4, 4]
+
+
+def test_failed_page_rolls_back_initial_sync(database):
+    items = syntheticDrawItems(10)
+    stub = DrawNoticeStub(items)
+
+    def handler(request):
+        if request.url.params["pageNo"] == "3":
+            return httpx.Response(404)
+        return stub(request)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        sync(handler, database, page_size=4)
+    # 已写入的页随事务回滚，下次同步仍从空库开始全量回填
+    assert latestCode(database) == ""
@@ -0,0 +1,70 @@
+from itertools import chain, combinations
+
+import numpy as np
+import pytest
+
+from utils.codeCheck import PRIZE_LEVELS, TIER_TABLE, popcount, redMasks
+from utils.codeRank import BLUE_COUNT, RED_COMBOS, RED_COUNT, RED_PICK
+from utils.prizeOdds import TICKET_EXPECTED, betOdds
+
+# 全部C(33, 6)种红球开奖结果的掩码
+DRAW_MASKS = redMasks(np.fromiter(chain.from_iterable(combinations(range(1, RED_COUNT + 1), RED_PICK)),
+                                  dtype=np.uint64, count=RED_COMBOS * RED_PICK).reshape(-1, RED_PICK))
+
+
+def bruteForceOdds(bankers, drags, blues):
+    """逐一枚举C(33, 6) * 16种开奖结果，统计各奖级的期望中奖注数和至少中一注的概率
+
+    胆码为1..bankers号，拖码为其后的drags个号码，蓝球为1..blues号（编号无关紧要）。
+    """
+    reds = list(range(1, bankers + drags + 1))
+    red_tickets = [reds[:bankers] + list(rest) for rest in combinations(reds[bankers:], RED_PICK - bankers)]
+    hits = popcount(DRAW_MASKS & redMasks(red_tickets)[:, None])
+
+    # 每注的奖级只取决于红球命中数和蓝球是否命中：tiers[蓝球是否命中]的形状为(红球组数, C(33, 6))
+    tiers = [TIER_TABLE[hits, blue_hit] for blue_hit in (0, 1)]
+    tier_counts = [np.bincount(table.ravel(), minlength=PRIZE_LEVELS + 1) for table in tiers]
+    tier_present = [np.bitwise_or.reduce(np.left_shift(np.uint8(1), table), axis=0) for table in tiers]
+
+    counts = np.zeros(PRIZE_LEVELS + 1)
+    won = np.zeros(PRIZE_LEVELS + 1)
+    # 开出的蓝球不在所选蓝球中时结果都相同，只算一次并按这样的蓝球个数计权
+    weights = [1] * blues + [BLUE_COUNT - blues]
+    for drawn_blue, weight in enumerate(weights):
+        blue_hits = [int(blue == drawn_blue) for blue in range(blues)]
+        counts += weight * sum(tier_counts[blue_hit] for blue_hit in blue_hits)
+        present = np.bitwise_or.reduce([tier_present[blue_hit] for blue_hit in set(blue_hits)])
+        won[1:] += [weight * np.count_nonzero(present >> tier & 1) for tier in range(1, PRIZE_LEVELS + 1)]
+        won[0] += weight * np.count_nonzero(present == 1)
+
+    outcomes = len(DRAW_MASKS) * BLUE_COUNT
+    return len(red_tickets) * blues, counts / outcomes, won / outcomes
+
+
+@pytest.mark.parametrize("bankers, drags, blues", [
+    (0, 6, 1),    # 单式
+    (0, 8, 2),    # 复式
+    (2, 6, 3),    # 胆拖
+])
+def test_bet_odds_match_brute_force(bankers, drags, blues):
+    tickets, expected, probability = bruteForceOdds(bankers, drags, blues)
+
+    odds = betOdds(bankers, drags, blues)
+
+    assert odds["tickets"] == tickets
+    assert odds["cost"] == 2 * tickets
+    np.testing.assert_allclose(odds["expected"], expected, rtol=1e-12, atol=1e-18)
+    np.testing.assert_allclose(odds["probability"], probability, rtol=1e-12, atol=1e-18)
+    assert odds["expected"].sum() == pytest.approx(tickets)
+
+
+def test_single_ticket_expected_is_tier_probability():
+    # 单式一注：一等奖概率为1 / (C(33, 6) * 16)，期望注数与中奖概率相同
+    assert TICKET_EXPECTED[1] == pytest.approx(1 / (RED_COMBOS * BLUE_COUNT), rel=1e-12)
+    np.testing.assert_allclose(TICKET_EXPECTED, betOdds()["probability"], rtol=1e-12)
+
+
+@pytest.mark.parametrize("bankers, drags, blues", [(6, 1, 1), (0, 5, 1), (3, 31, 1), (0, 6, 0), (0, 6, 17)])
+def test_bet_odds_rejects_invalid_bets(bankers, drags, blues):
+    with pytest.raises(ValueError):
+        betOdds(bankers, drags, blues)
@@ -1,64 +1,41 @@
+import codecs
 import json
+import re
 import sqlite3
-import os
 from datetime import datetime
+from itertools import islice
 
+from init.SQL_init import initialize_database, parse_amount, typed_draw_values
+from utils.codePredict import refreshStats
+from utils.cooccurrence import refreshIndex
+from utils.dbConnection import transaction
+from utils.drawSnapshot import writeSnapshot
+from utils.metrics import increment, timed
+from utils.paths import DB_PATH
 
-def create_database(db_path="../data/lottery_data.db"):
-    """创建SQLite数据库和表结构"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # 创建双色球数据表
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS double_color_ball (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        code TEXT UNIQUE,
-        details_link TEXT,
-        video_link TEXT,
-        draw_date TEXT,
-        week TEXT,
-        red_balls TEXT,
-        blue_ball TEXT,
-        blue_ball2 TEXT,
-        sales_amount TEXT,
-        pool_money TEXT,
-        winning_content TEXT,
-        add_money TEXT,
-        add_money2 TEXT,
-        msg TEXT,
-        z2add TEXT,
-        m2add TEXT,
-        create_time TEXT
-    )
-    ''')
-
-    # 创建奖级表
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS prize_grades (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        lottery_code TEXT,
-        prize_type INTEGER,
-        prize_type_num TEXT,
-        prize_money TEXT,
-        FOREIGN KEY (lottery_code) REFERENCES double_color_ball (code)
-    )
-    ''')
-
-    conn.commit()
-    conn.close()
-    print(f"数据库和表结构创建成功，保存至: {db_path}")
-    return db_path
+# 流式入库时每批executemany的开奖条目数，内存占用只与批大小有关
+INGEST_BATCH_SIZE = 200
 
+# 流式解析时每次从响应中读取的字节数
+STREAM_READ_SIZE = 1 << 16
 
+# result数组的起始位置
+RESULT_ARRAY = re.compile(r'"result"\s*:\s*\[')
+
+
+@timed("ingest_seconds", step="parse_json")
 def parse_lottery_data(json_data):
     """解析JSON数据并返回可插入数据库的格式"""
     data = json.loads(json_data)
+    return parse_lottery_items(data.get("result", []))
+
+
+def parse_lottery_items(items):
+    """解析接口返回的result条目列表并返回可插入数据库的格式"""
     lottery_records = []
     prize_grade_records = []
 
-    for item in data.get("result", []):
+    for item in items:
         # 处理双色球基本信息
         lottery_record = (
             item.get("name"),
@@ -78,7 +55,15 @@ def parse_lottery_data(json_data):
             item.get("msg"),
             item.get("z2add"),
             item.get("m2add"),
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            # 类型化列：r1-r6、blue、draw_day、sales、pool、red_mask
+            *typed_draw_values(
+                item.get("red"),
+                item.get("blue"),
+                item.get("date"),
+                item.get("sales"),
+                item.get("poolmoney")
+            )
         )
         lottery_records.append(lottery_record)
 
@@ -89,55 +74,258 @@ def parse_lottery_data(json_data):
                 item.get("code"),
                 grade.get("type"),
                 grade.get("typenum"),
-                grade.get("typemoney")
+                grade.get("typemoney"),
+                parse_amount(grade.get("typenum")),
+                parse_amount(grade.get("typemoney"))
             )
             prize_grade_records.append(prize_record)
 
     return lottery_records, prize_grade_records
 
 
-def insert_data_to_database(json_data, db_path="../data/lottery_data.db"):
+def insert_data_to_database(json_data, db_path=DB_PATH):
     """将解析后的数据插入数据库"""
-    if not os.path.exists(db_path):
-        create_database(db_path)
+    insert_lottery_items(json.loads(json_data).get("result", []), db_path)
 
-    lottery_records, prize_grade_records = parse_lottery_data(json_data)
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def insert_lottery_items(items, db_path=DB_PATH, batch_size=INGEST_BATCH_SIZE):
+    """将接口返回的result条目分批插入数据库
 
+    items可以是任意可迭代对象（如iter_result_items的流式结果），每凑满batch_size条解析并执行一次
+    executemany，全部批次在同一个事务中提交。已存在的期号和奖级按upsert更新，内容相同的行不会被改写，
+    重复同步结果不变。没有任何行新增或变化时（例如开奖日的定时同步未取到新开奖）不重新生成快照和统计缓存。
+    数据库需已由initialize_database（启动时的bootstrap）初始化。
+
+    返回:
+        int: 处理的开奖条目数，出错时为0
+    """
     try:
-        # 插入双色球基本信息
-        cursor.executemany('''
-        INSERT OR IGNORE INTO double_color_ball (
-            name, code, details_link, video_link, draw_date, week, 
-            red_balls, blue_ball, blue_ball2, sales_amount, pool_money, 
-            winning_content, add_money, add_money2, msg, z2add, m2add, create_time
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', lottery_records)
-
-        # 插入奖级信息
-        cursor.executemany('''
-        INSERT INTO prize_grades (
-            lottery_code, prize_type, prize_type_num, prize_money
-        ) VALUES (?, ?, ?, ?)
-        ''', prize_grade_records)
-
-        conn.commit()
-        print(f"成功插入 {len(lottery_records)} 条双色球记录和 {len(prize_grade_records)} 条奖级记录")
+        with LotteryIngest(db_path, batch_size) as ingest:
+            ingest.write(items)
     except sqlite3.Error as e:
         print(f"插入数据时出错: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        increment("ingest_errors_total")
+        return 0
+    return ingest.lottery_count
+
+
+class LotteryIngest:
+    """入库会话：多次写入的result条目在同一个事务中提交
+
+    逐页到达的同步数据每到一页就调用一次write，不需要先把全部条目收集到列表中，
+    内存占用只与一页和一批有关；全部条目要么都入库要么都不入库，与一次性调用insert_lottery_items相同。
+    退出时提交事务，有行新增或变化时重新生成列式快照并增量刷新统计缓存。
+
+    用法:
+        with LotteryIngest(db_path) as ingest:
+            for stream in pages:
+                ingest.write(iter_result_items(stream))
+        count = ingest.lottery_count
+
+    异常:
+        sqlite3.Error: 写入或提交失败时抛出，事务已回滚
+    """
+
+    def __init__(self, db_path=DB_PATH, batch_size=INGEST_BATCH_SIZE):
+        """
+        参数:
+            db_path (str): 数据库路径
+            batch_size (int): 每批executemany的开奖条目数
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.lottery_count = self.prize_count = 0
+        self._transaction = None
+        self._cursor = None
+        self._changes = 0
+
+    def __enter__(self):
+        self._transaction = transaction(self.db_path)
+        conn = self._transaction.__enter__()
+        self._cursor = conn.cursor()
+        self._changes = conn.total_changes
+        return self
+
+    def write(self, items):
+        """在会话的事务中分批写入result条目，items可以是任意可迭代对象
+
+        返回:
+            int: 本次写入的开奖条目数
+        """
+        items = iter(items)
+        count = 0
+        while True:
+            # 流式输入时读取和解码JSON的耗时也计入read
+            with timed("ingest_seconds", step="read"):
+                batch = list(islice(items, self.batch_size))
+            if not batch:
+                break
+            with timed("ingest_seconds", step="parse"):
+                lottery_records, prize_grade_records = parse_lottery_items(batch)
+            with timed("ingest_seconds", step="write"):
+                write_lottery_records(self._cursor, lottery_records, prize_grade_records)
+            count += len(lottery_records)
+            self.prize_count += len(prize_grade_records)
+        self.lottery_count += count
+        return count
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        changes = self._cursor.connection.total_changes - self._changes
+        self._cursor = None
+        # 正常退出时提交，出现异常时回滚并继续抛出
+        self._transaction.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+
+        if self.lottery_count:
+            print(f"成功写入 {self.lottery_count} 条双色球记录和 {self.prize_count} 条奖级记录")
+        increment("ingested_draws_total", self.lottery_count)
+        increment("ingested_prize_grades_total", self.prize_count)
+        if changes == 0:
+            return False
+
+        # 有新数据入库后重新生成列式快照，页面和生成模式都从快照读取
+        with timed("ingest_seconds", step="write_snapshot"):
+            writeSnapshot(self.db_path)
+
+        # 增量刷新预测模式的统计缓存和红球同出索引，只累加新入库的开奖结果
+        with timed("ingest_seconds", step="refresh_stats"):
+            refreshStats(self.db_path)
+            refreshIndex(self.db_path)
+        return False
+
+
+def write_lottery_records(cursor, lottery_records, prize_grade_records):
+    """执行一批开奖记录和奖级记录的upsert，由调用方负责事务"""
+    # 插入或更新双色球基本信息（首次入库时间保持不变）
+    cursor.executemany('''
+    INSERT INTO double_color_ball (
+        name, code, details_link, video_link, draw_date, week, 
+        red_balls, blue_ball, blue_ball2, sales_amount, pool_money, 
+        winning_content, add_money, add_money2, msg, z2add, m2add, create_time,
+        r1, r2, r3, r4, r5, r6, blue, draw_day, sales, pool, red_mask
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+              ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (code) DO UPDATE SET
+        sales_amount = excluded.sales_amount,
+        pool_money = excluded.pool_money,
+        winning_content = excluded.winning_content,
+        add_money = excluded.add_money,
+        add_money2 = excluded.add_money2,
+        msg = excluded.msg,
+        z2add = excluded.z2add,
+        m2add = excluded.m2add,
+        sales = excluded.sales,
+        pool = excluded.pool
+    WHERE (sales_amount, pool_money, winning_content, add_money, add_money2, msg, z2add, m2add, sales, pool)
+        IS NOT (excluded.sales_amount, excluded.pool_money, excluded.winning_content, excluded.add_money,
+                excluded.add_money2, excluded.msg, excluded.z2add, excluded.m2add, excluded.sales, excluded.pool)
+    ''', lottery_records)
+
+    # 插入或更新奖级信息，每期每个奖级只有一行，重复同步不会产生重复记录
+    cursor.executemany('''
+    INSERT INTO prize_grades (
+        lottery_code, prize_type, prize_type_num, prize_money,
+        prize_count, prize_amount
+    ) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (lottery_code, prize_type) DO UPDATE SET
+        prize_type_num = excluded.prize_type_num,
+        prize_money = excluded.prize_money,
+        prize_count = excluded.prize_count,
+        prize_amount = excluded.prize_amount
+    WHERE (prize_type_num, prize_money, prize_count, prize_amount)
+        IS NOT (excluded.prize_type_num, excluded.prize_money, excluded.prize_count, excluded.prize_amount)
+    ''', prize_grade_records)
+
+
+def iter_result_items(stream):
+    """从JSON字节流（或文本流）中逐条解析出result数组的条目
+
+    安装了ijson时使用ijson的增量解析；否则按块读取，定位到"result"数组后
+    用JSONDecoder.raw_decode逐个解码数组元素，已解码的部分随即丢弃，
+    缓冲区只需容纳一个条目和一个读取块。
+
+    参数:
+        stream: 具有read(size)方法的对象，例如文件或HTTP响应的原始流
+    """
+    try:
+        import ijson
+    except ImportError:
+        return _iter_result_items_raw(stream)
+    return ijson.items(stream, "result.item")
+
+
+def _iter_result_items_raw(stream, read_size=STREAM_READ_SIZE):
+    """iter_result_items在没有ijson时的实现
+
+    假定"result"之前的字段值中不出现"result": [这样的文本，接口的返回格式满足这一点。
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    eof = False
+
+    def read_more():
+        nonlocal buffer, eof
+        chunk = stream.read(read_size)
+        if not chunk:
+            eof = True
+            buffer += text_decoder.decode(b"", final=True)
+        elif isinstance(chunk, str):
+            buffer += chunk
+        else:
+            buffer += text_decoder.decode(chunk)
+
+    # 定位result数组，未找到时只保留末尾一小段，防止键名被块边界切开
+    match = RESULT_ARRAY.search(buffer)
+    while match is None:
+        if eof:
+            return
+        buffer = buffer[-64:]
+        read_more()
+        match = RESULT_ARRAY.search(buffer)
+    pos = match.end()
+
+    while True:
+        # 跳过元素之间的空白和逗号
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            read_more()
+        if pos >= len(buffer):
+            raise json.JSONDecodeError("result数组不完整", buffer, pos)
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # 元素被块边界切开，读取更多数据后重试
+            if eof:
+                raise
+            read_more()
+            continue
+        yield item
+        buffer = buffer[end:]
+        pos = 0
+
+
+def ingest_json_stream(stream, db_path=DB_PATH, batch_size=INGEST_BATCH_SIZE):
+    """直接从接口响应或文件的字节流入库，不落地临时文件，也不整体加载JSON
+
+    返回:
+        int: 处理的开奖条目数
+    """
+    return insert_lottery_items(iter_result_items(stream), db_path, batch_size)
 
 
-def process_json_file(file_path, db_path="../data/lottery_data.db"):
+def process_json_file(file_path, db_path=DB_PATH):
     """处理JSON文件并导入数据库"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            json_data = f.read()
-        insert_data_to_database(json_data, db_path)
+        with open(file_path, 'rb') as f:
+            ingest_json_stream(f, db_path)
     except FileNotFoundError:
         print(f"文件不存在: {file_path}")
     except json.JSONDecodeError as e:
@@ -157,4 +345,5 @@ if __name__ == "__main__":
     '''
 
     # 插入数据到数据库
+    initialize_database()
     insert_data_to_database(json_data)
\ No newline at end of file
@@ -1,72 +1,190 @@
+import json
+import os
 import random
+import threading
 import time
-from typing import Dict, List
-import requests
-from fake_useragent import UserAgent
+from typing import Dict, List, Optional
+
+from utils.paths import DATA_DIR
+
+# User-Agent快照文件，保存上一次由fake-useragent生成的列表，启动时直接读取
+UA_SNAPSHOT_PATH = os.path.join(DATA_DIR, "user_agents.json")
+
+# 每种浏览器从fake-useragent生成的User-Agent个数
+UA_PER_BROWSER = 5
+
+# 浏览器类型与User-Agent中的关键词，任一关键词出现即归入该类型
+BROWSER_KEYWORDS = {
+    "chrome": ("Chrome",),
+    "firefox": ("Firefox",),
+    "safari": ("Safari",),
+    "edge": ("Edg",),
+    "android": ("Android",),
+    "ios": ("iPhone", "iPad", "iPod"),
+}
+
+# 内置的User-Agent列表
+BUILTIN_USER_AGENTS = [
+    # Chrome浏览器
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
+
+    # Firefox浏览器
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:90.0) Gecko/20100101 Firefox/90.0",
+    "Mozilla/5.0 (X11; Linux i686; rv:89.0) Gecko/20100101 Firefox/89.0",
+
+    # Safari浏览器
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPad; CPU OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1",
+
+    # Edge浏览器
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Edg/91.0.864.59",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36 Edg/92.0.902.55",
+
+    # 移动设备
+    "Mozilla/5.0 (Linux; Android 10; SM-G981B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPad; CPU OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1"
+]
 
 
 class RequestHeaderPool:
-    """请求头池类，用于管理和生成随机请求头"""
+    """请求头池类，用于管理和生成随机请求头
 
-    def __init__(self, use_fake_useragent: bool = True, refresh_interval: int = 86400):
+    User-Agent列表按需加载：先读取磁盘快照，没有快照时使用内置列表，都不需要等待；
+    快照不存在或已过期时在后台线程中用fake-useragent重新生成并写回快照。
+    每次列表更新时预先按浏览器类型建立索引，取请求头时只做一次随机选择和字典复制。
+
+    进程内通常通过RequestHeaderPool.shared()共用一个实例。
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, use_fake_useragent: bool = True, refresh_interval: int = 86400,
+                 snapshot_path: Optional[str] = UA_SNAPSHOT_PATH):
         """
-        初始化请求头池
+        初始化请求头池，不加载任何User-Agent数据
 
         参数:
             use_fake_useragent: 是否使用fake-useragent生成随机UA，默认为True
             refresh_interval: 刷新User-Agent的间隔时间(秒)，默认为24小时
+            snapshot_path: User-Agent快照文件路径，为None时不读写快照
         """
         self.use_fake_useragent = use_fake_useragent
         self.refresh_interval = refresh_interval
+        self.snapshot_path = snapshot_path
         self.last_refresh_time = 0
-        self.user_agents = self._initialize_user_agents()
         self.common_headers = self._get_common_headers()
 
-    def _initialize_user_agents(self) -> List[str]:
-        """初始化User-Agent列表"""
-        if self.use_fake_useragent:
-            try:
-                ua = UserAgent()
-                # 生成不同浏览器的User-Agent
-                return [
-                    ua.chrome,
-                    ua.firefox,
-                    ua.safari,
-                    ua.ie,
-                    ua.opera,
-                    ua.android,
-                    ua.ios
-                ]
-            except Exception as e:
-                print(f"fake-useragent初始化失败: {e}，将使用内置User-Agent")
-                self.use_fake_useragent = False
-
-        # 内置的User-Agent列表
-        return [
-            # Chrome浏览器
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
-
-            # Firefox浏览器
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:90.0) Gecko/20100101 Firefox/90.0",
-            "Mozilla/5.0 (X11; Linux i686; rv:89.0) Gecko/20100101 Firefox/89.0",
-
-            # Safari浏览器
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1",
-            "Mozilla/5.0 (iPad; CPU OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1",
-
-            # Edge浏览器
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Edg/91.0.864.59",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36 Edg/92.0.902.55",
-
-            # 移动设备
-            "Mozilla/5.0 (Linux; Android 10; SM-G981B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Mobile Safari/537.36",
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1",
-            "Mozilla/5.0 (iPad; CPU OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1"
-        ]
+        self._user_agents = None
+        self._browser_index = {}
+        self._load_lock = threading.Lock()
+        self._refresh_thread = None
+
+    @classmethod
+    def shared(cls) -> "RequestHeaderPool":
+        """进程内共用的请求头池，首次调用时创建"""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @property
+    def user_agents(self) -> List[str]:
+        """当前的User-Agent列表，首次访问时加载"""
+        if self._user_agents is None:
+            self._load()
+        return self._user_agents
+
+    def _load(self) -> None:
+        """读取快照或内置列表，需要时启动后台刷新"""
+        with self._load_lock:
+            if self._user_agents is not None:
+                return
+            user_agents, created = self._read_snapshot()
+            self._set_user_agents(user_agents or BUILTIN_USER_AGENTS, created)
+        self._maybe_refresh()
+
+    def _read_snapshot(self):
+        """读取User-Agent快照，返回(列表, 生成时间)，不存在或损坏时返回(None, 0)"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None, 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            return list(snapshot["user_agents"]), float(snapshot["created"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"User-Agent快照读取失败: {e}，将使用内置User-Agent")
+            return None, 0
+
+    def _write_snapshot(self, user_agents: List[str], created: float) -> None:
+        """保存User-Agent快照，先写临时文件再替换"""
+        if not self.snapshot_path:
+            return
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"created": created, "user_agents": user_agents}, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.snapshot_path)
+
+    def _set_user_agents(self, user_agents: List[str], created: float) -> None:
+        """替换User-Agent列表并重建按浏览器类型的索引
+
+        先建好新的索引再一起替换引用，读取方看到的始终是一致的列表和索引
+        """
+        user_agents = tuple(dict.fromkeys(user_agents))
+        index = {
+            browser: tuple(ua for ua in user_agents if any(keyword in ua for keyword in keywords))
+            for browser, keywords in BROWSER_KEYWORDS.items()
+        }
+        self._browser_index = index
+        self._user_agents = user_agents
+        self.last_refresh_time = created
+
+    def _generate_user_agents(self) -> Optional[List[str]]:
+        """用fake-useragent生成User-Agent列表，失败时返回None"""
+        try:
+            from fake_useragent import UserAgent
+            ua = UserAgent()
+            user_agents = []
+            # 生成不同浏览器的User-Agent，当前版本不支持的浏览器类型跳过
+            for browser in ("chrome", "firefox", "safari", "edge", "opera", "android", "ios"):
+                for _ in range(UA_PER_BROWSER):
+                    try:
+                        user_agents.append(getattr(ua, browser))
+                    except Exception:
+                        break
+            return user_agents or None
+        except Exception as e:
+            print(f"fake-useragent初始化失败: {e}，将使用内置User-Agent")
+            self.use_fake_useragent = False
+            return None
+
+    def _refresh_worker(self) -> None:
+        """后台线程：生成新的User-Agent列表，写入快照后替换"""
+        user_agents = self._generate_user_agents()
+        now = time.time()
+        if user_agents:
+            self._write_snapshot(user_agents, now)
+            self._set_user_agents(user_agents, now)
+        else:
+            # 生成失败时也推迟下次刷新，避免每次请求都重试
+            self.last_refresh_time = now
+
+    def _maybe_refresh(self) -> None:
+        """列表过期时启动后台刷新，已有刷新在进行时不重复启动"""
+        if not self.use_fake_useragent or time.time() - self.last_refresh_time <= self.refresh_interval:
+            return
+        with self._load_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_worker, name="ua-refresh", daemon=True)
+            self._refresh_thread.start()
 
     def _get_common_headers(self) -> Dict[str, str]:
         """获取常用的请求头字段"""
@@ -81,10 +199,11 @@ class RequestHeaderPool:
         }
 
     def refresh_user_agents(self) -> None:
-        """刷新User-Agent列表"""
-        if self.use_fake_useragent and (time.time() - self.last_refresh_time > self.refresh_interval):
-            self.user_agents = self._initialize_user_agents()
-            self.last_refresh_time = time.time()
+        """刷新User-Agent列表：过期时在后台重新生成，不阻塞调用方"""
+        if self._user_agents is None:
+            self._load()
+        else:
+            self._maybe_refresh()
 
     def get_random_headers(self, additional_headers: Dict[str, str] = None) -> Dict[str, str]:
         """
@@ -102,7 +221,7 @@ class RequestHeaderPool:
         headers = self.common_headers.copy()
 
         # 添加随机User-Agent
-        headers["User-Agent"] = random.choice(self.user_agents)
+        headers["User-Agent"] = random.choice(self._user_agents)
 
         # 添加额外的请求头
         if additional_headers:
@@ -120,25 +239,15 @@ class RequestHeaderPool:
         返回:
             特定浏览器的请求头
         """
-        # 过滤出包含指定浏览器关键词的User-Agent
+        self.refresh_user_agents()
+
+        # 从预先建立的索引中取出该浏览器的User-Agent
         if browser:
-            browser_keywords = {
-                "chrome": "Chrome",
-                "firefox": "Firefox",
-                "safari": "Safari",
-                "edge": "Edg",
-                "android": "Android",
-                "ios": "iPhone|iPad|iPod"
-            }
-
-            keyword = browser_keywords.get(browser.lower())
-            if keyword:
-                filtered_uas = [ua for ua in self.user_agents if keyword in ua]
-                if filtered_uas:
-                    specific_ua = random.choice(filtered_uas)
-                    headers = self.common_headers.copy()
-                    headers["User-Agent"] = specific_ua
-                    return headers
+            candidates = self._browser_index.get(browser.lower())
+            if candidates:
+                headers = self.common_headers.copy()
+                headers["User-Agent"] = random.choice(candidates)
+                return headers
 
         # 如果指定的浏览器不存在或出错，返回随机请求头
         return self.get_random_headers()
@@ -146,8 +255,10 @@ class RequestHeaderPool:
 
 # 使用示例
 if __name__ == "__main__":
-    # 创建请求头池实例
-    header_pool = RequestHeaderPool()
+    import requests
+
+    # 获取进程内共用的请求头池
+    header_pool = RequestHeaderPool.shared()
 
     # 获取随机请求头
     random_headers = header_pool.get_random_headers()
@@ -178,4 +289,4 @@ if __name__ == "__main__":
         print("\n请求结果:")
         print(response.text)
     except Exception as e:
-        print(f"请求出错: {e}")
\ No newline at end of file
+        print(f"请求出错: {e}")
@@ -0,0 +1,228 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.codeBatch import codeBatchGenerate
+from utils.codeBitmap import CodeBitmap
+from utils.codeCheck import PRIZE_LEVELS, TICKET_PRICE, scoreTickets
+from utils.codePredict import buildTables, codePredictGenerate, emptyStats, updateStats
+from utils.codeRank import rankCodes
+from utils.cooccurrence import emptyIndex, updateIndex
+from utils.drawSnapshot import drawRange, loadSnapshot
+from utils.metrics import timed
+from utils.paths import DATA_DIR, DB_PATH
+
+# 可回测的出号模式。不重复模式的结果取决于持久化位图中全部历史出号，无法按期独立回放
+STRATEGY_NAMES = {1: "普通模式", 2: "预测模式"}
+
+# 每期每种模式的出号组数
+DEFAULT_TICKETS = 10
+
+# 回测起点之前至少需要的历史期数，预测模式的统计需要足够的样本
+MIN_HISTORY = 100
+
+# 每个任务回放的期数，也是断点保存的粒度
+RANGE_SIZE = 100
+
+# 默认的断点文件
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "backtest_checkpoint.npz")
+
+# 回放方式的版本，每期的出号方式变化时加1，旧版本的断点会被忽略
+CHECKPOINT_FORMAT = 2
+
+
+def backtestRange(db_path, start, stop, strategies, tickets, seed):
+    """回放快照中第start至stop-1期
+
+    每一期只使用该期之前的开奖数据出号：预测模式的统计和同出索引先累加前start期，之后每回放一期再累加这一期，
+    概率表每期只构建一次，供该期出号使用。
+    号码的随机种子由(seed, 模式, 期序号)确定，结果与任务划分和进程数无关。
+    每期只需几组号码，直接调用批量引擎出号，不经过流式接口的分块和每块的初始化；
+    预测模式的查重位图在各期之间复用，每期出号后清除本期写入的位。
+    全部号码生成后一次性向量化对奖。
+
+    返回:
+        tuple: (start, 形状为(期数, 模式数, 7)的各奖级中奖注数，第0列为未中奖)
+    """
+    snapshot = loadSnapshot(db_path)
+    codes, reds, blues = snapshot["codes"], snapshot["reds"], snapshot["blues"]
+
+    stats = pair_index = bitmap = None
+    if 2 in strategies:
+        code = str(codes[start - 1]) if start else ""
+        stats = updateStats(emptyStats(), reds[:start], blues[:start], code)
+        pair_index = updateIndex(emptyIndex(), reds[:start], code)
+        bitmap = CodeBitmap()
+
+    per_step = len(strategies) * tickets
+    batch = np.empty(((stop - start) * per_step, 7), dtype=np.uint8)
+    for step, index in enumerate(range(start, stop)):
+        tables = buildTables(stats, pair_index["pair_count"]) if stats is not None else None
+        for k, strategy in enumerate(strategies):
+            offset = step * per_step + k * tickets
+            if strategy == 2:
+                block = codePredictGenerate(tickets, [seed, strategy, index], bitmap, tables=tables)
+                bitmap.remove(rankCodes(block))
+            else:
+                block = codeBatchGenerate(tickets, [seed, strategy, index])
+            batch[offset:offset + tickets] = block
+        if stats is not None:
+            updateStats(stats, reds[index:index + 1], blues[index:index + 1], str(codes[index]))
+            updateIndex(pair_index, reds[index:index + 1], str(codes[index]))
+
+    # 每组号码与其所在期的开奖比较
+    draw_index = np.repeat(np.arange(start, stop), per_step)
+    with timed("backtest_score_seconds"):
+        tiers = scoreTickets(batch, snapshot["red_masks"][draw_index], blues[draw_index])
+    group = np.repeat(np.arange((stop - start) * len(strategies)), tickets)
+    counts = np.bincount(group * (PRIZE_LEVELS + 1) + tiers,
+                         minlength=(stop - start) * len(strategies) * (PRIZE_LEVELS + 1))
+    return start, counts.reshape(stop - start, len(strategies), PRIZE_LEVELS + 1).astype(np.int32)
+
+
+def loadCheckpoint(path, config):
+    """读取断点中已完成的区间，配置不一致或文件损坏时返回空字典
+
+    返回:
+        dict: {区间起点: 该区间的中奖注数数组}
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with np.load(path) as data:
+            if json.loads(str(data["config"])) != config:
+                print("回测配置或开奖数据已变化，忽略已有断点")
+                return {}
+            return {int(key.split("/")[1]): data[key] for key in data.files if key.startswith("range/")}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"回测断点读取失败: {e}，将从头开始")
+        return {}
+
+
+def saveCheckpoint(path, config, done):
+    """保存已完成的区间，先写临时文件再替换"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    arrays = {f"range/{start}": counts for start, counts in done.items()}
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, config=np.array(json.dumps(config, sort_keys=True)), **arrays)
+    os.replace(temp_path, path)
+
+
+def backtest(strategies=(1, 2), tickets=DEFAULT_TICKETS, seed=0, db_path=DB_PATH, start_code=None,
+             end_code=None, min_history=MIN_HISTORY, workers=None, range_size=RANGE_SIZE, checkpoint_path=None):
+    """按期号顺序回放历史开奖，统计各出号模式的中奖情况
+
+    参数:
+        strategies (iterable): 出号模式，见STRATEGY_NAMES
+        tickets (int): 每期每种模式的出号组数
+        seed (int): 随机种子，相同种子得到相同结果
+        db_path (str): 数据库路径，开奖数据读取自其列式快照
+        start_code (str | None): 起始期号（含），不早于第min_history+1期
+        end_code (str | None): 结束期号（含）
+        min_history (int): 起点之前至少需要的历史期数
+        workers (int | None): 进程数，默认使用全部CPU核心，为1时在当前进程内执行
+        range_size (int): 每个任务回放的期数
+        checkpoint_path (str | None): 断点文件，每完成一个区间保存一次，再次运行时跳过已完成的区间
+
+    返回:
+        dict:
+            codes: 回放的期号
+            strategies: 出号模式
+            tickets: 每期每种模式的出号组数
+            tier_counts: 形状为(期数, 模式数, 7)的各奖级中奖注数
+            payout: 形状为(期数, 模式数)的每期奖金(元)，按prize_grades中的单注奖金计算
+
+    异常:
+        ValueError: 模式不可回测时抛出
+    """
+    strategies = tuple(strategies)
+    unknown = [strategy for strategy in strategies if strategy not in STRATEGY_NAMES]
+    if unknown:
+        raise ValueError(f"不支持回测的模式: {unknown}，可选 {sorted(STRATEGY_NAMES)}")
+
+    snapshot = loadSnapshot(db_path)
+    rows = drawRange(snapshot, start_code, end_code)
+    start, stop = max(rows.start, min_history), rows.stop
+    config = {
+        "format": CHECKPOINT_FORMAT,
+        "strategies": list(strategies),
+        "tickets": tickets,
+        "seed": seed,
+        "start": start,
+        "stop": stop,
+        "range_size": range_size,
+        "code": snapshot["code"],
+    }
+
+    done = loadCheckpoint(checkpoint_path, config)
+    tasks = [(begin, min(begin + range_size, stop)) for begin in range(start, stop, range_size) if begin not in done]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    def finish(begin, counts):
+        done[begin] = counts
+        if checkpoint_path:
+            saveCheckpoint(checkpoint_path, config, done)
+
+    if workers <= 1:
+        for begin, end in tasks:
+            finish(*backtestRange(db_path, begin, end, strategies, tickets, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(backtestRange, db_path, begin, end, strategies, tickets, seed)
+                       for begin, end in tasks]
+            for future in as_completed(futures):
+                finish(*future.result())
+
+    shape = (0, len(strategies), PRIZE_LEVELS + 1)
+    tier_counts = np.concatenate([done[begin] for begin in sorted(done)]) if done else np.zeros(shape, np.int32)
+    payouts = snapshot["payouts"][start:stop]
+    return {
+        "codes": snapshot["codes"][start:stop],
+        "strategies": strategies,
+        "tickets": tickets,
+        "tier_counts": tier_counts,
+        "payout": np.einsum("nst,nt->ns", tier_counts.astype(np.int64), payouts),
+    }
+
+
+def summarizeBacktest(result):
+    """各模式的回测汇总表：投入、奖金、返奖率和各奖级中奖注数"""
+    draws = len(result["codes"])
+    cost = draws * result["tickets"] * TICKET_PRICE
+    tier_totals = result["tier_counts"].sum(axis=0)
+    summary = pd.DataFrame({
+        "模式": [STRATEGY_NAMES[strategy] for strategy in result["strategies"]],
+        "期数": draws,
+        "投入(元)": cost,
+        "奖金(元)": result["payout"].sum(axis=0),
+    })
+    summary["返奖率"] = summary["奖金(元)"] / cost if cost else 0.0
+    for tier in range(1, PRIZE_LEVELS + 1):
+        summary[f"{tier}等奖"] = tier_totals[:, tier]
+    return summary
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="出号模式的历史回测")
+    parser.add_argument("--strategies", type=int, nargs="+", default=list(STRATEGY_NAMES), help="出号模式")
+    parser.add_argument("--tickets", type=int, default=DEFAULT_TICKETS, help="每期每种模式的出号组数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--start", help="起始期号")
+    parser.add_argument("--end", help="结束期号")
+    parser.add_argument("--workers", type=int, help="进程数")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="断点文件")
+    args = parser.parse_args()
+
+    from init.bootstrap import bootstrap
+    bootstrap(warm=False)
+    report = backtest(args.strategies, args.tickets, args.seed, start_code=args.start, end_code=args.end,
+                      workers=args.workers, checkpoint_path=args.checkpoint)
+    print(summarizeBacktest(report).to_string(index=False))
@@ -0,0 +1,146 @@
+import numpy as np
+
+from utils.codeRank import BLUE_COUNT, RED_COUNT, RED_PICK, TOTAL_CODES, rankCodes
+
+# 蓝球滑动窗口长度：任意连续16组号码中蓝球不重复
+BLUE_WINDOW = 16
+
+# 号码表格的列名，与出号页面一致
+CODE_COLUMNS = ["红色球1号", "红色球2号", "红色球3号", "红色球4号", "红色球5号", "红色球6号", "蓝色球"]
+
+# 每批生成的行数，(chunk, 33)的号码矩阵约2MB，避免百万级请求时一次性占满内存
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def codeBatchGenerate(num, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """向量化批量生成去重的双色球号码
+
+    参数:
+        num (int): 需要生成的号码组数
+        seed (int | None): 随机种子，相同种子得到相同结果
+        chunk_size (int): 每批生成的行数
+
+    返回:
+        numpy.ndarray: 形状为(num, 7)的uint8数组，前6列为升序红球，第7列为蓝球
+
+    去重规则（与codeBaseGenerateDeduplicate一致）:
+        1. 完整组合（红球+蓝球）不能重复
+        2. 任意连续16组号码中蓝球不能重复
+    """
+    if num < 0:
+        raise ValueError("号码组数不能为负数")
+    if num > TOTAL_CODES:
+        raise ValueError(f"号码组数不能超过全部组合数 {TOTAL_CODES}")
+
+    rng = np.random.default_rng(seed)
+    codes = np.empty((num, RED_PICK + 1), dtype=np.uint8)
+    if num == 0:
+        return codes
+
+    # 蓝球序列只由窗口规则决定，先整体生成
+    codes[:, RED_PICK] = blueSequence(rng, num)
+
+    # 分批生成红球组合
+    for start in range(0, num, chunk_size):
+        stop = min(start + chunk_size, num)
+        codes[start:stop, :RED_PICK] = drawRedCodes(rng, stop - start)
+
+    resolveDuplicates(rng, codes)
+    return codes
+
+
+def blueSequence(rng, num):
+    """生成满足16期窗口规则的蓝球序列
+
+    蓝球只有16个取值，任意连续16组互不重复就意味着每16组恰好是1-16的一个排列，
+    且第i组与第i+16组的蓝球相同，因此整条序列就是一个随机排列的循环。
+    """
+    perm = rng.permutation(BLUE_COUNT).astype(np.uint8) + 1
+    return np.resize(perm, num)
+
+
+def blueCycle(perm, start, num):
+    """从循环排列perm的第start组开始取num个蓝球，用于分块生成时接续窗口规则"""
+    return perm[(start + np.arange(num)) % BLUE_COUNT]
+
+
+def drawRedCodes(rng, num):
+    """一次性抽取num组红球
+
+    对(num, 33)的号码矩阵按行做前6步Fisher-Yates洗牌，每行前6列即为一次不放回抽样。
+    每步只对整列做一次花式索引交换，比对随机矩阵做argpartition快约一倍。
+
+    返回:
+        numpy.ndarray: 形状为(num, 6)的uint8数组，每行升序
+    """
+    perm = np.tile(np.arange(1, RED_COUNT + 1, dtype=np.uint8), (num, 1))
+    rows = np.arange(num)
+    for i in range(RED_PICK):
+        j = rng.integers(i, RED_COUNT, num)
+        picked = perm[rows, j]
+        perm[rows, j] = perm[:, i]
+        perm[:, i] = picked
+
+    reds = perm[:, :RED_PICK].copy()
+    reds.sort(axis=1)
+    return reds
+
+
+def codeKeys(codes):
+    """将号码数组编码为整数键（组合数系统序号），用于向量化查重"""
+    return rankCodes(codes)
+
+
+def duplicateRows(keys):
+    """返回与前面某一行键值相同的行号（每组重复保留第一次出现）"""
+    # 先做一次无索引排序找出重复的键值，绝大多数情况下没有重复可直接返回
+    sorted_keys = np.sort(keys)
+    repeated = sorted_keys[1:][sorted_keys[1:] == sorted_keys[:-1]]
+    if repeated.size == 0:
+        return np.empty(0, dtype=np.intp)
+
+    # 只对涉及重复键值的少量行求首次出现位置
+    rows = np.flatnonzero(np.isin(keys, repeated))
+    _, first = np.unique(keys[rows], return_index=True)
+    keep = np.zeros(rows.size, dtype=bool)
+    keep[first] = True
+    return rows[~keep]
+
+
+def resolveDuplicates(rng, codes):
+    """原地消除重复组合
+
+    重复的组合保留首次出现，其余行重新抽取红球（蓝球不变，窗口规则依然成立）。
+    首轮对全部键排序查重，之后只需把重抽的少量行与已接受的有序键做二分查找。
+    """
+    keys = codeKeys(codes)
+    pending = duplicateRows(keys)
+    if pending.size == 0:
+        return
+
+    accepted = np.sort(np.delete(keys, pending))
+    while pending.size:
+        codes[pending, :RED_PICK] = drawRedCodes(rng, pending.size)
+        new_keys = codeKeys(codes[pending])
+
+        # 与已接受的组合冲突，或与本轮其他重抽行冲突的，继续重抽
+        pos = np.searchsorted(accepted, new_keys).clip(max=accepted.size - 1)
+        clash = accepted[pos] == new_keys
+        clash[duplicateRows(new_keys)] = True
+
+        accepted = np.sort(np.concatenate([accepted, new_keys[~clash]]))
+        pending = pending[clash]
+
+
+def codesToFrame(codes):
+    """将(N, 7)号码数组转换为出号页面展示用的DataFrame（列式构造，不逐行转换）"""
+    import pandas as pd
+    return pd.DataFrame(codes, columns=CODE_COLUMNS)
+
+
+def codesToDicts(codes):
+    """将(N, 7)号码数组转换为codeGenerate的字典列表格式"""
+    return [
+        {"redCodes": set(row[:RED_PICK]), "blueCodes": {row[RED_PICK]}}
+        for row in codes.tolist()
+    ]
@@ -0,0 +1,193 @@
+import os
+import threading
+
+import numpy as np
+
+from utils.codeBatch import duplicateRows
+from utils.codeRank import BLUE_COUNT, RED_COMBOS, TOTAL_CODES, rankCodes, unrankCode
+from utils.paths import DATA_DIR
+
+# 已出号码位图的持久化路径，跨会话、跨天去重
+BITMAP_PATH = os.path.join(DATA_DIR, "issued_codes.npy")
+
+# 同一进程内多个Streamlit会话共用一个位图文件，读-改-写需要串行
+_bitmap_lock = threading.Lock()
+
+
+class CodeBitmap:
+    """已出号码位图
+
+    全部号码只有 C(33, 6) * 16 = 17721088 种，每种号码对应一位，
+    整个位图约2.2MB，可以精确记录"是否已出过"，不再需要无限增长的集合。
+    位序号即codeRank.rankCode的整注序号。
+    """
+
+    def __init__(self, bits=None):
+        """
+        初始化位图
+
+        参数:
+            bits: 打包后的uint8位数组，为None时创建空位图
+        """
+        if bits is None:
+            bits = np.zeros((TOTAL_CODES + 7) // 8, dtype=np.uint8)
+        self.bits = bits
+        # 各蓝球已出数量，首次使用时统计，之后随add增量更新
+        self._issued_per_blue = None
+
+    @classmethod
+    def load(cls, path=BITMAP_PATH):
+        """从文件加载位图，文件不存在时返回空位图"""
+        if not os.path.exists(path):
+            return cls()
+        return cls(np.load(path))
+
+    def save(self, path=BITMAP_PATH):
+        """保存位图，先写临时文件再替换，避免中途失败留下损坏的文件"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, self.bits)
+        os.replace(temp_path, path)
+
+    def contains(self, index):
+        """判断号码序号是否已出过，支持int或数组"""
+        index = np.asarray(index, dtype=np.int64)
+        hit = (self.bits[index >> 3] >> (7 - (index & 7)).astype(np.uint8)) & 1
+        return hit.astype(bool)
+
+    def add(self, index):
+        """标记号码序号为已出"""
+        index = np.unique(np.asarray(index, dtype=np.int64))
+        if self._issued_per_blue is not None:
+            new = index[~self.contains(index)]
+            self._issued_per_blue += np.bincount(new % BLUE_COUNT, minlength=BLUE_COUNT)
+        masks = np.left_shift(np.uint8(1), (7 - (index & 7)).astype(np.uint8))
+        np.bitwise_or.at(self.bits, index >> 3, masks)
+
+    def remove(self, index):
+        """清除号码序号的标记，原地修改，例如回测时每期复用同一个位图"""
+        index = np.unique(np.asarray(index, dtype=np.int64))
+        if self._issued_per_blue is not None:
+            old = index[self.contains(index)]
+            self._issued_per_blue -= np.bincount(old % BLUE_COUNT, minlength=BLUE_COUNT)
+        masks = np.left_shift(np.uint8(1), (7 - (index & 7)).astype(np.uint8))
+        np.bitwise_and.at(self.bits, index >> 3, ~masks)
+
+    def count(self):
+        """已出号码数量"""
+        return int(np.unpackbits(self.bits, count=TOTAL_CODES).sum())
+
+    def issuedPerBlue(self):
+        """各蓝球下已出的红球组合数，长度16的数组"""
+        if self._issued_per_blue is None:
+            if self.bits.any():
+                self._issued_per_blue = self.issuedTable().sum(axis=0)
+            else:
+                self._issued_per_blue = np.zeros(BLUE_COUNT, dtype=np.int64)
+        return self._issued_per_blue.copy()
+
+    def issuedTable(self):
+        """展开为(C(33, 6), 16)的布尔表，第b列为蓝球b+1下各红球组合是否已出"""
+        return np.unpackbits(self.bits, count=TOTAL_CODES).view(bool).reshape(RED_COMBOS, BLUE_COUNT)
+
+
+def codeBitmapGenerate(num, seed=None, bitmap=None, blues=None):
+    """基于位图的不重复出号
+
+    参数:
+        num (int): 需要生成的号码组数
+        seed (int | None): 随机种子
+        bitmap (CodeBitmap | None): 已出号码位图，为None时使用空位图（仅本次去重）
+        blues (numpy.ndarray | None): 指定蓝球序列，分块生成时由调用方保证跨块的窗口规则
+
+    返回:
+        numpy.ndarray: 形状为(num, 7)的uint8数组，生成的号码同时写入位图
+
+    去重规则:
+        1. 号码不与位图中已出的任何号码重复，本次生成的号码之间也不重复
+        2. 任意连续16组号码中蓝球不能重复
+
+    异常:
+        ValueError: 剩余号码不足时抛出
+    """
+    if bitmap is None:
+        bitmap = CodeBitmap()
+
+    free_per_blue = RED_COMBOS - bitmap.issuedPerBlue()
+    if num > free_per_blue.sum():
+        raise ValueError(f"剩余号码不足：还剩 {free_per_blue.sum()} 组，需要 {num} 组")
+
+    rng = np.random.default_rng(seed)
+    if blues is None:
+        blues = np.resize(bluePermutation(rng, free_per_blue), num)
+    codes = np.empty((num, 7), dtype=np.uint8)
+    issued = None
+
+    # 蓝球序列由窗口规则固定，按蓝球分组，在各自的红球空间内做不放回抽样
+    for blue in range(1, BLUE_COUNT + 1):
+        rows = np.flatnonzero(blues == blue)
+        if rows.size == 0:
+            continue
+
+        # 请求量超过该蓝球剩余组合数的一半时直接在剩余组合中抽取，否则先走拒绝采样
+        if rows.size * 2 > free_per_blue[blue - 1]:
+            if issued is None:
+                issued = bitmap.issuedTable()
+            red_ranks = _sampleFree(rng, ~issued[:, blue - 1], rows.size)
+        else:
+            red_ranks = _sampleSparse(rng, bitmap, blue, rows.size)
+
+        codes[rows] = unrankCode(red_ranks * BLUE_COUNT + blue - 1)
+
+    bitmap.add(rankCodes(codes))
+    return codes
+
+
+def bluePermutation(rng, free_per_blue):
+    """生成蓝球序列的循环排列
+
+    序列是一个1-16排列的循环（见codeBatch.blueSequence），排列中靠前的蓝球会多分到一组。
+    按剩余红球组合数从多到少排列（相同时随机），使各蓝球的剩余空间始终保持均衡，
+    多次生成后也能把全部号码空间取尽。
+    """
+    keys = free_per_blue + rng.random(BLUE_COUNT)
+    return (np.argsort(-keys) + 1).astype(np.uint8)
+
+
+def _sampleSparse(rng, bitmap, blue, num):
+    """拒绝采样：已出号码较少时，随机抽取红球序号并剔除已出和重复的
+
+    每轮按剩余比例多抽一些，通常一两轮即可凑够。某一轮新得到的号码（剔除已出和与已抽中重复的之后）
+    不足所需的一半时，说明拒绝采样效率太低，改为枚举剩余组合，总轮数因此有上限。
+    """
+    picked = np.empty(0, dtype=np.int64)
+    while picked.size < num:
+        need = num - picked.size
+        candidates = rng.integers(0, RED_COMBOS, size=need + need // 4 + 16)
+        candidates = candidates[~bitmap.contains(candidates * BLUE_COUNT + blue - 1)]
+        merged = np.concatenate([picked, candidates])
+        merged = np.delete(merged, duplicateRows(merged))
+        if merged.size - picked.size < need // 2:
+            free = ~bitmap.issuedTable()[:, blue - 1]
+            free[picked] = False
+            return np.concatenate([picked, _sampleFree(rng, free, need)])
+        picked = merged
+    return picked[:num]
+
+
+def _sampleFree(rng, free, num):
+    """在剩余组合中不放回抽样：列出剩余红球序号后做随机选取，耗时与已出比例无关"""
+    free_ranks = np.flatnonzero(free)
+    if free_ranks.size < num:
+        raise ValueError(f"剩余号码不足：还剩 {free_ranks.size} 组，需要 {num} 组")
+    return rng.choice(free_ranks, size=num, replace=False)
+
+
+def codePersistentGenerate(num, seed=None, path=BITMAP_PATH, blues=None):
+    """跨会话不重复出号：加载持久化位图，生成号码后写回"""
+    with _bitmap_lock:
+        bitmap = CodeBitmap.load(path)
+        codes = codeBitmapGenerate(num, seed, bitmap, blues)
+        bitmap.save(path)
+    return codes
@@ -0,0 +1,312 @@
+import re
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from utils.codeRank import BLUE_COUNT, RED_COUNT, RED_PICK
+from utils.metrics import timed
+from utils.paths import DB_PATH
+
+# 奖级数量（一等奖至六等奖，第7级为数据源中的福运奖，按规则不由号码命中决定）
+PRIZE_LEVELS = 6
+
+# 奖级查表：TIER_TABLE[红球命中数, 蓝球是否命中] = 奖级，0为未中奖
+#   一等奖 6+1    二等奖 6+0    三等奖 5+1
+#   四等奖 5+0、4+1    五等奖 4+0、3+1    六等奖 2+1、1+1、0+1
+TIER_TABLE = np.array([
+    [0, 6],
+    [0, 6],
+    [0, 6],
+    [0, 5],
+    [5, 4],
+    [4, 3],
+    [2, 1],
+], dtype=np.uint8)
+
+# 固定奖金，数据库中缺失时使用（一、二等奖为浮动奖金，缺失时按0计）
+FIXED_PRIZE_MONEY = {3: 3000, 4: 200, 5: 10, 6: 5}
+
+# 每注价格(元)
+TICKET_PRICE = 2
+
+# 每批对奖的号码组数，每批的4码键约为 批大小 × 15 个
+CHECK_CHUNK_SIZE = 65536
+
+# 一组6个红球中任取4个的位置，共15组；红球命中>=4即号码与开奖至少有一个相同的4码组合
+QUAD_POSITIONS = np.array(list(combinations(range(RED_PICK), 4)), dtype=np.intp)
+
+# 4码组合按colex序编号：号码(从0起)a<b<c<d的编号为C(a, 1) + C(b, 2) + C(c, 3) + C(d, 4)，共C(33, 4)个
+QUAD_COMB = np.array([[comb(n, k) for k in range(5)] for n in range(RED_COUNT)], dtype=np.intp)
+QUAD_COUNT = comb(RED_COUNT, 4)
+
+
+def parseTickets(text):
+    """解析粘贴或CSV文本中的号码
+
+    每行一组号码：6个红球加1个蓝球，分隔符可以是空格、逗号、加号、竖线等任意非数字字符。
+    空行会被忽略；含有文字的行（如CSV表头"红色球1号,..."，或把0误输为字母O的"O6"）会被跳过，
+    并在返回值中列出，由调用方提示用户。
+
+    返回:
+        tuple: (形状为(N, 7)的uint8数组，前6列为升序红球，第7列为蓝球; 被跳过的(行号, 内容)列表)
+
+    异常:
+        ValueError: 某行号码个数、范围不正确或红球重复时抛出，信息中包含行号
+    """
+    tickets = []
+    skipped = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if re.search(r"[^\W\d_]", line):
+            skipped.append((line_no, line.strip()))
+            continue
+        numbers = [int(x) for x in re.findall(r"\d+", line)]
+        if not numbers:
+            continue
+        if len(numbers) != RED_PICK + 1:
+            raise ValueError(f"第{line_no}行号码个数应为7个（6红+1蓝），实际为{len(numbers)}个")
+
+        reds, blue = sorted(numbers[:RED_PICK]), numbers[RED_PICK]
+        if len(set(reds)) != RED_PICK or reds[0] < 1 or reds[-1] > RED_COUNT:
+            raise ValueError(f"第{line_no}行红球应为6个1-33之间不重复的号码")
+        if not 1 <= blue <= BLUE_COUNT:
+            raise ValueError(f"第{line_no}行蓝球应在1-16之间")
+        tickets.append(reds + [blue])
+
+    return np.array(tickets, dtype=np.uint8).reshape(-1, RED_PICK + 1), skipped
+
+
+def redMasks(reds):
+    """(N, 6)红球数组转为33位掩码uint64数组"""
+    shifts = np.asarray(reds, dtype=np.uint64) - np.uint64(1)
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), shifts), axis=-1)
+
+
+def popcount(values):
+    """uint64数组逐元素统计置位数"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+
+    # NumPy 2.0以前没有bitwise_count，按字节查表求和
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    as_bytes = np.ascontiguousarray(values, dtype=np.uint64).view(np.uint8)
+    return table[as_bytes].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def fetchDraws(db_path=DB_PATH, start_code=None, end_code=None):
+    """从列式快照中取出期号范围内的开奖结果和各奖级奖金，按期号升序
+
+    参数:
+        db_path (str): 数据库路径
+        start_code (str | None): 起始期号（含），为None时不限
+        end_code (str | None): 结束期号（含），为None时不限
+
+    返回:
+        dict: codes期号数组、red_masks红球掩码、blues蓝球、payouts形状为(期数, 7)的各奖级单注奖金，
+              均为快照的切片，不复制数据
+    """
+    # 快照由本模块的buildPayouts生成奖金列，延迟导入避免循环依赖
+    from utils.drawSnapshot import drawRange, loadSnapshot
+
+    snapshot = loadSnapshot(db_path)
+    rows = drawRange(snapshot, start_code, end_code)
+    return {name: snapshot[name][rows] for name in ("codes", "red_masks", "blues", "payouts")}
+
+
+def buildPayouts(codes, prize_rows):
+    """由奖级记录构造(期数, 7)的单注奖金表，缺失的固定奖级按FIXED_PRIZE_MONEY补齐
+
+    参数:
+        codes (list): 期号列表，决定结果的行顺序
+        prize_rows (list): (期号, 奖级, 奖金)记录
+    """
+    payouts = np.zeros((len(codes), PRIZE_LEVELS + 1), dtype=np.int64)
+    for tier, money in FIXED_PRIZE_MONEY.items():
+        payouts[:, tier] = money
+
+    position = {code: i for i, code in enumerate(codes)}
+    for code, tier, money in prize_rows:
+        if code in position and money is not None and tier <= PRIZE_LEVELS:
+            payouts[position[code], tier] = money
+    return payouts
+
+
+def redHits(ticket_masks, draw_masks):
+    """红球命中数矩阵：号码掩码与开奖掩码按位与后统计置位数
+
+    返回:
+        numpy.ndarray: 形状为(号码组数, 期数)的uint8数组
+    """
+    return popcount(ticket_masks[:, None] & draw_masks[None, :]).astype(np.uint8)
+
+
+def maskBalls(masks):
+    """红球掩码拆为(N, 6)的单个红球的位，按号码升序"""
+    bits = np.empty((len(masks), RED_PICK), dtype=np.uint64)
+    rest = np.array(masks, dtype=np.uint64)
+    for i in range(RED_PICK):
+        bits[:, i] = rest & (~rest + np.uint64(1))
+        rest ^= bits[:, i]
+    return bits
+
+
+def quadKeys(bits):
+    """每组红球的15个4码组合
+
+    参数:
+        bits (numpy.ndarray): maskBalls的返回值
+
+    返回:
+        tuple: (形状为(N, 15)的4码编号, 形状为(N, 15)的4码掩码)
+    """
+    # 单个位的浮点指数即号码(从0起)
+    balls = np.frexp(bits.astype(np.float64))[1].astype(np.intp) - 1
+    ranks = sum(QUAD_COMB[balls[:, QUAD_POSITIONS[:, k]], k + 1] for k in range(4))
+    keys = bits[:, QUAD_POSITIONS[:, 0]] | bits[:, QUAD_POSITIONS[:, 1]] | \
+        bits[:, QUAD_POSITIONS[:, 2]] | bits[:, QUAD_POSITIONS[:, 3]]
+    return ranks, keys
+
+
+def lowestBits(values, count):
+    """保留每个元素最低的count个置位"""
+    values = values.copy()
+    kept = np.zeros_like(values)
+    for _ in range(count):
+        low = values & (~values + np.uint64(1))
+        kept |= low
+        values ^= low
+    return kept
+
+
+def quadIndex(draw_masks):
+    """开奖的4码倒排索引：每个4码编号开出过的期，按编号连续存放
+
+    返回:
+        tuple: (各编号的起始位置, 各编号的期数, 期序号)
+    """
+    ranks, _ = quadKeys(maskBalls(draw_masks))
+    ranks = ranks.ravel()
+    counts = np.bincount(ranks, minlength=QUAD_COUNT)
+    order = np.argsort(ranks, kind="stable")
+    return np.cumsum(counts) - counts, counts, order // len(QUAD_POSITIONS)
+
+
+def highHits(ticket_masks, index, draw_masks):
+    """红球命中>=4的(号码, 期)组合
+
+    号码与开奖至少有4个相同红球，当且仅当二者有一个相同的4码组合。号码的每个4码组合按编号在倒排索引中
+    直接取出开出过它的各期，不构造(号码组数 × 期数)的命中矩阵。
+    命中5个、6个时会有5个、15个相同的4码组合，只保留相同红球中最小的4个对应的那一个。
+
+    参数:
+        ticket_masks (numpy.ndarray): 号码的红球掩码
+        index (tuple): quadIndex的返回值
+        draw_masks (numpy.ndarray): 开奖红球掩码
+
+    返回:
+        tuple: (号码序号, 期序号, 红球命中数)
+    """
+    starts, counts, draw_rows = index
+    ranks, keys = quadKeys(maskBalls(ticket_masks))
+    ranks, keys = ranks.ravel(), keys.ravel()
+    matched = counts[ranks]
+    found = np.flatnonzero(matched)
+    matched = matched[found]
+
+    # 展开每个4码组合匹配到的全部期
+    offsets = np.repeat(starts[ranks[found]] - np.cumsum(matched) + matched, matched) + np.arange(matched.sum())
+    key_index = np.repeat(found, matched)
+    rows = key_index // len(QUAD_POSITIONS)
+    cols = draw_rows[offsets]
+
+    common = ticket_masks[rows] & draw_masks[cols]
+    first = keys[key_index] == lowestBits(common, 4)
+    rows, cols, common = rows[first], cols[first], common[first]
+    return rows, cols, popcount(common).astype(np.intp)
+
+
+def scoreTickets(tickets, red_masks, blues):
+    """逐行对奖：第i组号码只与第i期开奖比较，不做号码与期数的两两组合
+
+    参数:
+        tickets (numpy.ndarray): 形状为(N, 7)的号码数组
+        red_masks (numpy.ndarray): 形状为(N,)或可广播的开奖红球掩码
+        blues (numpy.ndarray): 形状为(N,)或可广播的开奖蓝球
+
+    返回:
+        numpy.ndarray: 形状为(N,)的奖级，0为未中奖
+    """
+    hits = popcount(redMasks(tickets[:, :RED_PICK]) & red_masks)
+    blue_hit = tickets[:, RED_PICK] == blues
+    return TIER_TABLE[hits, blue_hit.astype(np.intp)]
+
+
+@timed("check_seconds")
+def checkTickets(tickets, draws, chunk_size=CHECK_CHUNK_SIZE):
+    """批量对奖
+
+    奖级只由(红球命中数, 蓝球是否命中)决定，按两部分汇总，不构造(号码组数 × 期数)的命中矩阵：
+        1. 红球命中>=4（一至五等奖的一部分）：用4码组合的倒排查找直接得到这些稀疏的格子，见highHits
+        2. 蓝球命中且红球命中<4（五、六等奖）：号码先按蓝球分组，每组只需对比开出该蓝球的约1/16期数，
+           次数和奖金用比较结果与奖金向量的矩阵乘积汇总
+    其余格子都未中奖。号码按批处理，中间数组大小与总注数无关。
+
+    参数:
+        tickets (numpy.ndarray): 形状为(N, 7)的号码数组
+        draws (dict): fetchDraws的返回值
+        chunk_size (int): 每批号码组数
+
+    返回:
+        dict:
+            tier_counts: 形状为(N, 7)的数组，第k列为该号码中k等奖的次数（第0列为未中奖期数）
+            payout: 形状为(N,)的数组，该号码在所选各期的奖金合计
+            best_tier: 形状为(N,)的数组，该号码中过的最高奖级，0为从未中奖
+    """
+    num = len(tickets)
+    ticket_masks = redMasks(tickets[:, :RED_PICK])
+    ticket_blues = np.asarray(tickets[:, RED_PICK], dtype=np.uint8)
+    draw_masks, draw_blues, payouts = draws["red_masks"], draws["blues"], draws["payouts"]
+    draw_count = len(draws["codes"])
+    levels = PRIZE_LEVELS + 1
+
+    index = quadIndex(draw_masks)
+
+    # 号码和期都按蓝球分组
+    blue_draws = [np.flatnonzero(draw_blues == blue) for blue in range(1, BLUE_COUNT + 1)]
+    tier_flat = TIER_TABLE.ravel()
+
+    tier_counts = np.zeros((num, levels), dtype=np.int64)
+    payout = np.zeros(num, dtype=np.int64)
+
+    for start in range(0, num, chunk_size):
+        stop = min(start + chunk_size, num)
+        size = stop - start
+        chunk_masks = ticket_masks[start:stop]
+        chunk_blues = ticket_blues[start:stop]
+
+        # 1. 红球命中>=4
+        rows, cols, hits = highHits(chunk_masks, index, draw_masks)
+        won = tier_flat[hits * 2 + (chunk_blues[rows] == draw_blues[cols])]
+        tier_counts[start:stop] += np.bincount(rows * levels + won, minlength=size * levels).reshape(size, levels)
+        payout[start:stop] += np.bincount(rows, weights=payouts[cols, won], minlength=size).astype(np.int64)
+
+        # 2. 蓝球命中且红球命中<4：五等奖(3+1)和六等奖(0~2+1)
+        for blue, columns in enumerate(blue_draws, start=1):
+            group = np.flatnonzero(chunk_blues == blue)
+            if group.size == 0 or columns.size == 0:
+                continue
+            sub_hits = redHits(chunk_masks[group], draw_masks[columns])
+            fifth = sub_hits == 3
+            sixth = sub_hits <= 2
+            group = group + start
+            tier_counts[group, 5] += fifth.sum(axis=1)
+            tier_counts[group, 6] += sixth.sum(axis=1)
+            payout[group] += fifth @ payouts[columns, 5] + sixth @ payouts[columns, 6]
+
+    tier_counts[:, 0] = draw_count - tier_counts[:, 1:].sum(axis=1)
+
+    # 最高奖级：奖级数字越小越高，找第一个次数非零的奖级
+    won_any = tier_counts[:, 1:] > 0
+    best_tier = np.where(won_any.any(axis=1), won_any.argmax(axis=1) + 1, 0)
+
+    return {"tier_counts": tier_counts, "payout": payout, "best_tier": best_tier}
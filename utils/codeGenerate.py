@@ -1,28 +1,130 @@
-import pprint
 import random
 from collections import deque
 
+import numpy as np
 
-def codeGenerate(num, model):
+from utils.codeBatch import BLUE_WINDOW, blueCycle, codeBatchGenerate, codesToDicts
+from utils.codeBitmap import CodeBitmap, bluePermutation, codeBitmapGenerate, codePersistentGenerate
+from utils.codePredict import codePredictGenerate, loadTables, predictBluePermutation
+from utils.codeRank import BLUE_COUNT, RED_COMBOS, rankCode
+from utils.codeShard import codeShardGenerate
+from utils.metrics import increment, timed
+
+# 生成数量达到该阈值时改用向量化批量引擎，逐组循环的开销在小批量时可以忽略
+BATCH_THRESHOLD = 1000
+
+# 流式生成时每块的号码组数，取16的倍数
+STREAM_CHUNK_SIZE = 1 << 14
+
+
+@timed("generate_seconds", func="codeGenerate")
+def codeGenerate(num, model, workers=1, seed=None):
     """
     双色球号码生成器主函数
 
     参数:
         num (int): 需要生成的号码组数
-        model (int): 生成模式 (1=普通模式, 2=预测模式，当前版本两种模式逻辑相同)
+        model (int): 生成模式 (1=普通模式, 2=预测模式，按历史开奖的冷热、遗漏和同出统计加权抽样,
+                     3=不重复模式，与历史上已出过的全部号码都不重复)
+        workers (int): 大批量生成时使用的进程数，大于1时按分片多进程生成
+        seed (int | None): 随机种子，相同种子得到相同结果；普通模式下按分片生成，结果与workers无关
 
     返回:
         list: 包含双色球号码的列表，每个元素为字典格式 {'redCodes': {红球集合}, 'blueCodes': {蓝球集合}}
 
     异常:
-        ValueError: 当模式参数不为1或2时抛出
+        ValueError: 当模式参数不为1、2或3时抛出
     """
-    if model == 1:
-        return codeBaseGenerateDeduplicate(num)
+    if model not in (1, 2, 3):
+        raise ValueError("模式参数必须为1、2或3")
+
+    # 不重复模式使用持久化位图去重，跨会话、跨天都不会出重复号码
+    if model == 3:
+        return codesToDicts(codePersistentGenerate(num, seed))
+
+    # 预测模式使用缓存的概率表和别名表加权抽样
+    if model == 2:
+        return codesToDicts(codePredictGenerate(num, seed))
+
+    # 指定种子或多进程时按分片生成，分片与进程数无关，同一种子的结果不随workers变化
+    if workers > 1 or seed is not None:
+        return codesToDicts(codeShardGenerate(num, seed, workers=workers))
+
+    # 大批量时使用NumPy批量引擎，去重规则与逐组生成一致
+    if num >= BATCH_THRESHOLD:
+        return codesToDicts(codeBatchGenerate(num))
+
+    return codeBaseGenerateDeduplicate(num)
+
+
+def iter_codes(num, model, seed=None):
+    """惰性逐组生成双色球号码
+
+    参数:
+        num (int): 需要生成的号码组数
+        model (int): 生成模式，同codeGenerate
+        seed (int | None): 随机种子
+
+    返回:
+        generator: 逐个产出 {'redCodes': {红球集合}, 'blueCodes': {蓝球集合}}
+    """
+    for block in iter_code_chunks(num, model, seed):
+        for row in block.tolist():
+            yield {"redCodes": set(row[:6]), "blueCodes": {row[6]}}
+
+
+def iter_code_chunks(num, model, seed=None, chunk_size=STREAM_CHUNK_SIZE, tables=None):
+    """分块流式生成双色球号码
+
+    参数:
+        num (int): 需要生成的号码组数
+        model (int): 生成模式，同codeGenerate
+        seed (int | None): 随机种子，相同种子得到相同的号码序列
+        chunk_size (int): 每块的号码组数
+        tables (dict | None): 预测模式的概率表，为None时通过codePredict.loadTables获取
+
+    返回:
+        generator: 逐块产出形状为(n, 7)的uint8数组，前6列为升序红球，第7列为蓝球，
+                   可直接交给codeBatch.codesToFrame或其他导出程序按列处理
+
+    去重规则与codeGenerate一致：
+        各块共用一个约2.2MB的位图查重（不重复模式使用持久化位图），内存占用与num无关；
+        蓝球序列是同一个排列的循环，按块的起始位置接续，跨块的16期窗口规则依然成立。
+    """
+    if model not in (1, 2, 3):
+        raise ValueError("模式参数必须为1、2或3")
+
+    master = np.random.SeedSequence(seed)
+    perm_seed, = master.spawn(1)
+
+    perm_rng = np.random.default_rng(perm_seed)
+    if model == 3:
+        bitmap = None
+        issued_per_blue = CodeBitmap.load().issuedPerBlue()
+        perm = bluePermutation(perm_rng, RED_COMBOS - issued_per_blue)
     elif model == 2:
-        return codeBaseGenerateDeduplicate(num)
+        bitmap = CodeBitmap()
+        if tables is None:
+            tables = loadTables()
+        perm = predictBluePermutation(perm_rng, tables)
     else:
-        raise ValueError("模式参数必须为1或2")
+        bitmap = CodeBitmap()
+        perm = bluePermutation(perm_rng, np.full(BLUE_COUNT, RED_COMBOS))
+
+    for start in range(0, num, chunk_size):
+        n = min(chunk_size, num - start)
+        blues = blueCycle(perm, start, n)
+        chunk_seed, = master.spawn(1)
+        # 只计生成本块的耗时，不含调用方处理块的时间
+        with timed("generate_chunk_seconds", model=model):
+            if model == 3:
+                block = codePersistentGenerate(n, chunk_seed, blues=blues)
+            elif model == 2:
+                block = codePredictGenerate(n, chunk_seed, bitmap, blues, tables=tables)
+            else:
+                block = codeBitmapGenerate(n, chunk_seed, bitmap, blues)
+        increment("generated_codes_total", n, model=model)
+        yield block
 
 
 def codeBaseGenerate():
@@ -47,6 +149,7 @@ def codeBaseGenerate():
     return {"redCodes": red_code, "blueCodes": blue_code}
 
 
+@timed("generate_seconds", func="codeBaseGenerateDeduplicate")
 def codeBaseGenerateDeduplicate(num):
     """批量生成去重的双色球号码
 
@@ -58,17 +161,17 @@ def codeBaseGenerateDeduplicate(num):
 
     去重规则:
         1. 完整组合（红球+蓝球）不能重复
-        2. 蓝球号码在最近16期内不能重复
+        2. 蓝球号码在最近16期内不能重复（任意连续16组号码的蓝球互不相同）
     """
     # 存储最终生成的号码组合
     code_list = []
 
-    # 使用双端队列维护最近16个蓝球号码
-    # maxlen=16确保队列满时自动移除最旧元素，实现滑动窗口机制
-    recent_blue_codes = deque(maxlen=16)
+    # 使用双端队列维护前15个蓝球号码，加上当前号码构成16组的滑动窗口
+    # 蓝球只有16个取值，若队列保留16个则第17组起无蓝球可选，会陷入死循环
+    recent_blue_codes = deque(maxlen=BLUE_WINDOW - 1)
 
-    # 使用集合存储已生成的完整号码组合
-    # 键为(red_tuple, blue_num)元组，利用哈希表实现O(1)时间复杂度的查重
+    # 使用整数集合存储已生成的完整号码组合
+    # 键为组合数系统序号(rankCode)，一个小整数代替元组，查重只需整数哈希
     existing_codes = set()
 
     # 循环生成号码直到达到指定数量
@@ -76,21 +179,17 @@ def codeBaseGenerateDeduplicate(num):
         # 生成一组新号码
         cur_code = codeBaseGenerate()
 
-        # 将红球集合转为有序元组（集合是无序的，不能直接哈希）
-        # sorted确保相同数字的不同顺序被视为同一组合
-        red_tuple = tuple(sorted(cur_code["redCodes"]))
-
         # 提取蓝球数字（集合中唯一元素）
         blue_num = next(iter(cur_code["blueCodes"]))
 
-        # 构建完整组合的哈希键
-        code_tuple = (red_tuple, blue_num)
+        # 将红球+蓝球编码为唯一整数，与红球顺序无关
+        code_index = rankCode(cur_code["redCodes"], blue_num)
 
         # 检查是否存在完全相同的组合（红球和蓝球都相同）
-        if code_tuple in existing_codes:
+        if code_index in existing_codes:
             continue  # 重复则跳过本次循环
 
-        # 检查蓝球是否在最近16次内出现过
+        # 检查蓝球是否在最近15次内出现过
         # deque的成员检查时间复杂度为O(n)，但n=16时可视为常数时间
         if blue_num in recent_blue_codes:
             continue  # 蓝球重复则跳过
@@ -99,15 +198,15 @@ def codeBaseGenerateDeduplicate(num):
         code_list.append(cur_code)
 
         # 记录已生成的组合，用于后续查重
-        existing_codes.add(code_tuple)
+        existing_codes.add(code_index)
 
-        # 更新蓝球历史记录（自动维护长度为16）
+        # 更新蓝球历史记录（自动维护长度为15）
         recent_blue_codes.append(blue_num)
 
     return code_list
 
 
 if __name__ == '__main__':
-    # 程序入口，测试功能
-    print(f"{'测试结果':↓^20}")  # 打印居中的标题
-    # pprint.pprint(codeGenerate(10, 1))  # 生成10组普通模式号码并美观打印
\ No newline at end of file
+    # 程序入口：运行号码生成的基准测试，完整的基准见 python -m benchmarks.run
+    from benchmarks.run import main
+    main(["--filter", "bench_generate", "--quick"])
\ No newline at end of file
@@ -0,0 +1,326 @@
+import os
+import threading
+
+import numpy as np
+
+from utils.codeBatch import duplicateRows
+from utils.codeBitmap import CodeBitmap
+from utils.codeRank import BLUE_COUNT, RED_COMBOS, RED_COUNT, RED_PICK, TOTAL_CODES, rankCodes
+from utils.dbConnection import connection
+from utils.drawSnapshot import loadSnapshot
+from utils.metrics import cacheMiss, cacheRequest, timed
+from utils.paths import DB_PATH
+
+# 统计缓存文件名，保存在数据库所在目录
+STATS_FILE = "predict_stats.npz"
+
+# 平均遗漏期数：红球每期开出6个，蓝球每期开出1个
+RED_EXPECTED_GAP = RED_COUNT / RED_PICK
+BLUE_EXPECTED_GAP = BLUE_COUNT
+
+# 进程内缓存的概率表，按(数据库路径, 最新期号)判断是否需要刷新
+_tables = None
+_tables_key = None
+_tables_lock = threading.Lock()
+
+
+def emptyStats():
+    """空的历史统计；红球两两同出次数由cooccurrence的同出索引提供"""
+    return {
+        "code": "",
+        "draws": 0,
+        "red_freq": np.zeros(RED_COUNT, dtype=np.int64),
+        "red_last": np.full(RED_COUNT, -1, dtype=np.int64),
+        "blue_freq": np.zeros(BLUE_COUNT, dtype=np.int64),
+        "blue_last": np.full(BLUE_COUNT, -1, dtype=np.int64),
+    }
+
+
+def statsPath(db_path):
+    """统计缓存路径：与数据库同目录，不同数据库的统计互不混用"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), STATS_FILE)
+
+
+def loadStats(path):
+    """读取统计缓存，文件不存在、损坏或字段与emptyStats不一致时返回空统计"""
+    stats = emptyStats()
+    if not os.path.exists(path):
+        return stats
+    try:
+        with np.load(path) as data:
+            if set(data.files) != set(stats):
+                print("统计缓存的字段已变化，将重新统计")
+                return stats
+            stats = {key: data[key] for key in data.files}
+    except (OSError, ValueError) as e:
+        print(f"统计缓存读取失败: {e}，将重新统计")
+        return emptyStats()
+    stats["code"] = str(stats["code"])
+    stats["draws"] = int(stats["draws"])
+    return stats
+
+
+def saveStats(stats, path):
+    """保存统计缓存，先写临时文件再替换"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **stats)
+    os.replace(temp_path, path)
+
+
+def updateStats(stats, reds, blues, last_code):
+    """将新的开奖结果累加到统计中
+
+    参数:
+        stats (dict): 已有统计，原地更新
+        reds (numpy.ndarray): 形状为(N, 6)的红球，按期号升序
+        blues (numpy.ndarray): 形状为(N,)的蓝球
+        last_code (str): 新数据中最大的期号
+
+    返回:
+        dict: 更新后的统计
+    """
+    if len(reds) == 0:
+        return stats
+
+    start = stats["draws"]
+    draw_index = np.arange(start, start + len(reds))
+
+    # 转为独热矩阵后按列求和即得频次
+    red_hot = np.zeros((len(reds), RED_COUNT), dtype=np.int64)
+    np.put_along_axis(red_hot, np.asarray(reds, dtype=np.intp) - 1, 1, axis=1)
+    stats["red_freq"] += red_hot.sum(axis=0)
+    stats["red_last"] = np.maximum(stats["red_last"], (red_hot * (draw_index[:, None] + 1)).max(axis=0) - 1)
+
+    blue_hot = np.zeros((len(blues), BLUE_COUNT), dtype=np.int64)
+    blue_hot[np.arange(len(blues)), np.asarray(blues, dtype=np.intp) - 1] = 1
+    stats["blue_freq"] += blue_hot.sum(axis=0)
+    stats["blue_last"] = np.maximum(stats["blue_last"], (blue_hot * (draw_index[:, None] + 1)).max(axis=0) - 1)
+
+    stats["draws"] = start + len(reds)
+    stats["code"] = last_code
+    return stats
+
+
+def fetchDraws(db_path=DB_PATH, after_code=""):
+    """从列式快照中取出期号大于after_code的开奖结果，按期号升序
+
+    返回:
+        tuple: (红球(N, 6)数组, 蓝球(N,)数组, 最大期号)
+    """
+    snapshot = loadSnapshot(db_path)
+    codes = snapshot["codes"]
+    start = int(np.searchsorted(codes, after_code, side="right"))
+    if start == len(codes):
+        return np.empty((0, RED_PICK), dtype=np.uint8), np.empty(0, dtype=np.uint8), after_code
+    return snapshot["reds"][start:], snapshot["blues"][start:], str(codes[-1])
+
+
+def cachedDrawsMatch(db_path, code, draws):
+    """缓存统计到的期数是否等于快照中期号不大于code的期数
+
+    不一致时说明缓存之后插入了更早期号的开奖，或缓存来自同目录下的另一个数据库，需要重新统计。
+    """
+    codes = loadSnapshot(db_path)["codes"]
+    return draws == int(np.searchsorted(codes, code, side="right"))
+
+
+def refreshStats(db_path=DB_PATH):
+    """增量刷新统计缓存：只读取缓存之后新增的开奖结果，缓存与快照的期数不一致时全部重新统计"""
+    path = statsPath(db_path)
+    stats = loadStats(path)
+    rebuilt = not cachedDrawsMatch(db_path, stats["code"], stats["draws"])
+    if rebuilt:
+        print("统计缓存与开奖数据的期数不一致，将重新统计")
+        stats = emptyStats()
+    reds, blues, last_code = fetchDraws(db_path, stats["code"])
+    if len(reds):
+        updateStats(stats, reds, blues, last_code)
+    if len(reds) or rebuilt:
+        saveStats(stats, path)
+    return stats
+
+
+def buildAlias(weights):
+    """构建Walker/Vose别名表，之后每次抽样都是O(1)
+
+    每行只有几十个元素，逐行配对在Python列表上进行，比逐个读写NumPy标量快数倍，结果完全相同。
+
+    参数:
+        weights (numpy.ndarray): 形状为(..., K)的非负权重，最后一维为一个分布
+
+    返回:
+        tuple: (prob, alias)，形状均与weights相同
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    k = weights.shape[-1]
+    scaled = weights / weights.sum(axis=-1, keepdims=True) * k
+    probs, aliases = [], []
+
+    for values in scaled.reshape(-1, k).tolist():
+        prob = [1.0] * k
+        alias = list(range(k))
+        small = [i for i, value in enumerate(values) if value < 1.0]
+        large = [i for i, value in enumerate(values) if value >= 1.0]
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            prob[s] = values[s]
+            alias[s] = g
+            values[g] -= 1.0 - values[s]
+            (small if values[g] < 1.0 else large).append(g)
+        probs.append(prob)
+        aliases.append(alias)
+
+    return np.array(probs).reshape(weights.shape), np.array(aliases, dtype=np.intp).reshape(weights.shape)
+
+
+def sampleAlias(rng, prob, alias, num):
+    """从一维别名表中抽取num个样本(从0开始)"""
+    column = rng.integers(0, prob.shape[-1], num)
+    return np.where(rng.random(num) < prob[column], column, alias[column])
+
+
+def buildTables(stats, pair_count):
+    """由历史统计计算抽样概率表
+
+    权重 = (频次 + 1) * (1 + 遗漏期数 / 平均遗漏期数)
+    热号（频次高）与冷号（遗漏久）都会获得更高的权重，+1平滑保证所有号码都有机会被抽到。
+    第一个红球按上述权重抽取，其余红球按与第一个红球的同出次数加权的条件分布抽取。
+
+    参数:
+        stats (dict): 历史统计，见emptyStats
+        pair_count (numpy.ndarray): 33×33的红球两两同出次数，即同出索引的pair_count，须与stats统计到同一期
+    """
+    draws = stats["draws"]
+    red_omission = draws - 1 - stats["red_last"]
+    blue_omission = draws - 1 - stats["blue_last"]
+    red_weights = (stats["red_freq"] + 1) * (1 + red_omission / RED_EXPECTED_GAP)
+    blue_weights = (stats["blue_freq"] + 1) * (1 + blue_omission / BLUE_EXPECTED_GAP)
+
+    # 条件分布：P(j | i) ∝ 权重j * (i、j同出次数 + 1)，且不能抽到i自身
+    pair_weights = red_weights[None, :] * (pair_count + 1)
+    np.fill_diagonal(pair_weights, 0)
+
+    red_prob, red_alias = buildAlias(red_weights)
+    pair_prob, pair_alias = buildAlias(pair_weights)
+    return {
+        "code": stats["code"],
+        "red_prob": red_prob,
+        "red_alias": red_alias,
+        "pair_prob": pair_prob,
+        "pair_alias": pair_alias,
+        "blue_weights": blue_weights / blue_weights.sum(),
+    }
+
+
+@timed("db_query_seconds", query="latestCode")
+def latestCode(db_path=DB_PATH):
+    """数据库中最新的期号"""
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT MAX(code) FROM double_color_ball").fetchone()
+    return row[0] or ""
+
+
+def loadTables(db_path=DB_PATH):
+    """获取概率表
+
+    进程内缓存按(数据库路径, 快照的最新期号)命中，换用其他数据库或有新开奖时，
+    增量刷新统计和同出索引后重建。
+    """
+    global _tables, _tables_key
+    # 同出索引依赖本模块的fetchDraws，在函数内导入避免循环导入
+    from utils.cooccurrence import refreshIndex
+
+    cacheRequest("predict_tables")
+    key = (os.path.abspath(db_path), loadSnapshot(db_path)["code"])
+    with _tables_lock:
+        if _tables_key != key:
+            cacheMiss("predict_tables")
+            _tables = buildTables(refreshStats(db_path), refreshIndex(db_path)["pair_count"])
+            _tables_key = key
+        return _tables
+
+
+def drawPredictReds(rng, tables, num):
+    """按概率表抽取num组红球
+
+    返回:
+        numpy.ndarray: 形状为(num, 6)的uint8数组，每行升序
+    """
+    reds = np.empty((num, RED_PICK), dtype=np.intp)
+    reds[:, 0] = sampleAlias(rng, tables["red_prob"], tables["red_alias"], num)
+
+    # 其余位置按第一个红球所在行的条件别名表抽取，与已抽号码重复的行单独重抽
+    anchor = reds[:, 0]
+    for k in range(1, RED_PICK):
+        pending = np.arange(num)
+        while pending.size:
+            column = rng.integers(0, RED_COUNT, pending.size)
+            row = anchor[pending]
+            keep = rng.random(pending.size) < tables["pair_prob"][row, column]
+            picked = np.where(keep, column, tables["pair_alias"][row, column])
+            reds[pending, k] = picked
+            pending = pending[(reds[pending, :k] == picked[:, None]).any(axis=1)]
+
+    reds.sort(axis=1)
+    return (reds + 1).astype(np.uint8)
+
+
+def predictBluePermutation(rng, tables):
+    """按蓝球权重做不放回加权抽样得到排列，权重高的蓝球排在前面
+
+    使用Efraimidis-Spirakis方法：键值 u^(1/w) 从大到小排序
+    """
+    keys = rng.random(BLUE_COUNT) ** (1.0 / tables["blue_weights"])
+    return (np.argsort(-keys) + 1).astype(np.uint8)
+
+
+def codePredictGenerate(num, seed=None, bitmap=None, blues=None, db_path=DB_PATH, tables=None):
+    """预测模式出号：按历史冷热、遗漏和同出统计加权抽样
+
+    参数:
+        num (int): 需要生成的号码组数
+        seed (int | None): 随机种子
+        bitmap (CodeBitmap | None): 查重位图，为None时仅在本次生成内去重
+        blues (numpy.ndarray | None): 指定蓝球序列，分块生成时由调用方保证跨块的窗口规则
+        db_path (str): 开奖数据库路径
+        tables (dict | None): 已加载的概率表，为None时通过loadTables获取
+
+    返回:
+        numpy.ndarray: 形状为(num, 7)的uint8数组，前6列为升序红球，第7列为蓝球
+
+    去重规则与codeBaseGenerateDeduplicate一致
+
+    异常:
+        ValueError: 号码组数超过全部组合数，或某个蓝球需要的组数超过其剩余红球组合数时抛出，否则重抽无法结束
+    """
+    if num > TOTAL_CODES:
+        raise ValueError(f"号码组数不能超过全部组合数 {TOTAL_CODES}")
+    if tables is None:
+        tables = loadTables(db_path)
+    rng = np.random.default_rng(seed)
+    if bitmap is None:
+        bitmap = CodeBitmap()
+    if blues is None:
+        blues = np.resize(predictBluePermutation(rng, tables), num)
+
+    free_per_blue = RED_COMBOS - bitmap.issuedPerBlue()
+    if (np.bincount(blues, minlength=BLUE_COUNT + 1)[1:] > free_per_blue).any():
+        raise ValueError(f"剩余号码不足：还剩 {free_per_blue.sum()} 组，需要 {num} 组")
+
+    codes = np.empty((num, RED_PICK + 1), dtype=np.uint8)
+    codes[:, RED_PICK] = blues
+
+    # 与位图中已有的号码或本批内其他号码重复的行重抽红球
+    pending = np.arange(num)
+    while pending.size:
+        codes[pending, :RED_PICK] = drawPredictReds(rng, tables, pending.size)
+        keys = rankCodes(codes[pending])
+        clash = bitmap.contains(keys)
+        clash[duplicateRows(keys)] = True
+        bitmap.add(keys[~clash])
+        pending = pending[clash]
+
+    return codes
@@ -0,0 +1,123 @@
+from math import comb
+
+import numpy as np
+
+# 红球、蓝球号码范围
+RED_COUNT = 33
+RED_PICK = 6
+BLUE_COUNT = 16
+
+# 红球组合数 C(33, 6) 与全部号码组合数
+RED_COMBOS = comb(RED_COUNT, RED_PICK)
+TOTAL_CODES = RED_COMBOS * BLUE_COUNT
+
+# 组合数表 BINOM[n, k] = C(n, k)，n取0-33，k取0-6，供向量化计算查表
+BINOM = np.array(
+    [[comb(n, k) for k in range(RED_PICK + 1)] for n in range(RED_COUNT + 1)],
+    dtype=np.int64
+)
+
+# 按位置拆分的编码表 RANK_TABLE[i, c] = C(c, i + 1)，逐列查表比二维花式索引更快
+RANK_TABLE = np.ascontiguousarray(BINOM[:RED_COUNT, 1:].T)
+
+# 组合数系统（combinatorial number system）编码
+#
+# 将升序红球(从0开始) c1 < c2 < ... < c6 映射为整数
+#     rank = C(c1, 1) + C(c2, 2) + ... + C(c6, 6)
+# 取值范围恰好为 0 ~ C(33, 6) - 1，与红球组合一一对应。
+# 整注号码编码为 rank * 16 + (蓝球 - 1)，取值范围 0 ~ 17721087。
+#
+# 所有函数同时支持标量和NumPy数组：
+#     - 标量: 红球为任意6个号码的集合/列表，返回int
+#     - 数组: 红球为(..., 6)数组，返回int64数组
+
+
+def _isScalarReds(reds):
+    """判断红球参数是否为单注号码"""
+    return isinstance(reds, (set, frozenset, list, tuple))
+
+
+def rankRed(reds):
+    """红球组合编码
+
+    参数:
+        reds: 6个红球号码(1-33)，或形状为(..., 6)的数组
+
+    返回:
+        int | numpy.ndarray: 组合序号 0 ~ C(33, 6) - 1
+    """
+    if _isScalarReds(reds):
+        return sum(comb(c - 1, i) for i, c in enumerate(sorted(reds), start=1))
+
+    reds = np.sort(np.asarray(reds), axis=-1).astype(np.intp) - 1
+    rank = RANK_TABLE[0][reds[..., 0]]
+    for i in range(1, RED_PICK):
+        rank += RANK_TABLE[i][reds[..., i]]
+    return rank
+
+
+def unrankRed(rank):
+    """红球组合解码
+
+    从第6位开始，每位取满足 C(c, i) <= rank 的最大c，再减去该项继续求下一位。
+
+    参数:
+        rank: 组合序号，int或数组
+
+    返回:
+        tuple | numpy.ndarray: 升序红球，标量返回6元组，数组返回(..., 6)的uint8数组
+    """
+    scalar = np.ndim(rank) == 0
+    rank = np.array(rank, dtype=np.int64, ndmin=1)
+    reds = np.empty(rank.shape + (RED_PICK,), dtype=np.uint8)
+
+    for i in range(RED_PICK, 0, -1):
+        # BINOM[:, i]在c>=i-1后单调递增，二分查找最大的c
+        c = np.searchsorted(BINOM[:, i], rank, side="right") - 1
+        rank = rank - BINOM[c, i]
+        reds[..., i - 1] = c + 1
+
+    if scalar:
+        return tuple(int(x) for x in reds[0])
+    return reds
+
+
+def rankCode(reds, blue):
+    """整注号码编码
+
+    参数:
+        reds: 6个红球号码，或形状为(..., 6)的数组
+        blue: 蓝球号码(1-16)，int或数组
+
+    返回:
+        int | numpy.ndarray: 号码序号 0 ~ TOTAL_CODES - 1
+    """
+    if _isScalarReds(reds):
+        return rankRed(reds) * BLUE_COUNT + int(blue) - 1
+    return rankRed(reds) * BLUE_COUNT + np.asarray(blue, dtype=np.int64) - 1
+
+
+def unrankCode(index):
+    """整注号码解码
+
+    参数:
+        index: 号码序号，int或数组
+
+    返回:
+        tuple | numpy.ndarray: 标量返回(红球6元组, 蓝球)，数组返回(..., 7)的uint8数组
+    """
+    if np.ndim(index) == 0:
+        red_rank, blue = divmod(int(index), BLUE_COUNT)
+        return unrankRed(red_rank), blue + 1
+
+    index = np.asarray(index, dtype=np.int64)
+    codes = np.empty(index.shape + (RED_PICK + 1,), dtype=np.uint8)
+    codes[..., :RED_PICK] = unrankRed(index // BLUE_COUNT)
+    codes[..., RED_PICK] = index % BLUE_COUNT + 1
+    return codes
+
+
+def rankCodes(codes):
+    """(N, 7)号码数组编码为整数序号数组"""
+    codes = np.asarray(codes)
+    return rankCode(codes[..., :RED_PICK], codes[..., RED_PICK])
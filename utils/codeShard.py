@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.codeBatch import blueSequence, drawRedCodes, resolveDuplicates
+from utils.codeRank import RED_PICK, TOTAL_CODES
+
+# 每个分片的号码组数。分片按固定大小切分而不是按进程数切分，
+# 这样同一个主种子无论用几个进程，得到的结果都完全相同
+DEFAULT_SHARD_SIZE = 1 << 18
+
+
+def codeShardGenerate(num, seed=None, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """多进程分片批量生成去重的双色球号码
+
+    参数:
+        num (int): 需要生成的号码组数
+        seed (int | None): 主种子，相同主种子得到相同结果（与进程数无关）
+        workers (int | None): 进程数，默认使用全部CPU核心，为1时在当前进程内执行
+        shard_size (int): 每个分片的号码组数
+
+    返回:
+        numpy.ndarray: 形状为(num, 7)的uint8数组，前6列为升序红球，第7列为蓝球
+
+    种子派生:
+        主种子通过SeedSequence派生出相互独立的子种子：
+        第0个用于蓝球序列，第1个用于合并后的全局去重，其余依次分给各分片。
+
+    去重规则（与codeBaseGenerateDeduplicate一致）:
+        1. 蓝球序列在主进程中整体生成，再按分片切开，因此跨分片边界的16期窗口规则依然成立
+        2. 各分片先在进程内去重，合并后再做一次全局去重，只重抽红球，不改变蓝球
+    """
+    if num < 0:
+        raise ValueError("号码组数不能为负数")
+    if num > TOTAL_CODES:
+        raise ValueError(f"号码组数不能超过全部组合数 {TOTAL_CODES}")
+
+    master = np.random.SeedSequence(seed)
+    blue_seed, merge_seed = master.spawn(2)
+
+    blues = blueSequence(np.random.default_rng(blue_seed), num)
+    bounds = [(start, min(start + shard_size, num)) for start in range(0, num, shard_size)]
+    shard_seeds = master.spawn(len(bounds))
+    tasks = [(shard_seed, blues[start:stop]) for shard_seed, (start, stop) in zip(shard_seeds, bounds)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    if workers <= 1:
+        shards = [_generateShard(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shards = list(executor.map(_generateShard, *zip(*tasks)))
+
+    codes = np.concatenate(shards) if shards else np.empty((0, RED_PICK + 1), dtype=np.uint8)
+
+    # 不同分片之间可能出现相同组合，用独立的子种子在主进程中重抽
+    resolveDuplicates(np.random.default_rng(merge_seed), codes)
+    return codes
+
+
+def _generateShard(shard_seed, blues):
+    """在子进程中生成一个分片：按给定蓝球序列抽取红球并在分片内去重"""
+    rng = np.random.default_rng(shard_seed)
+    codes = np.empty((blues.size, RED_PICK + 1), dtype=np.uint8)
+    codes[:, RED_PICK] = blues
+    codes[:, :RED_PICK] = drawRedCodes(rng, blues.size)
+    resolveDuplicates(rng, codes)
+    return codes
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from utils.codeBatch import codesToFrame
+
+    parser = argparse.ArgumentParser(description="按主种子多进程预生成大批量号码，同一种子的结果与进程数无关")
+    parser.add_argument("num", type=int, help="号码组数")
+    parser.add_argument("--seed", type=int, required=True, help="主种子")
+    parser.add_argument("--workers", type=int, help="进程数，默认使用全部CPU核心")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="每个分片的号码组数")
+    parser.add_argument("--output", required=True, help="输出文件，.npy保存为(N, 7)的uint8数组，其余按CSV保存")
+    args = parser.parse_args()
+
+    codes = codeShardGenerate(args.num, args.seed, args.workers, args.shard_size)
+    if args.output.endswith(".npy"):
+        np.save(args.output, codes)
+    else:
+        codesToFrame(codes).to_csv(args.output, index=False)
+    print(f"已生成 {len(codes)} 组号码: {args.output}")
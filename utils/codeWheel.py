@@ -0,0 +1,249 @@
+import heapq
+from itertools import chain, combinations
+from math import comb
+
+import numpy as np
+
+from utils.codeCheck import TICKET_PRICE, popcount, redMasks
+from utils.codeRank import BLUE_COUNT, RED_COUNT, RED_PICK
+from utils.metrics import timed
+
+# 复式、胆拖展开的注数上限，全部红球复式为C(33, 6) * 16注，展开前先检查
+MAX_EXPANSION = 1 << 20
+
+# 旋转矩阵覆盖表(候选注数 × 目标组合数的位矩阵)的内存上限，超出时提示减少候选号码
+MAX_COVER_BYTES = 1 << 27
+
+# 计算覆盖表时每批处理的候选注数
+COVER_CHUNK_SIZE = 1024
+
+# 贪心选取时每次重新计算增益的候选注数
+GREEDY_BATCH = 64
+
+
+def _checkBalls(balls, low, high, name):
+    """号码去重排序并检查范围"""
+    balls = sorted(set(int(ball) for ball in balls))
+    if any(ball < low or ball > high for ball in balls):
+        raise ValueError(f"{name}号码必须在{low}-{high}之间")
+    return balls
+
+
+def combinationRows(count, size):
+    """从count个位置中取size个的全部组合，形状为(C(count, size), size)，每行升序"""
+    total = comb(count, size)
+    flat = np.fromiter(chain.from_iterable(combinations(range(count), size)), dtype=np.intp, count=total * size)
+    return flat.reshape(total, size)
+
+
+def _withBlues(reds, blues):
+    """每组红球与每个蓝球组合成号码，形状为(len(reds) * len(blues), 7)"""
+    codes = np.empty((len(reds) * len(blues), RED_PICK + 1), dtype=np.uint8)
+    codes[:, :RED_PICK] = np.repeat(reds, len(blues), axis=0)
+    codes[:, RED_PICK] = np.tile(np.asarray(blues, dtype=np.uint8), len(reds))
+    return codes
+
+
+def _checkExpansion(tickets):
+    if tickets > MAX_EXPANSION:
+        raise ValueError(f"展开后共{tickets}注，超过上限{MAX_EXPANSION}注")
+
+
+def expandMultiple(reds, blues):
+    """复式展开：所选红球中任取6个与每个所选蓝球组成一注
+
+    参数:
+        reds (iterable): 7-33个红球，也可以是6个（即单式）
+        blues (iterable): 1-16个蓝球
+
+    返回:
+        dict: codes形状为(注数, 7)的号码数组、tickets注数、cost金额(元)
+
+    异常:
+        ValueError: 号码个数或范围不符合复式规则时抛出
+    """
+    reds = _checkBalls(reds, 1, RED_COUNT, "红球")
+    blues = _checkBalls(blues, 1, BLUE_COUNT, "蓝球")
+    if len(reds) < RED_PICK or not blues:
+        raise ValueError("复式至少需要6个红球和1个蓝球")
+
+    tickets = comb(len(reds), RED_PICK) * len(blues)
+    _checkExpansion(tickets)
+    red_rows = np.array(reds, dtype=np.uint8)[combinationRows(len(reds), RED_PICK)]
+    return {"codes": _withBlues(red_rows, blues), "tickets": tickets, "cost": tickets * TICKET_PRICE}
+
+
+def expandBanker(bankers, drags, blues):
+    """胆拖展开：每注都包含全部胆码，其余红球从拖码中任取
+
+    参数:
+        bankers (iterable): 1-5个胆码
+        drags (iterable): 拖码，与胆码不重复，胆码与拖码合计至少7个
+        blues (iterable): 1-16个蓝球
+
+    返回:
+        dict: 同expandMultiple
+
+    异常:
+        ValueError: 号码个数或范围不符合胆拖规则时抛出
+    """
+    bankers = _checkBalls(bankers, 1, RED_COUNT, "胆码")
+    drags = _checkBalls(drags, 1, RED_COUNT, "拖码")
+    blues = _checkBalls(blues, 1, BLUE_COUNT, "蓝球")
+    if not 1 <= len(bankers) < RED_PICK:
+        raise ValueError("胆码个数必须为1-5个")
+    if set(bankers) & set(drags):
+        raise ValueError("胆码与拖码不能重复")
+    if len(bankers) + len(drags) <= RED_PICK:
+        raise ValueError("胆码与拖码合计至少7个")
+    if not blues:
+        raise ValueError("至少需要1个蓝球")
+
+    free = RED_PICK - len(bankers)
+    tickets = comb(len(drags), free) * len(blues)
+    _checkExpansion(tickets)
+    picked = np.array(drags, dtype=np.uint8)[combinationRows(len(drags), free)]
+    red_rows = np.sort(np.hstack([np.tile(np.array(bankers, dtype=np.uint8), (len(picked), 1)), picked]), axis=1)
+    return {"codes": _withBlues(red_rows, blues), "tickets": tickets, "cost": tickets * TICKET_PRICE}
+
+
+def maskBits(masks):
+    """33位红球掩码展开为(N, 33)的float32 0/1矩阵"""
+    shifts = np.arange(RED_COUNT, dtype=np.uint64)
+    return ((masks[:, None] >> shifts) & np.uint64(1)).astype(np.float32)
+
+
+def coverTable(block_masks, target_masks, match):
+    """覆盖位矩阵：第i行第j位表示候选注i与目标组合j至少有match个相同号码
+
+    相同号码数即两个掩码按位与后的置位数。批量计算时把掩码展开为33列的0/1矩阵，
+    全部两两组合的相同号码数就是一次矩阵乘积，交给BLAS计算。
+
+    返回:
+        numpy.ndarray: 形状为(候选注数, ceil(目标组合数 / 64))的uint64数组
+    """
+    words = -(-len(target_masks) // 64)
+    table = np.zeros((len(block_masks), words * 8), dtype=np.uint8)
+    target_bits = maskBits(target_masks).T
+    for start in range(0, len(block_masks), COVER_CHUNK_SIZE):
+        stop = min(start + COVER_CHUNK_SIZE, len(block_masks))
+        hit = maskBits(block_masks[start:stop]) @ target_bits >= match
+        packed = np.packbits(hit, axis=1, bitorder="little")
+        table[start:stop, :packed.shape[1]] = packed
+    return table.view(np.uint64)
+
+
+def greedyCover(table, targets):
+    """贪心求覆盖：每次选取覆盖剩余目标最多的候选注，再删去冗余的注
+
+    增益为 popcount(覆盖行 & 未覆盖位图)，按64位字计算。已覆盖的目标只会增多，增益只减不增，
+    因此采用惰性贪心：堆中保存各注上一次计算的增益作为上界，只重新计算堆顶的注，
+    重新计算后仍不小于下一个上界即可选取，不必每轮重算全部候选注。堆顶按GREEDY_BATCH个一批重新计算。
+    贪心结束后按选取的逆序检查：某注覆盖的目标都至少被另一注覆盖时删去该注。
+
+    参数:
+        table (numpy.ndarray): coverTable的返回值
+        targets (int): 目标组合数
+
+    返回:
+        list: 选中的候选注下标
+    """
+    uncovered = np.zeros(table.shape[1] * 64, dtype=bool)
+    uncovered[:targets] = True
+    uncovered = np.packbits(uncovered, bitorder="little").view(np.uint64)
+
+    gains = popcount(table).sum(axis=1, dtype=np.int64)
+    heap = [(-int(gain), block) for block, gain in enumerate(gains) if gain]
+    heapq.heapify(heap)
+
+    chosen = []
+    remaining = targets
+    while remaining:
+        if not heap:
+            raise ValueError("候选注无法覆盖全部目标组合")
+        # 一次取出堆顶的一批，向量化重新计算增益，其余的以新增益作为上界放回堆中
+        batch = [heapq.heappop(heap) for _ in range(min(GREEDY_BATCH, len(heap)))]
+        blocks = np.array([block for _, block in batch])
+        gains = popcount(table[blocks] & uncovered).sum(axis=1, dtype=np.int64)
+        best = int(np.argmax(gains))
+        for block, gain in zip(blocks.tolist(), gains.tolist()):
+            if gain and block != blocks[best]:
+                heapq.heappush(heap, (-gain, block))
+        if heap and gains[best] < -heap[0][0]:
+            heapq.heappush(heap, (-int(gains[best]), int(blocks[best])))
+            continue
+        chosen.append(int(blocks[best]))
+        uncovered &= ~table[blocks[best]]
+        remaining -= int(gains[best])
+
+    # 每个目标被覆盖的次数，删去全部目标都被重复覆盖的注
+    rows = np.unpackbits(table[chosen].view(np.uint8), axis=1, bitorder="little")[:, :targets].astype(bool)
+    counts = rows.sum(axis=0)
+    keep = np.ones(len(chosen), dtype=bool)
+    for i in range(len(chosen) - 1, -1, -1):
+        if (counts[rows[i]] >= 2).all():
+            keep[i] = False
+            counts[rows[i]] -= 1
+    return [block for block, kept in zip(chosen, keep) if kept]
+
+
+def guaranteedMatch(ticket_masks, target_masks):
+    """验证保证：全部目标组合中，与所选各注的最大相同号码数的最小值"""
+    best = np.zeros(len(target_masks), dtype=np.uint8)
+    for start in range(0, len(ticket_masks), COVER_CHUNK_SIZE):
+        overlap = popcount(ticket_masks[start:start + COVER_CHUNK_SIZE, None] & target_masks[None, :])
+        np.maximum(best, overlap.max(axis=0), out=best)
+    return int(best.min()) if len(best) else 0
+
+
+@timed("generate_seconds", func="codeWheelGenerate")
+def codeWheelGenerate(reds, blues, match=3, drawn=None):
+    """旋转矩阵：在候选红球中选出尽量少的注，保证开奖红球中有drawn个在候选号码内时，至少一注命中其中match个
+
+    这是覆盖设计问题：目标为候选号码中全部drawn个号码的组合，一注覆盖与其至少有match个相同号码的目标。
+    候选注为候选号码中的全部6个号码组合，号码以33位红球掩码表示，相同号码数由按位与后的置位数得到。
+    用贪心加冗余删除求近似最小的覆盖，结果可能比已知最优的旋转矩阵多几注。
+    每组红球与全部所选蓝球组合，蓝球命中时同样成立。
+
+    参数:
+        reds (iterable): 候选红球，7个以上
+        blues (iterable): 1-16个蓝球
+        match (int): 保证命中的红球个数
+        drawn (int | None): 假定开奖红球中落在候选号码内的个数，默认为6
+
+    返回:
+        dict: codes号码数组、tickets注数、cost金额(元)、match验证后的保证命中个数、drawn、
+              full_tickets同样号码复式展开的注数
+
+    异常:
+        ValueError: 参数不合法或候选号码过多时抛出
+    """
+    reds = _checkBalls(reds, 1, RED_COUNT, "红球")
+    blues = _checkBalls(blues, 1, BLUE_COUNT, "蓝球")
+    drawn = RED_PICK if drawn is None else drawn
+    if len(reds) <= RED_PICK or not blues:
+        raise ValueError("旋转矩阵至少需要7个红球和1个蓝球")
+    if not 1 <= match <= drawn <= min(RED_PICK, len(reds)):
+        raise ValueError("需满足 1 <= 保证命中个数 <= 假定开出个数 <= 6")
+
+    blocks = comb(len(reds), RED_PICK)
+    targets = comb(len(reds), drawn)
+    if blocks * -(-targets // 64) * 8 > MAX_COVER_BYTES:
+        raise ValueError(f"候选号码过多：{len(reds)}个红球的覆盖表超过内存上限，请减少候选号码")
+
+    numbers = np.array(reds, dtype=np.uint8)
+    block_rows = numbers[combinationRows(len(reds), RED_PICK)]
+    block_masks = redMasks(block_rows)
+    target_masks = redMasks(numbers[combinationRows(len(reds), drawn)])
+
+    chosen = greedyCover(coverTable(block_masks, target_masks, match), targets)
+    red_rows = block_rows[chosen]
+    tickets = len(red_rows) * len(blues)
+    return {
+        "codes": _withBlues(red_rows, blues),
+        "tickets": tickets,
+        "cost": tickets * TICKET_PRICE,
+        "match": guaranteedMatch(block_masks[chosen], target_masks),
+        "drawn": drawn,
+        "full_tickets": blocks * len(blues),
+    }
@@ -0,0 +1,234 @@
+import os
+import threading
+from itertools import combinations
+
+import numpy as np
+
+from utils.codePredict import cachedDrawsMatch, fetchDraws
+from utils.codeRank import RED_COUNT, RED_PICK
+from utils.drawSnapshot import loadSnapshot
+from utils.metrics import cacheMiss, cacheRequest, timed
+from utils.paths import DB_PATH
+
+# 同出索引缓存文件名，保存在数据库所在目录
+INDEX_FILE = "cooccurrence.npz"
+
+# 一期6个红球中的两两组合和三三组合在该期号码中的位置，分别为15组和20组
+PAIR_POSITIONS = np.array(list(combinations(range(RED_PICK), 2)), dtype=np.intp)
+TRIPLE_POSITIONS = np.array(list(combinations(range(RED_PICK), 3)), dtype=np.intp)
+
+# 号码对的键：较小号码 * 33 + 较大号码（均从0起），共33 * 33个位置，只使用上三角
+PAIR_KEYS = RED_COUNT * RED_COUNT
+
+# 三元组按字典序编号，共C(33, 3) = 5456个；TRIPLE_RANK[a, b, c]为升序三元组的编号，TRIPLES为反查表
+TRIPLES = np.array(list(combinations(range(RED_COUNT), 3)), dtype=np.uint8)
+TRIPLE_RANK = np.full((RED_COUNT,) * 3, -1, dtype=np.int16)
+TRIPLE_RANK[tuple(TRIPLES.T)] = np.arange(len(TRIPLES), dtype=np.int16)
+
+# 进程内缓存的索引，按(数据库路径, 最新期号)判断是否需要刷新
+_index = None
+_index_key = None
+_index_lock = threading.Lock()
+
+
+def emptyIndex():
+    """空的同出索引
+
+    pair_count/pair_last为33×33的对称矩阵：两两同出次数和最近一次同出的期序号（-1为从未同出）；
+    triple_count/triple_last按三元组编号；pair_keys/triple_keys为每期开出的号码对和三元组的键，
+    用于按最近N期的窗口统计。
+    """
+    return {
+        "code": "",
+        "draws": 0,
+        "pair_count": np.zeros((RED_COUNT, RED_COUNT), dtype=np.int64),
+        "pair_last": np.full((RED_COUNT, RED_COUNT), -1, dtype=np.int64),
+        "triple_count": np.zeros(len(TRIPLES), dtype=np.int64),
+        "triple_last": np.full(len(TRIPLES), -1, dtype=np.int64),
+        "pair_keys": np.empty((0, len(PAIR_POSITIONS)), dtype=np.uint16),
+        "triple_keys": np.empty((0, len(TRIPLE_POSITIONS)), dtype=np.uint16),
+    }
+
+
+def indexPath(db_path):
+    """索引缓存路径：与数据库同目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), INDEX_FILE)
+
+
+def loadIndex(path):
+    """读取索引缓存，文件不存在、损坏或字段、形状与emptyIndex不一致时返回空索引
+
+    pair_keys/triple_keys的行数须等于draws，窗口统计按行取最近N期。
+    """
+    empty = emptyIndex()
+    if not os.path.exists(path):
+        return empty
+    try:
+        with np.load(path) as data:
+            index = {key: data[key] for key in data.files}
+    except (OSError, ValueError) as e:
+        print(f"同出索引读取失败: {e}，将重新统计")
+        return empty
+    if set(index) != set(empty):
+        print("同出索引的字段已变化，将重新统计")
+        return empty
+    index["code"] = str(index["code"])
+    index["draws"] = int(index["draws"])
+    for key in ("pair_count", "pair_last", "triple_count", "triple_last"):
+        if index[key].shape != empty[key].shape:
+            print(f"同出索引的{key}形状不一致，将重新统计")
+            return empty
+    for key in ("pair_keys", "triple_keys"):
+        if index[key].shape != (index["draws"],) + empty[key].shape[1:]:
+            print(f"同出索引的{key}行数与期数不一致，将重新统计")
+            return empty
+    return index
+
+
+def saveIndex(index, path):
+    """保存索引缓存，先写临时文件再替换"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **index)
+    os.replace(temp_path, path)
+
+
+def drawKeys(reds):
+    """每期开出的号码对和三元组的键
+
+    参数:
+        reds (numpy.ndarray): 形状为(N, 6)的红球
+
+    返回:
+        tuple: (形状为(N, 15)的号码对键, 形状为(N, 20)的三元组编号)，均为uint16
+    """
+    reds = np.sort(np.asarray(reds, dtype=np.intp), axis=1) - 1
+    pairs = reds[:, PAIR_POSITIONS[:, 0]] * RED_COUNT + reds[:, PAIR_POSITIONS[:, 1]]
+    triples = TRIPLE_RANK[reds[:, TRIPLE_POSITIONS[:, 0]], reds[:, TRIPLE_POSITIONS[:, 1]],
+                          reds[:, TRIPLE_POSITIONS[:, 2]]]
+    return pairs.astype(np.uint16), triples.astype(np.uint16)
+
+
+def updateIndex(index, reds, last_code):
+    """将新的开奖结果累加到索引中，只处理新增的期数
+
+    参数:
+        index (dict): 已有索引，原地更新
+        reds (numpy.ndarray): 形状为(N, 6)的红球，按期号升序
+        last_code (str): 新数据中最大的期号
+
+    返回:
+        dict: 更新后的索引
+    """
+    if len(reds) == 0:
+        return index
+
+    start = index["draws"]
+    pair_keys, triple_keys = drawKeys(reds)
+    pair_draw = np.repeat(np.arange(start, start + len(reds)), pair_keys.shape[1])
+    triple_draw = np.repeat(np.arange(start, start + len(reds)), triple_keys.shape[1])
+
+    # 号码对在上三角累加后对称化
+    pair_count = index["pair_count"].reshape(-1)
+    pair_last = index["pair_last"].reshape(-1)
+    upper = np.bincount(pair_keys.ravel(), minlength=PAIR_KEYS)
+    pair_count += upper + upper.reshape(RED_COUNT, RED_COUNT).T.ravel()
+    flat = pair_keys.ravel().astype(np.intp)
+    np.maximum.at(pair_last, flat, pair_draw)
+    np.maximum.at(pair_last, flat % RED_COUNT * RED_COUNT + flat // RED_COUNT, pair_draw)
+
+    index["triple_count"] += np.bincount(triple_keys.ravel(), minlength=len(TRIPLES))
+    np.maximum.at(index["triple_last"], triple_keys.ravel().astype(np.intp), triple_draw)
+
+    index["pair_keys"] = np.concatenate([index["pair_keys"], pair_keys])
+    index["triple_keys"] = np.concatenate([index["triple_keys"], triple_keys])
+    index["draws"] = start + len(reds)
+    index["code"] = last_code
+    return index
+
+
+@timed("cooccurrence_refresh_seconds")
+def refreshIndex(db_path=DB_PATH):
+    """增量刷新同出索引：只读取缓存之后新增的开奖结果，缓存与快照的期数不一致时全部重新统计"""
+    path = indexPath(db_path)
+    index = loadIndex(path)
+    rebuilt = not cachedDrawsMatch(db_path, index["code"], index["draws"])
+    if rebuilt:
+        print("同出索引与开奖数据的期数不一致，将重新统计")
+        index = emptyIndex()
+    reds, _, last_code = fetchDraws(db_path, index["code"])
+    if len(reds):
+        updateIndex(index, reds, last_code)
+    if len(reds) or rebuilt:
+        saveIndex(index, path)
+    return index
+
+
+def loadCooccurrence(db_path=DB_PATH):
+    """获取同出索引：进程内缓存按(数据库路径, 快照的最新期号)命中，换用其他数据库或有新开奖时增量刷新"""
+    global _index, _index_key
+    cacheRequest("cooccurrence")
+    key = (os.path.abspath(db_path), loadSnapshot(db_path)["code"])
+    with _index_lock:
+        if _index_key != key:
+            cacheMiss("cooccurrence")
+            _index = refreshIndex(db_path)
+            _index_key = key
+        return _index
+
+
+def _topK(counts, last, top):
+    """按次数从高到低取前top个，次数相同时最近同出的在前"""
+    top = min(top, int((counts > 0).sum()))
+    if top == 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-counts, top - 1)[:top] if top < counts.size else np.arange(counts.size)
+    # argpartition只保证前top个的集合正确；并列边界上的取舍由argpartition决定
+    order = np.lexsort((-last[candidates], -counts[candidates]))
+    return candidates[order]
+
+
+def hotPairs(index, top=20, window=0):
+    """同出次数最多的号码对
+
+    参数:
+        index (dict): loadCooccurrence的返回值
+        top (int): 返回的个数
+        window (int): 只统计最近window期，0为全部
+
+    返回:
+        tuple: (形状为(k, 2)的号码对（从1起）, 同出次数, 当前遗漏期数)
+    """
+    draws = index["draws"]
+    if window and window < draws:
+        counts = np.bincount(index["pair_keys"][-window:].ravel(), minlength=PAIR_KEYS)
+    else:
+        counts = np.triu(index["pair_count"], 1).ravel()
+    last = index["pair_last"].ravel()
+    keys = _topK(counts, last, top)
+    pairs = np.stack([keys // RED_COUNT, keys % RED_COUNT], axis=1) + 1
+    return pairs.astype(np.uint8), counts[keys], draws - 1 - last[keys]
+
+
+def hotTriples(index, top=20, window=0):
+    """同出次数最多的三元组，参数和返回值同hotPairs，号码组形状为(k, 3)"""
+    draws = index["draws"]
+    if window and window < draws:
+        counts = np.bincount(index["triple_keys"][-window:].ravel(), minlength=len(TRIPLES))
+    else:
+        counts = index["triple_count"]
+    last = index["triple_last"]
+    keys = _topK(counts, last, top)
+    return TRIPLES[keys] + 1, counts[keys], draws - 1 - last[keys]
+
+
+def pairStats(index, a, b):
+    """号码a、b（从1起）的同出次数和当前遗漏期数，从未同出时遗漏为总期数"""
+    return int(index["pair_count"][a - 1, b - 1]), int(index["draws"] - 1 - index["pair_last"][a - 1, b - 1])
+
+
+def tripleStats(index, a, b, c):
+    """三个号码（从1起，顺序任意）的同出次数和当前遗漏期数"""
+    rank = TRIPLE_RANK[tuple(sorted((a - 1, b - 1, c - 1)))]
+    return int(index["triple_count"][rank]), int(index["draws"] - 1 - index["triple_last"][rank])
@@ -0,0 +1,117 @@
+import streamlit as st
+
+from init.SQL_init import initialize_database
+from utils.codeCheck import fetchDraws
+from utils.codePredict import loadTables
+from utils.cooccurrence import loadCooccurrence
+from utils.drawScheduler import startScheduler
+from utils.drawSnapshot import loadSnapshot
+from utils.metrics import cacheMiss, cacheRequest
+from utils.paths import DB_PATH
+from utils.prizeOdds import expectedValueHistory
+from utils.trendAnalysis import loadTrendCube
+
+# 各页面共用的数据访问层
+#
+# 开奖数据直接读取内存映射的列式快照，所有会话共享同一份页缓存；
+# 由它计算得到的走势和概率表作为cache_data缓存，缓存键包含数据版本dataVersion()。
+# 数据版本取自列式快照：后台同步线程、手动运行getCodes或导入写入新开奖后都会重新生成快照，版本随之变化，
+# 下一次读取自动换用新的缓存项，不需要手动清理，页面重跑时也不必查询数据库。
+# 缓存函数的函数体只在未命中时执行，在其中记录cacheMiss，读取处记录cacheRequest，二者之差即命中次数。
+
+
+@st.cache_resource
+def ensureDatabase():
+    """确认数据库已初始化
+
+    通过main.py启动时数据库已由bootstrap初始化，这里每个进程只再确认一次，
+    以便直接用 streamlit run 启动时也能使用。页面读取开奖数据只经过列式快照，不直接查询数据库，
+    不会与写入数据的同步任务争用写锁。
+    """
+    return initialize_database(DB_PATH, sql_path=None)
+
+
+@st.cache_resource
+def getScheduler():
+    """进程内唯一的开奖日自动同步线程，第一个会话打开页面时启动"""
+    ensureDatabase()
+    return startScheduler(DB_PATH)
+
+
+def dataVersion():
+    """数据版本：列式快照的(最新期号, 版本)，作为各缓存项的键
+
+    任何入库流程写入新开奖后都会重新生成快照，版本随之变化；读取只需一次stat。
+    """
+    getScheduler()
+    snapshot = getHistory()
+    return snapshot["code"], snapshot["version"]
+
+
+def getHistory():
+    """全部开奖结果的列式快照，格式见drawSnapshot.loadSnapshot
+
+    快照以只读mmap打开，所有会话共享同一份页缓存，不经过cache_data的序列化和复制；
+    同步线程写入新开奖时已重新生成快照，这里每次只检查一次meta.json。
+    """
+    ensureDatabase()
+    return loadSnapshot(DB_PATH)
+
+
+def getDrawCodes():
+    """全部期号列表，按升序"""
+    return getHistory()["codes"].tolist()
+
+
+def getCheckDraws(start_code=None, end_code=None):
+    """期号范围内的对奖数据，即快照的切片，格式与codeCheck.fetchDraws一致"""
+    ensureDatabase()
+    return fetchDraws(DB_PATH, start_code, end_code)
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _trendCube(version):
+    cacheMiss("page_trend_cube")
+    return loadTrendCube(DB_PATH)
+
+
+def getTrendCube():
+    """走势数据，格式与trendAnalysis.loadTrendCube一致"""
+    cacheRequest("page_trend_cube")
+    return _trendCube(dataVersion())
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _predictTables(version):
+    cacheMiss("page_predict_tables")
+    return loadTables(DB_PATH)
+
+
+def getPredictTables():
+    """预测模式的概率表，格式与codePredict.loadTables一致"""
+    cacheRequest("page_predict_tables")
+    return _predictTables(dataVersion())
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _cooccurrence(version):
+    cacheMiss("page_cooccurrence")
+    return loadCooccurrence(DB_PATH)
+
+
+def getCooccurrence():
+    """红球同出索引，格式与cooccurrence.loadCooccurrence一致"""
+    cacheRequest("page_cooccurrence")
+    return _cooccurrence(dataVersion())
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _expectedValue(version):
+    cacheMiss("page_expected_value")
+    return expectedValueHistory(DB_PATH)
+
+
+def getExpectedValue():
+    """全部历史每期的单注期望奖金，格式与prizeOdds.expectedValueHistory一致"""
+    cacheRequest("page_expected_value")
+    return _expectedValue(dataVersion())
@@ -0,0 +1,115 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from utils.paths import DB_PATH
+
+# 每个连接执行的参数：
+#   WAL模式下读写互不阻塞，NORMAL同步级别在WAL下仍可保证数据库不损坏；
+#   数据库文件通过mmap映射读取，减少read系统调用和页面复制；
+#   其他连接持有写锁时等待而不是立即报错
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA busy_timeout = 5000",
+]
+
+# 每个连接缓存的预编译语句数
+CACHED_STATEMENTS = 256
+
+# 每个数据库保留的空闲连接数上限，超出的连接用完即关闭
+POOL_SIZE = 8
+
+# 按数据库绝对路径区分的连接池
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """SQLite连接池
+
+    连接在线程之间复用但同一时刻只借给一个线程，因此以check_same_thread=False打开。
+    Streamlit每次重跑脚本都可能在新的线程中执行，按线程缓存连接无法复用，连接池可以。
+    """
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = os.path.abspath(db_path)
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _open(self):
+        """打开新连接并设置参数"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+        conn.execute("PRAGMA journal_mode = WAL")
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """借出一个连接，退出时归还；未提交的事务会被回滚"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        """关闭全部空闲连接"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def getPool(db_path=DB_PATH):
+    """获取数据库对应的连接池，不存在时创建"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def connection(db_path=DB_PATH):
+    """上下文管理器：从连接池借出一个连接
+
+    用法:
+        with connection(db_path) as conn:
+            rows = conn.execute(...).fetchall()
+    """
+    return getPool(db_path).connection()
+
+
+@contextmanager
+def transaction(db_path=DB_PATH):
+    """上下文管理器：借出一个可写连接，正常退出时提交，出现异常时回滚"""
+    with connection(db_path) as conn:
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def closeAll():
+    """关闭全部连接池中的空闲连接，例如在替换或删除数据库文件之前"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,77 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from utils.metrics import beginRerun, prometheusText, snapshot
+
+# 调试面板默认不显示：设置环境变量LOTTERY_DEBUG=1，或在页面地址后加?debug=1
+DEBUG_ENV = "LOTTERY_DEBUG"
+
+
+def debugEnabled():
+    """是否显示调试面板"""
+    return os.environ.get(DEBUG_ENV) == "1" or st.query_params.get("debug") == "1"
+
+
+def startRerun():
+    """在页面脚本开头调用，开始记录本次重跑的耗时"""
+    return beginRerun()
+
+
+def _labelText(labels):
+    return ",".join(f"{key}={value}" for key, value in labels)
+
+
+def renderDebugPanel(record):
+    """在页面脚本末尾调用，在侧边栏展示本次重跑的耗时、计数和进程累计指标
+
+    参数:
+        record (RerunRecord): startRerun的返回值
+    """
+    if not debugEnabled():
+        return
+
+    elapsed = record.elapsed()
+    totals = {}
+    for (name, labels), seconds in record.timings:
+        count, total = totals.get((name, labels), (0, 0.0))
+        totals[(name, labels)] = (count + 1, total + seconds)
+
+    with st.sidebar:
+        st.subheader("性能调试")
+        st.metric("本次重跑(ms)", f"{elapsed * 1000:.1f}")
+        if totals:
+            st.dataframe(
+                pd.DataFrame(
+                    [(name, _labelText(labels), count, total * 1000)
+                     for (name, labels), (count, total) in totals.items()],
+                    columns=["指标", "标签", "次数", "耗时(ms)"]
+                ).sort_values("耗时(ms)", ascending=False),
+                hide_index=True,
+                use_container_width=True
+            )
+        if record.counters:
+            st.dataframe(
+                pd.DataFrame(
+                    [(name, _labelText(labels), value) for (name, labels), value in record.counters.items()],
+                    columns=["计数器", "标签", "本次"]
+                ),
+                hide_index=True,
+                use_container_width=True
+            )
+
+        with st.expander("进程累计"):
+            data = snapshot()
+            if data["timers"]:
+                st.dataframe(
+                    pd.DataFrame(
+                        [(timer["name"], _labelText(timer["labels"].items()), timer["count"],
+                          timer["total"] / timer["count"] * 1000, timer["max"] * 1000)
+                         for timer in data["timers"]],
+                        columns=["指标", "标签", "次数", "平均(ms)", "最大(ms)"]
+                    ),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            st.download_button("导出Prometheus文本", prometheusText(), file_name="metrics.prom")
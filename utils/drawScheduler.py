@@ -0,0 +1,118 @@
+import threading
+from datetime import datetime, time as dtime, timedelta, timezone
+
+from utils.paths import DB_PATH
+
+# 开奖时间：每周二、四、日 21:15（北京时间，没有夏令时，直接使用固定的UTC+8）
+BEIJING_TZ = timezone(timedelta(hours=8))
+DRAW_WEEKDAYS = (1, 3, 6)
+DRAW_TIME = dtime(21, 15)
+
+# 开奖后等待官方公布结果再同步；未取到新开奖时每隔RETRY_INTERVAL重试，最多RETRY_ATTEMPTS次
+SYNC_DELAY = timedelta(minutes=30)
+RETRY_INTERVAL = timedelta(minutes=20)
+RETRY_ATTEMPTS = 6
+
+# 单次休眠的上限(秒)，系统休眠或调整时钟后按实际时间重新计算剩余等待
+MAX_SLEEP = 3600
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def nextSyncTime(now):
+    """now之后的下一个同步时间：下一次开奖时间加SYNC_DELAY
+
+    参数:
+        now (datetime): 带时区的当前时间
+    """
+    now = now.astimezone(BEIJING_TZ)
+    for days in range(8):
+        day = now.date() + timedelta(days=days)
+        if day.weekday() in DRAW_WEEKDAYS:
+            due = datetime.combine(day, DRAW_TIME, BEIJING_TZ) + SYNC_DELAY
+            if due > now:
+                return due
+
+
+class DrawScheduler:
+    """开奖日自动同步的后台线程
+
+    启动时先同步一次补齐错过的开奖，之后在每次开奖后SYNC_DELAY执行增量同步，
+    没有取到新开奖时按RETRY_INTERVAL重试。入库后列式快照随之重新生成，页面缓存以快照的版本为键
+    （见dataAccess.dataVersion），无论新开奖由本线程、手动运行getCodes还是导入写入，缓存都会失效。
+    """
+
+    def __init__(self, db_path=DB_PATH, sync=None, clock=None):
+        """
+        参数:
+            db_path (str): 数据库路径
+            sync (callable | None): 同步函数sync(db_path) -> 新入库期数，默认为getCodes.getNetworkCodes
+            clock (callable | None): 返回当前带时区时间的函数，默认为当前北京时间
+        """
+        if sync is None:
+            from utils.getCodes import getNetworkCodes
+
+            def sync(path):
+                return getNetworkCodes(db_path=path)
+        self.db_path = db_path
+        self.sync = sync
+        self.clock = clock or (lambda: datetime.now(BEIJING_TZ))
+        self.last_sync = None
+        self.next_sync = None
+        self._stop = threading.Event()
+        self._sync_lock = threading.Lock()
+        self._thread = None
+
+    def syncNow(self):
+        """立即执行一次同步，同一时刻只有一个同步在进行
+
+        返回:
+            int: 新入库的开奖期数，同步失败时为0
+        """
+        with self._sync_lock:
+            try:
+                count = self.sync(self.db_path) or 0
+            except Exception as e:
+                print(f"自动同步开奖数据失败: {e}")
+                count = 0
+            self.last_sync = self.clock()
+            return count
+
+    def _wait(self, seconds):
+        """等待指定秒数，收到停止信号时返回True"""
+        return self._stop.wait(max(seconds, 0))
+
+    def _run(self):
+        self.syncNow()
+        while not self._stop.is_set():
+            self.next_sync = nextSyncTime(self.clock())
+            while (remaining := (self.next_sync - self.clock()).total_seconds()) > 0:
+                if self._wait(min(remaining, MAX_SLEEP)):
+                    return
+            for _ in range(RETRY_ATTEMPTS):
+                if self.syncNow() or self._wait(RETRY_INTERVAL.total_seconds()):
+                    break
+
+    def start(self):
+        """启动后台线程，已在运行时不重复启动"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="draw-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def startScheduler(db_path=DB_PATH):
+    """启动进程内唯一的同步线程并返回，重复调用返回同一个实例"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DrawScheduler(db_path).start()
+        return _scheduler
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from utils.codeCheck import PRIZE_LEVELS, buildPayouts
+from utils.codeRank import RED_PICK
+from utils.dbConnection import connection
+from utils.metrics import cacheMiss, cacheRequest, timed
+from utils.paths import DB_PATH
+
+# 列式快照目录，保存在数据库所在目录：每列一个.npy文件，meta.json记录期号和各列的形状
+SNAPSHOT_DIR = "draw_snapshot"
+META_FILE = "meta.json"
+
+# 快照格式版本，列或类型变化时加1，旧快照会被重新生成
+SNAPSHOT_FORMAT = 1
+
+# 快照的列，均按期号升序：
+#   codes期号、reds红球(N, 6)、blues蓝球、red_masks红球掩码、sales销售额、pool奖池、
+#   dates开奖日期、payouts形状为(N, 7)的各奖级单注奖金
+COLUMNS = ("codes", "reds", "blues", "red_masks", "sales", "pool", "dates", "payouts")
+
+# 进程内已映射的快照，meta.json的修改时间变化时重新打开
+_snapshot = None
+_snapshot_key = None
+_snapshot_lock = threading.Lock()
+
+
+def snapshotDir(db_path=DB_PATH):
+    """快照目录：与数据库同目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), SNAPSHOT_DIR)
+
+
+@timed("db_query_seconds", query="drawSnapshot.readDatabase")
+def readDatabase(db_path=DB_PATH):
+    """从数据库读取全部开奖结果并转换为列式数组
+
+    返回:
+        dict: COLUMNS中的各列
+    """
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT code, r1, r2, r3, r4, r5, r6, blue, red_mask, sales, pool, draw_day "
+            "FROM double_color_ball ORDER BY code"
+        ).fetchall()
+        prize_rows = conn.execute(
+            "SELECT lottery_code, prize_type, prize_amount FROM prize_grades WHERE prize_type <= ?",
+            (PRIZE_LEVELS,)
+        ).fetchall()
+
+    codes = [row[0] for row in rows]
+    balls = np.array([row[1:RED_PICK + 2] for row in rows], dtype=np.uint8).reshape(-1, RED_PICK + 1)
+    return {
+        "codes": np.array(codes, dtype=str),
+        "reds": np.ascontiguousarray(balls[:, :RED_PICK]),
+        "blues": np.ascontiguousarray(balls[:, RED_PICK]),
+        "red_masks": np.array([row[RED_PICK + 2] for row in rows], dtype=np.uint64),
+        "sales": np.array([row[RED_PICK + 3] or 0 for row in rows], dtype=np.int64),
+        "pool": np.array([row[RED_PICK + 4] or 0 for row in rows], dtype=np.int64),
+        # 缺失的开奖日期为NaT
+        "dates": np.array([row[RED_PICK + 5] for row in rows], dtype="datetime64[D]"),
+        "payouts": buildPayouts(codes, prize_rows),
+    }
+
+
+def _metaKey(directory):
+    """快照的版本标识：meta.json的路径和修改时间，快照不存在时为None"""
+    try:
+        return directory, os.stat(os.path.join(directory, META_FILE)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _readMeta(directory):
+    """读取meta.json，不存在、损坏或格式版本不符时返回None"""
+    try:
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return meta
+
+
+def _openSnapshot(directory, meta, key):
+    """以只读mmap打开各列，校验与meta一致
+
+    快照的version为meta.json的修改时间（key见_metaKey），每次重新生成都会变化，即使最新期号不变（例如补全了奖级）。
+
+    异常:
+        OSError, ValueError: 文件缺失、损坏，或正在被另一个进程重新生成
+    """
+    draws = meta["draws"]
+    snapshot = {"code": meta["code"], "version": key[1]}
+    for name in COLUMNS:
+        path = os.path.join(directory, f"{name}.npy")
+        # 空数组无法映射，直接读取
+        column = np.load(path, mmap_mode="r" if draws else None)
+        if len(column) != draws:
+            raise ValueError(f"快照列{name}的期数与meta.json不一致")
+        snapshot[name] = column
+    if draws and snapshot["codes"][-1] != meta["code"]:
+        raise ValueError("快照的最新期号与meta.json不一致")
+    return snapshot
+
+
+def _saveArray(path, values):
+    """先写临时文件再替换；已映射旧文件的进程仍可读取旧内容，直到重新打开"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.save(f, values)
+    os.replace(temp_path, path)
+
+
+def writeSnapshot(db_path=DB_PATH):
+    """从数据库重新生成快照并返回
+
+    各列写完后最后替换meta.json，读取方以meta.json为准，看到的要么是旧快照要么是新快照。
+    由入库流程在写入新开奖后调用，页面和生成模式只读取快照。
+    """
+    global _snapshot, _snapshot_key
+    directory = snapshotDir(db_path)
+    with _snapshot_lock:
+        columns = readDatabase(db_path)
+        os.makedirs(directory, exist_ok=True)
+        for name in COLUMNS:
+            _saveArray(os.path.join(directory, f"{name}.npy"), columns[name])
+
+        codes = columns["codes"]
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "code": str(codes[-1]) if len(codes) else "",
+            "draws": len(codes),
+            "columns": {name: [columns[name].dtype.str, list(columns[name].shape)] for name in COLUMNS},
+        }
+        temp_path = os.path.join(directory, META_FILE + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, os.path.join(directory, META_FILE))
+
+        _snapshot_key = _metaKey(directory)
+        _snapshot = _openSnapshot(directory, meta, _snapshot_key)
+        return _snapshot
+
+
+def loadSnapshot(db_path=DB_PATH):
+    """获取列式快照
+
+    meta.json未变化时直接返回进程内已映射的快照，每次只需一次stat；
+    快照被其他进程重新生成后重新映射；快照不存在或损坏时从数据库生成。
+
+    返回:
+        dict: code最新期号、version快照版本和COLUMNS中的各列，数组为只读的内存映射，多个进程共享同一份页缓存
+    """
+    global _snapshot, _snapshot_key
+    cacheRequest("draw_snapshot")
+    directory = snapshotDir(db_path)
+    key = _metaKey(directory)
+    if key is not None and key == _snapshot_key:
+        return _snapshot
+
+    with _snapshot_lock:
+        if key is not None and key == _snapshot_key:
+            return _snapshot
+        cacheMiss("draw_snapshot")
+        meta = _readMeta(directory) if key is not None else None
+        if meta is not None:
+            try:
+                _snapshot = _openSnapshot(directory, meta, key)
+                _snapshot_key = key
+                return _snapshot
+            except (OSError, ValueError) as e:
+                print(f"开奖快照读取失败: {e}，将重新生成")
+    return writeSnapshot(db_path)
+
+
+def syncSnapshot(db_path=DB_PATH, latest_code=None):
+    """快照的最新期号与数据库不一致时重新生成，例如数据库被其他程序修改后的首次启动
+
+    参数:
+        db_path (str): 数据库路径
+        latest_code (str | None): 数据库中的最新期号，为None时查询
+    """
+    if latest_code is None:
+        from utils.codePredict import latestCode
+        latest_code = latestCode(db_path)
+    snapshot = loadSnapshot(db_path)
+    if snapshot["code"] != latest_code:
+        snapshot = writeSnapshot(db_path)
+    return snapshot
+
+
+def drawRange(snapshot, start_code=None, end_code=None):
+    """期号范围[start_code, end_code]在快照中的切片，端点为None时不限"""
+    codes = snapshot["codes"]
+    start = np.searchsorted(codes, start_code, side="left") if start_code else 0
+    stop = np.searchsorted(codes, end_code, side="right") if end_code else len(codes)
+    return slice(int(start), int(stop))
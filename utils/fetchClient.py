@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import random
+
+from utils.metrics import increment, timed
+from utils.paths import DATA_DIR
+
+# 开奖公告接口，pageNo/pageSize分页，结果按期号从新到旧排列
+DRAW_NOTICE_URL = "https://www.cwl.gov.cn/cwl_admin/front/cwlkj/search/kjxx/findDrawNotice"
+
+# 连接超时和读取超时(秒)
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+
+# 失败重试次数和指数退避的基础等待时间(秒)：第k次重试前等待 BACKOFF_BASE * 2^k 秒再加随机抖动
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+MAX_BACKOFF = 30
+
+# 需要重试的响应状态码：限流和服务端错误
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 连接池大小，也是回填时并发请求的页数上限
+MAX_CONNECTIONS = 8
+
+# 各请求的ETag/Last-Modified，跨进程保存，数据未变化时服务端只需返回304
+VALIDATORS_PATH = os.path.join(DATA_DIR, "fetch_validators.json")
+
+
+class FetchClient:
+    """开奖数据的异步请求客户端
+
+    基于httpx.AsyncClient，所有请求复用同一个连接池（keep-alive），响应压缩由httpx自动处理。
+    每个请求都有超时，网络错误、429和5xx按指数退避重试，429/503带Retry-After时按其等待。
+    条件请求：记录每个请求的ETag和Last-Modified，下次请求时带上If-None-Match和If-Modified-Since，
+    数据未变化时服务端返回304，fetch_page返回None。
+
+    用法:
+        async with FetchClient() as client:
+            body = await client.fetch_page(1, 30)
+
+    测试时可以把url指向本地的桩服务，或传入httpx.MockTransport。
+    """
+
+    def __init__(self, url=DRAW_NOTICE_URL, headers=None, retries=MAX_RETRIES, backoff=BACKOFF_BASE,
+                 max_connections=MAX_CONNECTIONS, validators_path=VALIDATORS_PATH, transport=None):
+        """
+        参数:
+            url (str): 开奖公告接口地址
+            headers (dict | None): 请求头，默认使用RequestHeaderPool生成的随机请求头
+            retries (int): 失败重试次数
+            backoff (float): 指数退避的基础等待时间(秒)
+            max_connections (int): 连接池大小
+            validators_path (str | None): ETag/Last-Modified的保存路径，为None时只在内存中保存
+            transport (httpx.AsyncBaseTransport | None): 自定义传输层，默认为httpx的网络传输
+        """
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("异步请求客户端需要安装httpx: pip install httpx") from e
+        self._httpx = httpx
+
+        if headers is None:
+            from utils.RequestHeaderPool import RequestHeaderPool
+            headers = RequestHeaderPool.shared().get_random_headers()
+        # 压缩格式交给httpx协商，未安装brotli时声明br会导致响应无法解码
+        headers = {key: value for key, value in headers.items() if key.lower() != "accept-encoding"}
+
+        self.url = url
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self.validators_path = validators_path
+        self.validators = self._loadValidators()
+        self._pending_validators = {}
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            follow_redirects=True,
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """关闭连接池"""
+        await self._client.aclose()
+
+    def _loadValidators(self):
+        """读取保存的ETag/Last-Modified，文件不存在或损坏时返回空字典"""
+        if not self.validators_path or not os.path.exists(self.validators_path):
+            return {}
+        try:
+            with open(self.validators_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"条件请求缓存读取失败: {e}")
+            return {}
+
+    def saveValidators(self):
+        """保存本次获取到的ETag/Last-Modified
+
+        由调用方在数据成功入库后调用，避免入库失败后服务端返回304而漏掉这批数据
+        """
+        if not self._pending_validators:
+            return
+        self.validators.update(self._pending_validators)
+        self._pending_validators = {}
+        if not self.validators_path:
+            return
+        os.makedirs(os.path.dirname(self.validators_path), exist_ok=True)
+        temp_path = self.validators_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.validators, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.validators_path)
+
+    def _retryDelay(self, attempt, response=None):
+        """第attempt次重试前的等待时间"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(int(retry_after), MAX_BACKOFF)
+        return min(self.backoff * 2 ** attempt, MAX_BACKOFF) * (1 + random.random() / 2)
+
+    async def get(self, params, conditional=True):
+        """带重试和条件请求的GET
+
+        参数:
+            params (dict): 查询参数
+            conditional (bool): 是否带上已保存的ETag/Last-Modified
+
+        返回:
+            bytes | None: 响应内容，数据未变化(304)时返回None
+
+        异常:
+            httpx.HTTPError: 重试次数用尽后仍失败时抛出
+        """
+        httpx = self._httpx
+        key = str(httpx.URL(self.url, params=params))
+        headers = {}
+        saved = self.validators.get(key, {}) if conditional else {}
+        if saved.get("etag"):
+            headers["If-None-Match"] = saved["etag"]
+        if saved.get("last_modified"):
+            headers["If-Modified-Since"] = saved["last_modified"]
+
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                with timed("http_request_seconds"):
+                    response = await self._client.get(self.url, params=params, headers=headers)
+                increment("http_responses_total", status=response.status_code)
+                if response.status_code == 304:
+                    return None
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    validators = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                    if any(validators.values()):
+                        self._pending_validators[key] = validators
+                    return response.content
+                if attempt == self.retries:
+                    response.raise_for_status()
+            except httpx.TransportError:
+                increment("http_transport_errors_total")
+                if attempt == self.retries:
+                    raise
+            increment("http_retries_total")
+            await asyncio.sleep(self._retryDelay(attempt, response))
+
+    async def fetch_page(self, page_no, page_size, conditional=True):
+        """获取一页开奖公告，数据未变化时返回None"""
+        params = {"name": "ssq", "pageNo": page_no, "pageSize": page_size, "systemType": "PC"}
+        return await self.get(params, conditional)
+
+    async def iter_pages(self, page_numbers, page_size, concurrency=None):
+        """并发获取多页开奖公告，按完成的先后逐页产出(页码, 响应内容)
+
+        同时最多有concurrency页在请求中或等待调用方处理，调用方处理完一页后才会开始请求下一页，
+        因此内存中最多保留concurrency页的响应。
+
+        参数:
+            page_numbers (iterable): 页码
+            page_size (int): 每页条数
+            concurrency (int | None): 同时进行的请求数，默认等于连接池大小
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_connections)
+
+        async def fetch(page_no):
+            await semaphore.acquire()
+            return page_no, await self.fetch_page(page_no, page_size, conditional=False)
+
+        tasks = [asyncio.ensure_future(fetch(page_no)) for page_no in page_numbers]
+        try:
+            for future in asyncio.as_completed(tasks):
+                page = await future
+                try:
+                    yield page
+                finally:
+                    semaphore.release()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
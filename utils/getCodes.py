@@ -1,46 +1,178 @@
-import json
+import asyncio
+import io
+import os
+import re
+import sqlite3
 
-from utils.EncodeJsonTOSQL import insert_data_to_database, process_json_file
+from utils.EncodeJsonTOSQL import LotteryIngest, iter_result_items
+from utils.codePredict import latestCode
+from utils.fetchClient import FetchClient
+from utils.metrics import increment, logMetrics, timed
+from utils.paths import DB_PATH
 
+# 增量同步每页条数：每周只开3期，通常第一页就能遇到已入库的期号
+SYNC_PAGE_SIZE = 30
 
-def getNetworkCodes():
-    """获取网络上双色球号码"""
+# 数据库为空时的首次全量同步每页条数，其余页并发获取
+INITIAL_PAGE_SIZE = 200
 
-    # 导入爬虫库
-    import requests
+# 响应中result数组之前的总条数字段
+TOTAL_FIELD = re.compile(rb'"total"\s*:\s*(\d+)')
 
-    # 定义数据url
-    codeUrl = "https://www.cwl.gov.cn/cwl_admin/front/cwlkj/search/kjxx/findDrawNotice?name=ssq&pageNo=1&pageSize=100000000&systemType=PC"
 
-    # 调用随机请求头
-    from utils.RequestHeaderPool import RequestHeaderPool   # 调入请求头获取类
-    header_pool = RequestHeaderPool()   # 实例化请求头工具池
+def knownLatestCode(db_path=DB_PATH):
+    """数据库中已有的最新期号，数据库或表尚不存在时返回空字符串"""
+    if not os.path.exists(db_path):
+        return ""
+    try:
+        return latestCode(db_path)
+    except sqlite3.OperationalError:
+        return ""
 
-    randomHeaders = header_pool.get_random_headers()    # 获取随机请求头
 
-    # 请求网页获取响应
-    response = requests.get(codeUrl, headers=randomHeaders)
+class PageItems:
+    """一页响应中期号大于after_code的result条目，迭代时逐条解析，遇到已知期号即停止
 
-    # 将获取到的双色球信息加载的嵌入式数据库中
-    if response.status_code == 200:
-        data = response.json() # 将获取的文件转换为JSON对象
-        with open("temp.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+    迭代结束后count为产出的条目数，reached_known表示是否遇到了已知期号。
+    """
 
-        # 将网上获取的数据从temp.json文件中导出
-        process_json_file("temp.json")
+    def __init__(self, body, after_code=""):
+        self.body = body
+        self.after_code = after_code
+        self.count = 0
+        self.reached_known = False
 
-        # 执行操作删除这个临时的temp文件
-        import os
-        try:
-            os.remove("temp.json")
-            print("temp.json is Delete")
-        except FileNotFoundError:
-            print(f"文件不存在")
-        except Exception as e:
-            print(f"删除文件出错：{e}")
+    def __iter__(self):
+        for item in iter_result_items(io.BytesIO(self.body)):
+            if item.get("code", "") <= self.after_code:
+                self.reached_known = True
+                return
+            self.count += 1
+            yield item
 
 
+def responseTotal(body):
+    """响应中的总条数，只在result数组之前查找，不整体解析JSON"""
+    match = TOTAL_FIELD.search(body.split(b'"result"', 1)[0])
+    return int(match.group(1)) if match else 0
+
+
+@timed("sync_seconds", step="fetch_new")
+async def fetchNewDraws(client, ingest, after_code="", page_size=SYNC_PAGE_SIZE):
+    """逐页获取期号大于after_code的开奖条目并写入ingest，遇到第一个已知期号即停止
+
+    第一页使用条件请求，数据未变化时服务端返回304，不再解析任何内容。
+    每页边解析边入库，不保留已处理的页和条目。
+
+    参数:
+        client: 具有异步方法fetch_page(page_no, page_size, conditional)的对象，通常为FetchClient
+        ingest (LotteryIngest): 入库会话
+        after_code (str): 已入库的最新期号
+        page_size (int): 每页条数
+
+    返回:
+        int: 获取到的新开奖条目数
+    """
+    received = 0
+    page_no = 1
+    while True:
+        body = await client.fetch_page(page_no, page_size, conditional=page_no == 1)
+        if body is None:
+            increment("sync_pages_total", result="not_modified")
+            return received
+        increment("sync_pages_total", result="fetched")
+
+        page = PageItems(body, after_code)
+        ingest.write(page)
+        received += page.count
+
+        # 遇到已知期号，或条数不足一页说明已是最后一页
+        if page.reached_known or page.count < page_size:
+            return received
+        page_no += 1
+
+
+@timed("sync_seconds", step="fetch_all")
+async def fetchAllDraws(client, ingest, page_size=INITIAL_PAGE_SIZE, concurrency=None):
+    """首次同步：先取第一页得到总条数，其余页并发获取，每页到达后即写入ingest
+
+    参数:
+        client: 具有异步方法fetch_page和iter_pages的对象，通常为FetchClient
+        ingest (LotteryIngest): 入库会话
+        page_size (int): 每页条数
+        concurrency (int | None): 并发请求数
+
+    返回:
+        int: 获取到的开奖条目数
+    """
+    body = await client.fetch_page(1, page_size, conditional=False)
+    total = responseTotal(body)
+    received = ingest.write(PageItems(body))
+    pages = range(2, -(-total // page_size) + 1)
+    increment("sync_pages_total", len(pages) + 1, result="fetched")
+    async for _, body in client.iter_pages(pages, page_size, concurrency):
+        received += ingest.write(PageItems(body))
+    return received
+
+
+async def syncNetworkCodes(client=None, db_path=DB_PATH, page_size=None):
+    """异步同步网络上的双色球号码：数据库为空时全量回填，否则只获取新开奖
+
+    获取到的每一页都直接流式写入同一个入库会话（LotteryIngest），全部页获取并写入后一次提交，
+    任何一页失败时整体回滚。首次回填期间写事务一直保持，WAL模式下不影响页面读取。
+
+    参数:
+        client: FetchClient或具有相同异步接口的对象，默认新建FetchClient，测试时可指向本地桩服务
+        db_path (str): 数据库路径
+        page_size (int | None): 每页条数，默认增量同步用SYNC_PAGE_SIZE，首次同步用INITIAL_PAGE_SIZE
+
+    返回:
+        int: 新入库的开奖期数
+    """
+    own_client = client is None
+    if own_client:
+        client = FetchClient()
+
+    try:
+        after_code = knownLatestCode(db_path)
+        with LotteryIngest(db_path) as ingest:
+            if after_code:
+                received = await fetchNewDraws(client, ingest, after_code, page_size or SYNC_PAGE_SIZE)
+            else:
+                received = await fetchAllDraws(client, ingest, page_size or INITIAL_PAGE_SIZE)
+        count = ingest.lottery_count
+    except sqlite3.Error as e:
+        print(f"插入数据时出错: {e}")
+        increment("ingest_errors_total")
+        return 0
+    finally:
+        if own_client:
+            await client.aclose()
+
+    if not received:
+        print(f"已是最新数据，最新期号: {after_code}")
+        client.saveValidators()
+        return 0
+
+    # 数据成功入库后才记录ETag，入库失败时下次同步会重新获取
+    if count == received:
+        client.saveValidators()
+    return count
+
+
+def getNetworkCodes(client=None, db_path=DB_PATH, page_size=None):
+    """同步网络上的双色球号码（syncNetworkCodes的同步入口），完成后把累计指标写入日志"""
+    try:
+        with timed("sync_seconds", step="total"):
+            return asyncio.run(syncNetworkCodes(client, db_path, page_size))
+    except Exception:
+        increment("sync_errors_total")
+        raise
+    finally:
+        logMetrics("sync")
+
 
 if __name__ == '__main__':
-    getNetworkCodes()
\ No newline at end of file
+    from init.bootstrap import bootstrap
+    bootstrap(warm=False)
+    getNetworkCodes()
@@ -0,0 +1,225 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+# 环境变量LOTTERY_METRICS=0时关闭记录，计时器和计数器变为空操作
+ENABLED = os.environ.get("LOTTERY_METRICS", "1") != "0"
+
+# Prometheus文本格式中各指标名的前缀
+METRIC_PREFIX = "lottery_"
+
+logger = logging.getLogger("lottery.metrics")
+
+# 进程内累计的指标，键为(指标名, 排序后的标签元组)
+#   _timers: [次数, 总耗时, 最大耗时]
+#   _counters: 累计值
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+
+# 当前Streamlit重跑的记录，未调用beginRerun的线程（如后台同步线程）中为None
+_rerun = ContextVar("metrics_rerun", default=None)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class RerunRecord:
+    """一次页面重跑期间的计时和计数，供调试面板展示"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = []
+        self.counters = {}
+
+    def elapsed(self):
+        """重跑开始至今的耗时(秒)"""
+        return time.perf_counter() - self.started
+
+
+def beginRerun():
+    """开始记录当前线程（Streamlit的脚本线程）的一次重跑，返回RerunRecord"""
+    record = RerunRecord()
+    _rerun.set(record)
+    return record
+
+
+def observe(name, seconds, **labels):
+    """记录一次耗时
+
+    参数:
+        name (str): 指标名，如db_query_seconds
+        seconds (float): 耗时(秒)
+        **labels: 指标标签，如query="latestCode"
+    """
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        stat = _timers.get(key)
+        if stat is None:
+            stat = _timers[key] = [0, 0.0, 0.0]
+        stat[0] += 1
+        stat[1] += seconds
+        if seconds > stat[2]:
+            stat[2] = seconds
+    record = _rerun.get()
+    if record is not None:
+        record.timings.append((key, seconds))
+
+
+def increment(name, value=1, **labels):
+    """计数器加value"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    record = _rerun.get()
+    if record is not None:
+        record.counters[key] = record.counters.get(key, 0) + value
+
+
+def cacheRequest(cache):
+    """记录一次缓存读取，与cacheMiss配合得到命中率"""
+    increment("cache_requests_total", cache=cache)
+
+
+def cacheMiss(cache):
+    """记录一次缓存未命中，在重新计算的分支中调用"""
+    increment("cache_misses_total", cache=cache)
+
+
+class Timer:
+    """计时器，可作为上下文管理器或装饰器使用
+
+    用法:
+        with timed("db_query_seconds", query="latestCode"):
+            ...
+
+        @timed("generate_seconds", func="codeGenerate")
+        def codeGenerate(...):
+            ...
+
+    作为装饰器时每次调用各自计时，可用于多线程和异步函数。
+    """
+
+    __slots__ = ("name", "labels", "_start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self._start, **self.labels)
+        return False
+
+    def __call__(self, func):
+        name, labels = self.name, self.labels
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    observe(name, time.perf_counter() - start, **labels)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+
+
+def timed(name, **labels):
+    """创建计时器，见Timer"""
+    return Timer(name, labels)
+
+
+def snapshot():
+    """当前累计的全部指标
+
+    返回:
+        dict: timers为[{name, labels, count, total, max}]，counters为[{name, labels, value}]
+    """
+    with _lock:
+        timers = [(key, list(stat)) for key, stat in _timers.items()]
+        counters = list(_counters.items())
+    return {
+        "timers": [
+            {"name": name, "labels": dict(labels), "count": count, "total": total, "max": peak}
+            for (name, labels), (count, total, peak) in sorted(timers)
+        ],
+        "counters": [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(counters)
+        ],
+    }
+
+
+def reset():
+    """清空累计的指标"""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def _formatLabels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+def prometheusText():
+    """按Prometheus文本格式导出全部指标
+
+    计时器导出为summary的_count和_sum，另附_max；计数器导出为counter。
+    """
+    data = snapshot()
+    lines = []
+    declared = set()
+
+    def declare(metric, kind):
+        if metric not in declared:
+            declared.add(metric)
+            lines.append(f"# TYPE {metric} {kind}")
+
+    for timer in data["timers"]:
+        metric = METRIC_PREFIX + timer["name"]
+        labels = _formatLabels(timer["labels"])
+        declare(metric, "summary")
+        lines.append(f"{metric}_count{labels} {timer['count']}")
+        lines.append(f"{metric}_sum{labels} {timer['total']:.6f}")
+    for timer in data["timers"]:
+        metric = METRIC_PREFIX + timer["name"] + "_max"
+        declare(metric, "gauge")
+        lines.append(f"{metric}{_formatLabels(timer['labels'])} {timer['max']:.6f}")
+    for counter in data["counters"]:
+        metric = METRIC_PREFIX + counter["name"]
+        declare(metric, "counter")
+        lines.append(f"{metric}{_formatLabels(counter['labels'])} {counter['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def logMetrics(event="metrics"):
+    """以一行JSON把当前累计的指标写入lottery.metrics日志"""
+    if ENABLED and logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": event, **snapshot()}, ensure_ascii=False))
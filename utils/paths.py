@@ -0,0 +1,11 @@
+import os
+
+# 项目根目录和数据目录，均按本文件位置解析，与启动时的工作目录无关
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+
+# 历史开奖数据库
+DB_PATH = os.path.join(DATA_DIR, "lottery_data.db")
+
+# 由当前数据库结构自动生成的SQL参考文件
+SQL_PATH = os.path.join(DATA_DIR, "double_color_ball.sql")
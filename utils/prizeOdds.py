@@ -0,0 +1,173 @@
+import threading
+from math import comb
+
+import numpy as np
+
+from utils.codeCheck import PRIZE_LEVELS, TICKET_PRICE, TIER_TABLE
+from utils.codeRank import BLUE_COUNT, RED_COUNT, RED_PICK
+from utils.drawSnapshot import loadSnapshot
+from utils.metrics import cacheMiss, cacheRequest, timed
+from utils.paths import DB_PATH
+
+# 组合数表：COMB[n, r] = C(n, r)，n <= 33，r <= 6，r > n时为0
+COMB = np.array([[comb(n, r) for r in range(RED_PICK + 1)] for n in range(RED_COUNT + 1)], dtype=np.float64)
+
+# 红球开奖结果的总数 C(33, 6)
+RED_OUTCOMES = comb(RED_COUNT, RED_PICK)
+
+# 一等奖无人中奖时按上期奖池估算单注奖金：奖池不足1亿元时单注封顶500万元，1亿元以上时封顶1000万元
+FIRST_PRIZE_CAP = 5_000_000
+HIGH_POOL = 100_000_000
+HIGH_POOL_FIRST_PRIZE_CAP = 10_000_000
+
+# 红球命中数到奖级的独热矩阵：BLUE_HIT_TIERS[红球命中数, 奖级]为蓝球命中时，BLUE_MISS_TIERS为蓝球未中时
+BLUE_HIT_TIERS = np.eye(PRIZE_LEVELS + 1)[TIER_TABLE[:, 1]]
+BLUE_MISS_TIERS = np.eye(PRIZE_LEVELS + 1)[TIER_TABLE[:, 0]]
+
+# 进程内缓存的全部历史期望收益，按快照的版本判断是否需要重新计算
+_history = None
+_history_lock = threading.Lock()
+
+
+def _comb(n, r):
+    """向量化的组合数，n或r越界时为0"""
+    valid = (n >= 0) & (r >= 0) & (r <= RED_PICK)
+    return np.where(valid, COMB[np.clip(n, 0, RED_COUNT), np.clip(r, 0, RED_PICK)], 0.0)
+
+
+def _buildTables():
+    """超几何分布表
+
+    设胆码B个、拖码D个，开奖红球中有x个落在胆码、y个落在拖码：
+        OUTCOME_PROB[B, D, x, y] = C(B, x) * C(D, y) * C(33 - B - D, 6 - x - y) / C(33, 6)
+    每注为全部胆码加上拖码中任取6 - B个，红球命中h个的注数为
+        RED_HIT_ROWS[B, D, x, y, h] = C(y, h - x) * C(D - y, 6 - B - (h - x))
+    单式为B = 0、D = 6，复式为B = 0、D = 红球个数。
+    """
+    bankers, drags, x, y, h = np.ogrid[:RED_PICK, :RED_COUNT + 1, :RED_PICK, :RED_PICK + 1, :RED_PICK + 1]
+    prob = _comb(bankers, x) * _comb(drags, y) * _comb(RED_COUNT - bankers - drags, RED_PICK - x - y) / RED_OUTCOMES
+    rows = _comb(y, h - x) * _comb(drags - y, RED_PICK - bankers - (h - x))
+    return prob[..., 0], rows
+
+
+# 预先计算全部胆码个数(0-5)、拖码个数(0-33)的表，形状分别为(6, 34, 6, 7)和(6, 34, 6, 7, 7)
+OUTCOME_PROB, RED_HIT_ROWS = _buildTables()
+
+
+def betOdds(bankers=0, drags=RED_PICK, blues=1):
+    """一次投注各奖级的精确中奖概率，只与胆码、拖码、蓝球的个数有关
+
+    蓝球独立于红球：所选蓝球开出的概率为blues / 16，开出时每组红球恰有一注命中蓝球。
+
+    参数:
+        bankers (int): 胆码个数，0-5，0为单式或复式
+        drags (int): 拖码个数（单式、复式为红球个数），与胆码合计7-33个，单式为6个
+        blues (int): 蓝球个数，1-16
+
+    返回:
+        dict:
+            tickets: 注数
+            cost: 金额(元)
+            expected: 长度为7的各奖级期望中奖注数，第0列为未中奖的注数
+            probability: 长度为7的至少一注中该奖级的概率，第0列为全部未中奖的概率
+
+    异常:
+        ValueError: 个数不符合投注规则时抛出
+    """
+    if not 0 <= bankers < RED_PICK:
+        raise ValueError("胆码个数必须为0-5个")
+    if drags < RED_PICK - bankers or bankers + drags > RED_COUNT:
+        raise ValueError(f"{bankers}个胆码时拖码个数必须为{RED_PICK - bankers}-{RED_COUNT - bankers}个")
+    if not 1 <= blues <= BLUE_COUNT:
+        raise ValueError(f"蓝球个数必须为1-{BLUE_COUNT}个")
+
+    prob = OUTCOME_PROB[bankers, drags]
+    rows = RED_HIT_ROWS[bankers, drags]
+    blue_rate = blues / BLUE_COUNT
+
+    # 期望注数按线性累加：蓝球开出时每组红球1注命中蓝球、blues - 1注未中，未开出时blues注都未中
+    expected_rows = np.einsum("xy,xyh->h", prob, rows)
+    expected = blue_rate * expected_rows @ BLUE_HIT_TIERS + \
+        blues * (BLUE_COUNT - 1) / BLUE_COUNT * expected_rows @ BLUE_MISS_TIERS
+
+    # 至少一注中奖：每种(x, y)下出现过的红球命中数决定能中的奖级
+    present = (rows > 0).astype(np.float64)
+    won_hit = present @ (BLUE_HIT_TIERS + (blues > 1) * BLUE_MISS_TIERS) > 0
+    won_miss = present @ BLUE_MISS_TIERS > 0
+    probability = np.einsum("xy,xyt->t", prob, blue_rate * won_hit + (1 - blue_rate) * won_miss)
+    probability[0] = np.einsum("xy,xy->", prob, blue_rate * ~won_hit[..., 1:].any(axis=-1) +
+                               (1 - blue_rate) * ~won_miss[..., 1:].any(axis=-1))
+
+    tickets = comb(drags, RED_PICK - bankers) * blues
+    return {"tickets": tickets, "cost": tickets * TICKET_PRICE, "expected": expected, "probability": probability}
+
+
+# 单注各奖级的期望中奖注数，即单注中奖概率
+TICKET_EXPECTED = betOdds()["expected"]
+
+
+def estimatedPayouts(snapshot):
+    """各期的单注奖金表，一等奖无人中奖（奖金为0）时按上期奖池估算
+
+    返回:
+        tuple: (形状为(N, 7)的单注奖金, 一等奖奖金是否为估算值)
+    """
+    payouts = np.array(snapshot["payouts"], dtype=np.float64)
+    pool = np.asarray(snapshot["pool"], dtype=np.float64)
+    pool_before = np.concatenate([[0.0], pool[:-1]])
+    cap = np.where(pool_before >= HIGH_POOL, HIGH_POOL_FIRST_PRIZE_CAP, FIRST_PRIZE_CAP)
+    estimated = payouts[:, 1] == 0
+    payouts[:, 1] = np.where(estimated, np.minimum(pool_before, cap), payouts[:, 1])
+    return payouts, estimated
+
+
+@timed("expected_value_seconds")
+def expectedValueHistory(db_path=DB_PATH):
+    """全部历史每期的单注期望奖金，一次矩阵运算得到
+
+    由期望的线性，复式、胆拖中每一注与单式的中奖概率相同，单注期望奖金与投注方式无关；
+    投注方式只影响注数和至少中一注的概率，一次投注的期望奖金见betExpectedValue。
+    按各期实际的单注奖金计算，不考虑与其他中奖者分奖。
+
+    返回:
+        dict:
+            code: 最新期号
+            version: 快照版本
+            codes: 期号
+            payouts: estimatedPayouts得到的单注奖金
+            estimated: 一等奖奖金是否为估算值
+            tier_value: 形状为(N, 7)的各奖级对单注期望奖金的贡献(元)
+            value: 单注期望奖金(元)
+            return_rate: 返奖率，即期望奖金 / 单注价格
+    """
+    global _history
+    cacheRequest("expected_value")
+    snapshot = loadSnapshot(db_path)
+    with _history_lock:
+        if _history is not None and _history["version"] == snapshot["version"]:
+            return _history
+        cacheMiss("expected_value")
+        payouts, estimated = estimatedPayouts(snapshot)
+        tier_value = payouts * TICKET_EXPECTED
+        value = tier_value.sum(axis=1)
+        _history = {
+            "code": snapshot["code"],
+            "version": snapshot["version"],
+            "codes": snapshot["codes"],
+            "payouts": payouts,
+            "estimated": estimated,
+            "tier_value": tier_value,
+            "value": value,
+            "return_rate": value / TICKET_PRICE,
+        }
+        return _history
+
+
+def betExpectedValue(odds, history):
+    """一次投注在各期的期望奖金(元)
+
+    参数:
+        odds (dict): betOdds的返回值
+        history (dict): expectedValueHistory的返回值
+    """
+    return history["payouts"] @ odds["expected"]
@@ -0,0 +1,172 @@
+import os
+import threading
+
+import numpy as np
+
+from utils.codeRank import BLUE_COUNT, RED_COUNT, RED_PICK
+from utils.drawSnapshot import loadSnapshot
+from utils.metrics import cacheMiss, cacheRequest
+from utils.paths import DB_PATH
+
+# 走势缓存文件名，保存在数据库所在目录
+CUBE_FILE = "trend_cube.npz"
+
+# 统计窗口：最近30/50/100期和全部（0表示全部）
+WINDOWS = (30, 50, 100, 0)
+
+# 大号的起始号码：红球17-33为大号，1-16为小号
+BIG_RED_START = 17
+
+# 进程内缓存的走势数据，按最新期号判断是否需要重新计算
+_cube = None
+_cube_lock = threading.Lock()
+
+
+def cubePath(db_path):
+    """走势缓存路径：与数据库同目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), CUBE_FILE)
+
+
+def fetchAllDraws(db_path=DB_PATH):
+    """从列式快照中取出全部开奖结果，按期号升序
+
+    返回:
+        tuple: (期号数组, 红球(N, 6)数组, 蓝球(N,)数组)
+    """
+    snapshot = loadSnapshot(db_path)
+    return snapshot["codes"], snapshot["reds"], snapshot["blues"]
+
+
+def maxOmission(hit):
+    """每个号码在窗口内的最大遗漏期数
+
+    参数:
+        hit (numpy.ndarray): 形状为(期数, 号码数)的布尔矩阵
+
+    返回:
+        numpy.ndarray: 每个号码相邻两次开出之间（含窗口两端）最长的未开出期数
+    """
+    draws, balls = hit.shape
+    result = np.zeros(balls, dtype=np.int64)
+    for ball in range(balls):
+        # 在两端各补一个虚拟命中，相邻命中位置之差减1即为遗漏期数
+        positions = np.concatenate(([-1], np.flatnonzero(hit[:, ball]), [draws]))
+        result[ball] = (np.diff(positions) - 1).max()
+    return result
+
+
+def currentOmission(hit):
+    """每个号码截至最新一期的当前遗漏期数（窗口内从未开出则为窗口期数）"""
+    draws = hit.shape[0]
+    last = np.where(hit.any(axis=0), draws - 1 - np.argmax(hit[::-1], axis=0), -1)
+    return draws - 1 - last
+
+
+def drawSeries(reds):
+    """逐期的形态指标
+
+    返回:
+        dict: sum和值、span跨度、odd奇数个数、big大号个数、consecutive连号对数，均为长度N的数组
+    """
+    reds = np.sort(reds.astype(np.int64), axis=1)
+    return {
+        "sum": reds.sum(axis=1),
+        "span": reds[:, -1] - reds[:, 0],
+        "odd": (reds % 2 == 1).sum(axis=1),
+        "big": (reds >= BIG_RED_START).sum(axis=1),
+        "consecutive": (np.diff(reds, axis=1) == 1).sum(axis=1),
+    }
+
+
+def windowStats(reds, blues, series):
+    """计算一个窗口内的全部走势指标"""
+    red_hit = np.zeros((len(reds), RED_COUNT), dtype=bool)
+    np.put_along_axis(red_hit, reds.astype(np.intp) - 1, True, axis=1)
+    blue_hit = np.zeros((len(blues), BLUE_COUNT), dtype=bool)
+    blue_hit[np.arange(len(blues)), blues.astype(np.intp) - 1] = True
+
+    return {
+        "red_freq": red_hit.sum(axis=0),
+        "blue_freq": blue_hit.sum(axis=0),
+        "red_omission": currentOmission(red_hit),
+        "blue_omission": currentOmission(blue_hit),
+        "red_max_omission": maxOmission(red_hit),
+        "blue_max_omission": maxOmission(blue_hit),
+        # 奇偶比、大小比、连号对数的分布：第k项为该指标等于k的期数
+        "odd_dist": np.bincount(series["odd"], minlength=RED_PICK + 1),
+        "big_dist": np.bincount(series["big"], minlength=RED_PICK + 1),
+        "consecutive_dist": np.bincount(series["consecutive"], minlength=RED_PICK),
+        "sum": series["sum"],
+        "span": series["span"],
+    }
+
+
+def buildTrendCube(codes, reds, blues):
+    """计算全部窗口的走势数据
+
+    返回:
+        dict: {"code": 最新期号, 窗口: {指标: 数组}}
+    """
+    series = drawSeries(reds)
+    cube = {"code": str(codes[-1]) if len(codes) else ""}
+    for window in WINDOWS:
+        start = max(len(codes) - window, 0) if window else 0
+        cube[window] = windowStats(
+            reds[start:],
+            blues[start:],
+            {name: values[start:] for name, values in series.items()}
+        )
+    return cube
+
+
+def saveTrendCube(cube, path):
+    """将走势数据展平后保存为npz，键名格式为 窗口/指标"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    flat = {"code": np.array(cube["code"])}
+    for window in WINDOWS:
+        for name, values in cube[window].items():
+            flat[f"{window}/{name}"] = values
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **flat)
+    os.replace(temp_path, path)
+
+
+def loadTrendCubeFile(path):
+    """读取走势缓存文件，不存在或损坏时返回None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            cube = {"code": str(data["code"])}
+            for window in WINDOWS:
+                prefix = f"{window}/"
+                cube[window] = {key[len(prefix):]: data[key] for key in data.files if key.startswith(prefix)}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"走势缓存读取失败: {e}，将重新计算")
+        return None
+    return cube
+
+
+def loadTrendCube(db_path=DB_PATH):
+    """获取走势数据
+
+    依次尝试进程内缓存、磁盘缓存，最新期号与列式快照一致时直接返回；
+    快照有新开奖时才重新计算一次并写回缓存。
+    """
+    global _cube
+    cacheRequest("trend_cube")
+    with _cube_lock:
+        code = loadSnapshot(db_path)["code"]
+        if _cube is not None and _cube["code"] == code:
+            return _cube
+        cacheMiss("trend_cube")
+
+        path = cubePath(db_path)
+        cube = loadTrendCubeFile(path)
+        if cube is None or cube["code"] != code:
+            cube = buildTrendCube(*fetchAllDraws(db_path))
+            saveTrendCube(cube, path)
+
+        _cube = cube
+        return _cube